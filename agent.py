@@ -1,43 +1,314 @@
+import glob
+import gzip
+import json
+import os
+import random
 import time
 import psutil
 import requests
 import socket
 
+# Opsional: kalau msgpack ada, payload lebih kecil & parse lebih cepat di server
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 # --- KONFIGURASI ---
 # IP Server NetWatch Masbro. 
 # Kalau ngetes di laptop sendiri pake 'http://127.0.0.1:5000'
 # Kalau dipasang di laptop adik/teman, ganti jadi IP Laptop Masbro (misal 'http://192.168.1.10:5000')
-SERVER_URL = 'http://127.0.0.1:5000/api/agent/report'
+SERVER = os.getenv('NETWATCH_SERVER', 'http://127.0.0.1:5000')
+BULK_URL = f"{SERVER}/api/agent/bulk"
 
 # Nama Identitas Agent ini
-AGENT_NAME = f"Laptop-{socket.gethostname()}"
-
-print(f"🕵️‍♂️ AGENT '{AGENT_NAME}' STARTED...")
-print(f"📡 Target Server: {SERVER_URL}")
-
-while True:
-    try:
-        # 1. Ambil Data Diri Sendiri
-        cpu = psutil.cpu_percent(interval=1)
-        ram = psutil.virtual_memory().percent
-        
-        payload = {
-            "name": AGENT_NAME,
-            "cpu": cpu,
-            "ram": ram
-        }
-        
-        # 2. Kirim Laporan ke Bos (Server NetWatch)
-        response = requests.post(SERVER_URL, json=payload, timeout=2)
-        
-        if response.status_code == 200:
-            print(f"✅ Laporan Terkirim: CPU {cpu}% | RAM {ram}%")
-        else:
-            print(f"⚠️ Server Menolak: {response.status_code}")
-            
-    except Exception as e:
-        print(f"❌ Gagal Lapor: {e}")
-        print("Mencoba lagi dalam 5 detik...")
-    
-    # Lapor setiap 3 detik
-    time.sleep(3)
\ No newline at end of file
+AGENT_NAME = os.getenv('AGENT_NAME', f"Laptop-{socket.gethostname()}")
+
+# Ambil sampel tiap 3 detik, tapi kirimnya dibundel (hemat koneksi & CPU server)
+SAMPLE_INTERVAL = float(os.getenv('AGENT_SAMPLE_INTERVAL', '3'))
+FLUSH_INTERVAL = float(os.getenv('AGENT_FLUSH_INTERVAL', '10'))     # kirim tiap N detik
+FLUSH_MAX_SAMPLES = int(os.getenv('AGENT_FLUSH_SAMPLES', '20'))     # atau kalau sudah M sampel
+
+# Metric yang dikumpulkan (urutan bebas): cpu, percpu, ram, load, disk, net, procs
+ENABLED_COLLECTORS = os.getenv('AGENT_COLLECTORS', 'cpu,percpu,ram,load,disk,net,procs')
+TOP_N = int(os.getenv('AGENT_TOP_N', '5'))                          # jumlah proses teratas yang dilaporkan
+PROCS_EVERY = int(os.getenv('AGENT_PROCS_EVERY', '5'))              # scan proses tiap N sampel
+KEYFRAME_INTERVAL = float(os.getenv('AGENT_KEYFRAME_INTERVAL', '60'))  # kirim semua metric tiap N detik
+
+# Threshold delta per metric: (selisih absolut, selisih relatif). Berubah di bawah ini = gak dikirim.
+DELTA_THRESHOLDS = {
+    'cpu': (1.0, 0), 'ram': (0.5, 0), 'load1': (0.05, 0), 'load5': (0.05, 0), 'load15': (0.05, 0),
+    'disk': (1024, 0.10), 'net': (1024, 0.10),
+}
+
+# Kalau server down: coba lagi pakai exponential backoff + jitter (biar ratusan agent gak nyerbu barengan),
+# sampel yang gagal dikirim disimpan dulu ke disk lalu dikirim ulang pas server hidup lagi
+BACKOFF_BASE = float(os.getenv('AGENT_BACKOFF_BASE', '2'))
+BACKOFF_MAX = float(os.getenv('AGENT_BACKOFF_MAX', '300'))
+SPOOL_DIR = os.getenv('AGENT_SPOOL_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'storage', 'agent_spool'))
+SPOOL_MAX_BYTES = int(os.getenv('AGENT_SPOOL_MAX_BYTES', str(50 * 1024 * 1024)))
+REPLAY_BATCH = int(os.getenv('AGENT_REPLAY_BATCH', '500'))          # sampel per request waktu replay
+REPLAY_MAX_REQUESTS = int(os.getenv('AGENT_REPLAY_MAX_REQUESTS', '10'))  # per siklus, biar sampling gak ketunda lama
+
+
+# ==========================================
+# COLLECTOR (NON-BLOCKING, BERBASIS SELISIH)
+# ==========================================
+# Semua collector cuma baca counter sekarang dan bandingkan dengan bacaan sebelumnya,
+# jadi gak ada lagi cpu_percent(interval=1) yang makan 1 detik tiap siklus.
+class CpuCollector:
+    def __init__(self): psutil.cpu_percent(interval=None)   # pemanasan, bacaan pertama selalu 0
+    def collect(self): return {'cpu': psutil.cpu_percent(interval=None)}
+
+class PerCoreCollector:
+    def __init__(self): psutil.cpu_percent(interval=None, percpu=True)
+    def collect(self):
+        return {f"cpu.core{i}": v for i, v in enumerate(psutil.cpu_percent(interval=None, percpu=True))}
+
+class RamCollector:
+    def collect(self):
+        vm = psutil.virtual_memory()
+        return {'ram': vm.percent, 'ram.used_gb': round(vm.used / 1024**3, 2)}
+
+class LoadCollector:
+    def collect(self):
+        l1, l5, l15 = psutil.getloadavg()   # Windows: psutil emulasi sendiri
+        return {'load1': round(l1, 2), 'load5': round(l5, 2), 'load15': round(l15, 2)}
+
+class RateCollector:
+    # Counter kumulatif (bytes/ops) -> laju per detik
+    fields = {}
+
+    def __init__(self):
+        self.prev, self.prev_ts = self.read(), time.time()
+
+    def collect(self):
+        now, cur = time.time(), self.read()
+        dt = max(now - self.prev_ts, 1e-6)
+        out = {}
+        if cur is not None and self.prev is not None:
+            for attr, metric in self.fields.items():
+                out[metric] = round(max(getattr(cur, attr) - getattr(self.prev, attr), 0) / dt, 1)
+        self.prev, self.prev_ts = cur, now
+        return out
+
+class DiskIOCollector(RateCollector):
+    fields = {'read_bytes': 'disk.read_bps', 'write_bytes': 'disk.write_bps',
+              'read_count': 'disk.read_iops', 'write_count': 'disk.write_iops'}
+    def read(self): return psutil.disk_io_counters()
+
+class NetIOCollector(RateCollector):
+    fields = {'bytes_sent': 'net.sent_bps', 'bytes_recv': 'net.recv_bps'}
+    def read(self): return psutil.net_io_counters()
+
+class TopProcessCollector:
+    # Scan semua proses itu mahal -> cuma tiap PROCS_EVERY sampel
+    def __init__(self):
+        self.count = 0
+        list(psutil.process_iter(['cpu_percent']))   # pemanasan cpu_percent per proses
+
+    def collect(self):
+        self.count += 1
+        if self.count % PROCS_EVERY != 1 and PROCS_EVERY > 1: return {}
+        procs = []
+        for p in psutil.process_iter(['name', 'cpu_percent', 'memory_percent']):
+            info = p.info
+            if info['cpu_percent'] is None: continue
+            procs.append({'name': info['name'], 'cpu': round(info['cpu_percent'], 1),
+                          'mem': round(info['memory_percent'] or 0, 1)})
+        procs.sort(key=lambda x: (x['cpu'], x['mem']), reverse=True)
+        return {'procs': procs[:TOP_N]}
+
+COLLECTORS = {
+    'cpu': CpuCollector, 'percpu': PerCoreCollector, 'ram': RamCollector, 'load': LoadCollector,
+    'disk': DiskIOCollector, 'net': NetIOCollector, 'procs': TopProcessCollector,
+}
+
+
+def build_collectors(names=ENABLED_COLLECTORS):
+    active = []
+    for name in [n.strip() for n in names.split(',') if n.strip()]:
+        try: active.append(COLLECTORS[name]())
+        except Exception as e: print(f"⚠️ Collector '{name}' dimatikan: {e}")
+    return active
+
+
+# ==========================================
+# DELTA ENCODING
+# ==========================================
+# Metric cuma dikirim kalau berubah melewati threshold dibanding nilai TERAKHIR YANG DIKIRIM.
+# Tiap KEYFRAME_INTERVAL detik kirim sampel lengkap ("full": true) biar server selalu sinkron.
+class DeltaEncoder:
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.last_sent = {}
+        self.last_keyframe = 0
+
+    def changed(self, metric, value):
+        prev = self.last_sent.get(metric)
+        if prev is None or not isinstance(value, (int, float)): return prev != value
+        absolute, relative = threshold_for(metric)
+        return abs(value - prev) >= max(absolute, relative * abs(prev))
+
+    def encode(self, ts, metrics):
+        full = ts - self.last_keyframe >= self.keyframe_interval
+        if full: self.last_keyframe = ts
+        out = {k: v for k, v in metrics.items() if full or self.changed(k, v)}
+        self.last_sent.update(out)
+        out['ts'] = ts
+        if full: out['full'] = True
+        return out
+
+
+def threshold_for(metric):
+    for prefix, th in DELTA_THRESHOLDS.items():
+        if metric == prefix or metric.startswith(prefix + '.'): return th
+    return (0, 0)
+
+
+def collect(collectors, encoder):
+    # 1. Ambil Data Diri Sendiri
+    metrics = {}
+    for c in collectors:
+        try: metrics.update(c.collect())
+        except Exception as e: print(f"⚠️ {type(c).__name__}: {e}")
+    return encoder.encode(time.time(), metrics)
+
+
+def encode(samples):
+    payload = {"agents": [{"name": AGENT_NAME, "samples": samples}]}
+    if msgpack is not None:
+        body, ctype = msgpack.packb(payload), 'application/msgpack'
+    else:
+        body, ctype = json.dumps(payload).encode(), 'application/json'
+    return gzip.compress(body), {'Content-Type': ctype, 'Content-Encoding': 'gzip'}
+
+
+# ==========================================
+# SPOOL: ANTRIAN DI DISK (TERBATAS)
+# ==========================================
+# 1 file gzip per batch yang gagal kirim. Kalau total ukuran lewat batas, file tertua dibuang.
+class Spool:
+    def __init__(self, folder=SPOOL_DIR, max_bytes=SPOOL_MAX_BYTES):
+        self.folder = folder
+        self.max_bytes = max_bytes
+        os.makedirs(folder, exist_ok=True)
+
+    def files(self):
+        return sorted(glob.glob(os.path.join(self.folder, 'spool-*.json.gz')))
+
+    def put(self, samples):
+        path = os.path.join(self.folder, f"spool-{time.time_ns()}.json.gz")
+        with gzip.open(path + '.tmp', 'wt') as f: json.dump(samples, f)
+        os.replace(path + '.tmp', path)
+        self.trim()
+
+    def trim(self):
+        files = self.files()
+        sizes = {f: os.path.getsize(f) for f in files}
+        total = sum(sizes.values())
+        for f in files:
+            if total <= self.max_bytes: break
+            total -= sizes[f]
+            os.remove(f)
+            print(f"🗑️ Spool penuh, batch lama dibuang: {os.path.basename(f)}")
+
+    def load(self, path):
+        with gzip.open(path, 'rt') as f: return json.load(f)
+
+    def count(self):
+        return len(self.files())
+
+
+# ==========================================
+# UPLINK KE SERVER (KEEP-ALIVE + BACKOFF + REPLAY)
+# ==========================================
+class Uplink:
+    def __init__(self, spool):
+        self.spool = spool
+        self.session = requests.Session()   # koneksi TCP dipakai ulang antar laporan
+        self.failures = 0
+        self.next_attempt = 0
+
+    def post(self, samples):
+        # True = diterima, False = ditolak permanen (4xx, jangan diulang), exception = coba lagi nanti
+        body, headers = encode(samples)
+        response = self.session.post(BULK_URL, data=body, headers=headers, timeout=5)
+        if response.status_code == 200: return True
+        if 400 <= response.status_code < 500:
+            print(f"⚠️ Server Menolak: {response.status_code} ({len(samples)} sampel dibuang)")
+            return False
+        raise requests.HTTPError(f"HTTP {response.status_code}")
+
+    def flush(self, buffer):
+        # 2. Kirim Laporan ke Bos (Server NetWatch), sekali kirim banyak sampel
+        if time.time() < self.next_attempt:
+            self.spool.put(buffer)   # masih masa backoff, simpan dulu ke disk
+            return
+        try:
+            if self.post(buffer):
+                print(f"✅ {len(buffer)} Sampel Terkirim ({sum(len(x.keys() - {'ts', 'full'}) for x in buffer)} nilai)")
+            self.failures = 0
+            self.replay()
+        except requests.RequestException as e:
+            self.spool.put(buffer)
+            self.backoff(e)
+
+    def backoff(self, error):
+        self.failures += 1
+        # "Full jitter": tunggu acak 0..min(max, base * 2^n)
+        delay = random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * (2 ** self.failures)))
+        self.next_attempt = time.time() + delay
+        print(f"❌ Gagal Lapor: {error}")
+        print(f"Coba lagi dalam {delay:.1f} detik ({self.spool.count()} batch di spool)...")
+
+    def replay(self):
+        # Kirim ulang isi spool (tertua dulu), digabung jadi batch besar
+        for _ in range(REPLAY_MAX_REQUESTS):
+            files = self.spool.files()
+            if not files: return
+            picked, samples = [], []
+            for f in files:
+                try: chunk = self.spool.load(f)
+                except Exception:
+                    os.remove(f)   # file rusak (misal agent mati pas nulis)
+                    continue
+                picked.append(f)
+                samples.extend(chunk)
+                if len(samples) >= REPLAY_BATCH: break
+            if not samples: continue
+            try:
+                self.post(samples)
+            except requests.RequestException as e:
+                self.backoff(e)
+                return
+            for f in picked: os.remove(f)
+            print(f"📤 Replay spool: {len(samples)} sampel terkirim")
+
+
+if __name__ == '__main__':
+    print(f"🕵️‍♂️ AGENT '{AGENT_NAME}' STARTED...")
+    print(f"📡 Target Server: {BULK_URL}")
+
+    collectors = build_collectors()
+    encoder = DeltaEncoder()
+    print(f"🧩 Collector aktif: {', '.join(type(c).__name__ for c in collectors)}")
+
+    uplink = Uplink(Spool())
+    if uplink.spool.count(): print(f"📦 Ada {uplink.spool.count()} batch di spool, dikirim pas server nyambung")
+
+    buffer = []
+    last_flush = time.time()
+    while True:
+        started = time.time()
+        try:
+            buffer.append(collect(collectors, encoder))
+            if len(buffer) >= FLUSH_MAX_SAMPLES or time.time() - last_flush >= FLUSH_INTERVAL:
+                last_flush = time.time()
+                batch, buffer = buffer, []
+                uplink.flush(batch)
+        except Exception as e:
+            print(f"❌ Error Agent: {e}")
+
+        # Jaga ritme sampling
+        time.sleep(max(0.0, SAMPLE_INTERVAL - (time.time() - started)))
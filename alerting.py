@@ -0,0 +1,202 @@
+import os
+import queue
+import threading
+import time
+from collections import deque
+
+# --- KONFIGURASI ALERT ---
+ALERT_FAIL_THRESHOLD = int(os.getenv('ALERT_FAIL_THRESHOLD', '3'))   # N probe gagal ...
+ALERT_FAIL_WINDOW = int(os.getenv('ALERT_FAIL_WINDOW', '5'))         # ... dari M probe terakhir -> DOWN
+ALERT_RECOVER = int(os.getenv('ALERT_RECOVER', '2'))                 # N probe sukses berturut-turut -> UP lagi
+ALERT_FLAP_WINDOW = float(os.getenv('ALERT_FLAP_WINDOW', '600'))     # detik, jendela hitung perubahan status
+ALERT_FLAP_LIMIT = int(os.getenv('ALERT_FLAP_LIMIT', '4'))           # >= N perubahan dalam jendela = flapping
+ALERT_FLAP_QUIET = float(os.getenv('ALERT_FLAP_QUIET', '300'))       # flapping selesai kalau diam selama ini
+ALERT_DIGEST_WINDOW = float(os.getenv('ALERT_DIGEST_WINDOW', '5'))   # alert yang berdekatan digabung 1 pesan
+ALERT_RATE_PER_MIN = float(os.getenv('ALERT_RATE_PER_MIN', '20'))    # max pesan per menit per tujuan
+ALERT_BURST = int(os.getenv('ALERT_BURST', '5'))
+ALERT_DIGEST_NAMES = 30   # nama device per baris digest, sisanya "+N lainnya"
+
+ICONS = {'DOWN': '🚨', 'UP': '✅', 'FLAPPING': '⚠️', 'STABLE': '🔁', 'INFO': 'ℹ️'}
+
+
+def format_event(event):
+    kind, name = event['kind'], event['name']
+    if kind == 'DOWN': return f"🚨 {name} DOWN!" + (f" ({event['note']})" if event.get('note') else '')
+    if kind == 'UP': return f"✅ {name} UP!"
+    if kind == 'FLAPPING': return f"⚠️ {name} FLAPPING ({event['changes']}x berubah), alert ditahan sampai stabil"
+    if kind == 'STABLE': return f"🔁 {name} stabil lagi, sekarang {event['status']}"
+    return event['text']
+
+
+def digest(events):
+    # Banyak kejadian -> 1 pesan, dikelompokkan per jenis. Per device cuma kejadian terakhir yang dipakai.
+    if len(events) == 1: return format_event(events[0])
+    latest = {}
+    for e in events: latest[e.get('key', id(e))] = e
+    groups = {}
+    for e in latest.values(): groups.setdefault(e['kind'], []).append(e)
+    lines = [f"📣 NetWatch: {len(latest)} kejadian"]
+    for kind in ('DOWN', 'UP', 'FLAPPING', 'STABLE'):
+        items = groups.get(kind)
+        if not items: continue
+        names = [f"{e['name']} ({e['note']})" if e.get('note') else e['name'] for e in items]
+        more = f" +{len(names) - ALERT_DIGEST_NAMES} lainnya" if len(names) > ALERT_DIGEST_NAMES else ''
+        lines.append(f"{ICONS[kind]} {kind} ({len(names)}): {', '.join(names[:ALERT_DIGEST_NAMES])}{more}")
+    lines += [e['text'] for e in groups.get('INFO', [])]
+    return '\n'.join(lines)
+
+
+class TokenBucket:
+    def __init__(self, rate_per_min, burst):
+        self.rate = rate_per_min / 60.0
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def take(self):
+        self._refill()
+        if self.tokens < 1: return False
+        self.tokens -= 1
+        return True
+
+    def wait_time(self):
+        self._refill()
+        if self.tokens >= 1: return 0.0
+        return (1 - self.tokens) / self.rate if self.rate else float('inf')
+
+
+# ==========================================
+# ALERT MANAGER
+# ==========================================
+# Loop monitor cuma manggil observe() (di RAM, gak ada network). Status dikonfirmasi pakai histeresis:
+#   DOWN kalau ALERT_FAIL_THRESHOLD dari ALERT_FAIL_WINDOW probe terakhir gagal,
+#   UP lagi kalau ALERT_RECOVER probe terakhir sukses semua.
+# Device yang bolak-balik >= ALERT_FLAP_LIMIT kali dalam ALERT_FLAP_WINDOW ditandai FLAPPING: 1 alert,
+# lalu diam sampai stabil. Pengiriman di thread sendiri: kejadian selama ALERT_DIGEST_WINDOW digabung
+# jadi 1 digest per tujuan, dan tiap tujuan dibatasi ALERT_RATE_PER_MIN (sisanya ikut digest berikutnya).
+class AlertManager:
+    def __init__(self, destinations, threshold=ALERT_FAIL_THRESHOLD, window=ALERT_FAIL_WINDOW, recover=ALERT_RECOVER,
+                 flap_window=ALERT_FLAP_WINDOW, flap_limit=ALERT_FLAP_LIMIT, flap_quiet=ALERT_FLAP_QUIET,
+                 digest_window=ALERT_DIGEST_WINDOW, rate_per_min=ALERT_RATE_PER_MIN, burst=ALERT_BURST):
+        self.destinations = destinations   # {'telegram': fungsi(text)}
+        self.threshold = threshold
+        self.window = window
+        self.recover = recover
+        self.flap_window = flap_window
+        self.flap_limit = flap_limit
+        self.flap_quiet = flap_quiet
+        self.digest_window = digest_window
+        self.buckets = {name: TokenBucket(rate_per_min, burst) for name in destinations}
+        self.queue = queue.Queue()
+        self.devices = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.stats = {'events': 0, 'messages': 0, 'suppressed': 0, 'rate_limited': 0, 'errors': 0}
+
+    def start(self):
+        if self.thread: return self
+        self.thread = threading.Thread(target=self._run, name='alerts', daemon=True)
+        self.thread.start()
+        return self
+
+    # --- dipanggil dari loop monitor ---
+    def seed(self, statuses):
+        # Status terkonfirmasi terakhir (misal dari shared state cluster) biar restart gak bikin alert palsu
+        with self.lock:
+            for key, status in statuses.items(): self._state(key)['state'] = status
+
+    def _state(self, key):
+        st = self.devices.get(key)
+        if st is None:
+            st = self.devices[key] = {'samples': deque(maxlen=self.window), 'state': 'UP', 'changes': deque(),
+                                      'flapping': False}
+        return st
+
+    def observe(self, key, name, status, now=None, note=None):
+        # Return status baru kalau berubah (sudah dikonfirmasi), selain itu None. 'ERR' gak dihitung.
+        # note: keterangan tambahan di alert DOWN (misal jumlah device di belakang router ini)
+        if status not in ('UP', 'DOWN'): return None
+        now = now or time.time()
+        with self.lock:
+            st = self._state(key)
+            st['samples'].append(status == 'UP')
+            samples = st['samples']
+            new = st['state']
+            if st['state'] != 'DOWN' and samples.count(False) >= self.threshold:
+                new = 'DOWN'
+            elif st['state'] == 'DOWN' and len(samples) >= self.recover and all(list(samples)[-self.recover:]):
+                new = 'UP'
+
+            changes = st['changes']
+            while changes and changes[0] < now - self.flap_window: changes.popleft()
+            if new == st['state']:
+                if st['flapping'] and (not changes or now - changes[-1] >= self.flap_quiet):
+                    st['flapping'] = False
+                    self._emit({'kind': 'STABLE', 'key': key, 'name': name, 'status': new})
+                return None
+
+            st['state'] = new
+            # Histori sampel di-reset biar status baru butuh konfirmasi penuh lagi untuk balik
+            samples.clear()
+            changes.append(now)
+            if st['flapping']:
+                self.stats['suppressed'] += 1
+            elif len(changes) >= self.flap_limit:
+                st['flapping'] = True
+                self._emit({'kind': 'FLAPPING', 'key': key, 'name': name, 'changes': len(changes)})
+            else:
+                self._emit({'kind': new, 'key': key, 'name': name, 'note': note if new == 'DOWN' else None})
+            return new
+
+    def forget(self, key):
+        with self.lock: self.devices.pop(key, None)
+
+    def notify(self, text):
+        # Pesan bebas (bukan status device), tetap lewat digest + rate limit
+        self._emit({'kind': 'INFO', 'name': '', 'text': text})
+
+    def _emit(self, event):
+        event['ts'] = time.time()
+        self.stats['events'] += 1
+        self.queue.put(event)
+
+    # --- thread pengirim ---
+    def _run(self):
+        pending = {name: [] for name in self.destinations}
+        while True:
+            # Tidur sampai ada kejadian baru / digest berikutnya jatuh tempo
+            waits = [self._due(events, name) for name, events in pending.items() if events]
+            batch = self._drain(max(0.05, min(waits) - time.time()) if waits else None)
+            for events in pending.values(): events.extend(batch)
+            for name, events in pending.items():
+                if not events or self._due(events, name) > time.time(): continue
+                if not self.buckets[name].take():
+                    self.stats['rate_limited'] += 1
+                    continue
+                text = digest(events)
+                pending[name] = []
+                try:
+                    self.destinations[name](text)
+                    self.stats['messages'] += 1
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"❌ Alert {name} gagal: {e}")
+
+    def _drain(self, timeout):
+        # Semua kejadian yang sudah antri (nunggu maksimal timeout kalau masih kosong)
+        batch = []
+        try:
+            batch.append(self.queue.get(timeout=timeout))
+            while True: batch.append(self.queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _due(self, events, name):
+        # Digest dikirim ALERT_DIGEST_WINDOW setelah kejadian pertama, atau nunggu token rate limit
+        return max(events[0]['ts'] + self.digest_window, time.time() + self.buckets[name].wait_time())
@@ -0,0 +1,93 @@
+# Ukur trafik Socket.IO ke 1 browser: emit full dict tiap laporan (lama) vs broadcaster (tick + delta).
+# Simulasi N agent lapor tiap 3 detik + M device di-sweep tiap 3 detik, dihitung bytes yang diterima client.
+# Jalankan: python benchmarks/bench_broadcast.py [--agents 500] [--devices 200] [--seconds 15] [--change 0.2]
+#           [--record stream.json]  -> simpan pesan delta-nya buat di-replay di benchmarks/dashboard_replay.html
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TMP_DIR = tempfile.mkdtemp(prefix='netwatch-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+
+from netwatch import app, socketio, telemetry, broadcaster  # noqa: E402
+
+
+def simulate(args, on_report, on_sweep, on_tick):
+    # Waktu disimulasikan per detik; laporan agent disebar rata sepanjang 3 detik
+    rng = random.Random(1)
+    cpu = {f"PC-{i}": 20 for i in range(args.agents)}
+    for sec in range(args.seconds):
+        for i in range(args.agents):
+            if i % 3 != sec % 3: continue
+            name = f"PC-{i}"
+            if rng.random() < args.change: cpu[name] = rng.randint(0, 100)
+            telemetry.ingest(name, {'cpu': cpu[name], 'ram': 40}, ts=1700000000 + i)   # last_seen tetap -> cuma CPU yang geser
+            on_report(name)
+        if sec % 3 == 0:
+            results = [{'id': d, 'status': 'UP', 'latency': f"{rng.randint(1, 3) if rng.random() < args.change else 1} ms",
+                        'color': 'success'} for d in range(args.devices)]
+            on_sweep(results)
+        on_tick()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--agents', type=int, default=500)
+    parser.add_argument('--devices', type=int, default=200)
+    parser.add_argument('--seconds', type=int, default=15)
+    parser.add_argument('--change', type=float, default=0.2, help='peluang nilai berubah per laporan')
+    parser.add_argument('--record', help='simpan stream pesan (JSON) buat dashboard_replay.html')
+    args = parser.parse_args()
+
+    telemetry.store = None   # yang diukur cuma trafik socket, histori DB gak perlu
+    print(f"📊 Broadcast: {args.agents} agent, {args.devices} device, {args.seconds}s, {args.change:.0%} berubah per laporan")
+
+    # Cara lama: payload-nya cukup diserialisasi (kalau lewat test client, RAM-nya habis buat nampung pesan)
+    legacy, msgs_legacy = [0], [0]
+
+    def legacy_emit(payload):
+        legacy[0] += len(json.dumps(payload, default=str))
+        msgs_legacy[0] += 1
+
+    simulate(args, lambda name: legacy_emit(telemetry.snapshot()), legacy_emit, lambda: None)
+    legacy, msgs_legacy = legacy[0], msgs_legacy[0]
+
+    client = socketio.test_client(app)
+    client.get_received()
+    ticks, delta, recording = [0], [0], []
+
+    def collect():
+        # Semua yang diterima browser sampai detik ini
+        for m in client.get_received():
+            delta[0] += len(json.dumps(m['args'], default=str))
+            recording.append({'t': ticks[0], 'event': m['name'], 'msg': m['args'][0]})
+
+    def tick():
+        broadcaster.flush()
+        ticks[0] += 1
+        if ticks[0] % int(broadcaster.snapshot_every) == 0:
+            for name in broadcaster.channels: broadcaster.send_snapshot(name)
+        collect()
+
+    # Browser baru connect -> snapshot dulu
+    for name in broadcaster.channels: broadcaster.send_snapshot(name)
+    collect()
+
+    simulate(args,
+             lambda name: broadcaster.touch('update_agents', [name]),
+             lambda results: broadcaster.update('update_monitor', {r['id']: r for r in results}),
+             tick)
+    delta = delta[0]
+
+    print(f"  emit full tiap laporan: {legacy / args.seconds / 1024:>10,.1f} KB/s per browser ({msgs_legacy} pesan)")
+    print(f"  broadcaster (delta)   : {delta / args.seconds / 1024:>10,.1f} KB/s per browser "
+          f"({broadcaster.stats['deltas'] + broadcaster.stats['snapshots']} pesan, {legacy / max(delta, 1):.0f}x lebih kecil)")
+    if args.record:
+        with open(args.record, 'w') as f: json.dump(recording, f, default=str)
+        print(f"💾 {len(recording)} pesan disimpan ke {args.record}")
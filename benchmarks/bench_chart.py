@@ -0,0 +1,73 @@
+# Benchmark /api/chart/<id>/range: isi 30 hari rollup + 48 jam raw, lalu ukur waktu respon.
+# Jalankan: python benchmarks/bench_chart.py [--devices 50]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TMP_DIR = tempfile.mkdtemp(prefix='netwatch-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+
+from werkzeug.security import generate_password_hash  # noqa: E402
+from netwatch import app, db, PingHistory, PingRollup, User  # noqa: E402
+from storage import ensure_indexes  # noqa: E402
+from rollup import floor_time, MINUTE, HOUR  # noqa: E402
+
+
+def seed(devices):
+    now = datetime.now()
+    with app.app_context():
+        db.create_all()
+        ensure_indexes(db)
+        db.session.add(User(username='bench', password_hash=generate_password_hash('bench')))
+        db.session.commit()
+        for dev in range(1, devices + 1):
+            raw, rollups = [], []
+            t = now - timedelta(hours=48)
+            while t < now:
+                raw.append({'device_id': dev, 'latency': random.randint(5, 80), 'timestamp': t})
+                t += timedelta(seconds=3)
+            for res, days in ((MINUTE, 30), (HOUR, 30)):
+                b = floor_time(now - timedelta(days=days), res)
+                while b < now:
+                    rollups.append({'device_id': dev, 'resolution': res, 'bucket': b, 'samples': res // 3, 'lost': 0,
+                                    'lat_min': 5, 'lat_avg': 30.0, 'lat_max': 80, 'lat_p95': 70})
+                    b += timedelta(seconds=res)
+            db.session.execute(PingHistory.__table__.insert(), raw)
+            db.session.execute(PingRollup.__table__.insert(), rollups)
+            db.session.commit()
+        return PingHistory.query.count(), PingRollup.query.count()
+
+
+def timed(client, url, repeat=20):
+    client.get(url)
+    start = time.perf_counter()
+    for _ in range(repeat): r = client.get(url)
+    return (time.perf_counter() - start) / repeat * 1000, len(r.get_json()['labels'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--devices', type=int, default=50)
+    args = parser.parse_args()
+
+    raw, rollups = seed(args.devices)
+    print(f"📊 Seeded {raw:,} raw rows + {rollups:,} rollup rows ({args.devices} devices, db: {TMP_DIR})")
+    client = app.test_client()
+    client.post('/login', data={'username': 'bench', 'password': 'bench'})
+    now = int(time.time())
+    for name, url in [
+        ('last 20 (legacy)', '/api/chart/1'),
+        ('1 hour raw', f'/api/chart/1/range?from={now - 3600}'),
+        ('24 hours', f'/api/chart/1/range?from={now - 86400}'),
+        ('30 days', f'/api/chart/1/range?from={now - 30 * 86400}'),
+        ('30 days, step=1d', f'/api/chart/1/range?from={now - 30 * 86400}&step=86400'),
+    ]:
+        ms, points = timed(client, url)
+        print(f"{name:>18}: {ms:7.1f} ms  ({points} points)")
@@ -0,0 +1,77 @@
+# Benchmark history chart SysGaze: deque of dict (cara naif, dikirim sebagai JSON) vs MetricHistory (history.py).
+# Isi --seconds sampel (1/detik) dengan --metrics metric, lalu ukur memori, ukuran snapshot, dan waktu pack.
+# Jalankan: python benchmarks/bench_history.py [--seconds 3600] [--metrics 6]
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import deque
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from history import MetricHistory, unpack  # noqa: E402
+
+
+def samples(seconds, metrics, seed=1, t0=1_700_000_000.0):
+    rng = random.Random(seed)
+    names = ['cpu', 'ram'] + [f"disk:/dev/sd{chr(97 + i)}1" for i in range(metrics - 2)]
+    for t in range(seconds):
+        yield t0 + t, {name: round(rng.uniform(0, 100), 1) for name in names}
+
+
+def measure(build):
+    tracemalloc.start()
+    obj = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return obj, size
+
+
+def timed(fn, repeat=20):
+    start = time.perf_counter()
+    for _ in range(repeat): out = fn()
+    return out, (time.perf_counter() - start) / repeat
+
+
+def build_deque(seconds, metrics):
+    buf = deque(maxlen=seconds)
+    for ts, values in samples(seconds, metrics): buf.append({'ts': ts, **values})
+    return buf
+
+
+def build_history(seconds, metrics):
+    hist = MetricHistory(capacity=seconds)
+    for ts, values in samples(seconds, metrics): hist.record(ts, values)
+    return hist
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=int, default=3600)
+    parser.add_argument('--metrics', type=int, default=6)
+    args = parser.parse_args()
+
+    buf, buf_mem = measure(lambda: build_deque(args.seconds, args.metrics))
+    hist, hist_mem = measure(lambda: build_history(args.seconds, args.metrics))
+    body, json_time = timed(lambda: json.dumps(list(buf)).encode())
+    blob, pack_time = timed(hist.pack)
+
+    print(f"📊 {args.seconds} sampel x {args.metrics} metric")
+    print(f"   deque+json: {buf_mem / 1024:>8.0f} KB memori | snapshot {len(body) / 1024:>7.0f} KB | {json_time * 1000:6.2f} ms")
+    print(f"   history   : {hist_mem / 1024:>8.0f} KB memori | snapshot {len(blob) / 1024:>7.0f} KB | {pack_time * 1000:6.2f} ms "
+          f"({hist.series['cpu'].nbytes():,} byte ring per metric, tetap)")
+
+    # Round-trip: isi snapshot biner sama dengan sampel asli (float32 -> selisih pembulatan kecil)
+    data = unpack(blob)
+    worst = max(abs(row['ts'] - ts) for row, ts in zip(buf, data['ts']))
+    worst_v = max(abs(row[name] - data[name][i]) for i, row in enumerate(buf) for name in row if name != 'ts')
+    print(f"   round-trip: {len(data['ts'])} sampel, selisih ts {worst:.1e} dtk, nilai {worst_v:.1e}"
+          + (" ✅" if worst == 0 and worst_v < 1e-4 else " ❌"))
+    since = data['ts'][-61]
+    part = hist.pack(since=since)
+    print(f"   ?since=   : {len(unpack(part)['ts'])} sampel terakhir = {len(part):,} byte"
+          + (" ✅" if unpack(part)['ts'] == data['ts'][-60:] else " ❌"))
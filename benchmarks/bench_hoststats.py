@@ -0,0 +1,106 @@
+# Benchmark get_system_stats SysGaze: cara lama (disk_partitions + disk_usage semua mount tiap detik, di loop)
+# vs HostStats (hoststats.py). Mount palsu: --mounts buah, tiap disk_usage makan --latency ms,
+# dan --hung mount yang gak pernah jawab (simulasi NFS mati).
+# Jalankan: python benchmarks/bench_hoststats.py [--mounts 200] [--latency 2] [--hung 1] [--ticks 10]
+import argparse
+import os
+import sys
+import threading
+import time
+
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from hoststats import HostStats  # noqa: E402
+
+REAL_PARTITIONS, REAL_USAGE = psutil.disk_partitions, psutil.disk_usage
+
+
+def fake_fs(mounts, latency, hung, stop):
+    base = REAL_PARTITIONS()[0]
+    parts = [base._replace(device=f"/dev/fake{i}", mountpoint=f"/mnt/fake{i}") for i in range(mounts)]
+    hung_points = {p.mountpoint for p in parts[:hung]}
+    calls = {'partitions': 0, 'usage': 0}
+
+    def disk_partitions(all=False):
+        calls['partitions'] += 1
+        time.sleep(latency / 1000)
+        return parts
+
+    def disk_usage(path):
+        calls['usage'] += 1
+        if path in hung_points: stop.wait()   # "hang" sampai benchmark selesai
+        time.sleep(latency / 1000)
+        return REAL_USAGE('/')
+
+    psutil.disk_partitions, psutil.disk_usage = disk_partitions, disk_usage
+    return calls
+
+
+def old_stats():
+    # Salinan get_system_stats sebelum hoststats.py
+    cpu = psutil.cpu_percent(interval=None)
+    ram = psutil.virtual_memory()
+    disks = []
+    for p in psutil.disk_partitions():
+        if 'cdrom' in p.opts or p.fstype == '': continue
+        try:
+            usage = psutil.disk_usage(p.mountpoint)
+            disks.append({'letter': p.device, 'percent': usage.percent, 'free': f"{round(usage.free / (1024**3), 1)} GB Free"})
+        except Exception:
+            continue
+    return {'cpu': cpu, 'ram_percent': ram.percent, 'disks': disks, 'uptime': time.time() - psutil.boot_time()}
+
+
+def run(name, collect, ticks):
+    times, done = [], threading.Event()
+
+    def loop():
+        for _ in range(ticks):
+            t = time.perf_counter()
+            stats = collect()
+            times.append(time.perf_counter() - t)
+            time.sleep(max(0.0, 1.0 - times[-1]))
+        done.set()
+        loop.disks = len(stats['disks'])
+
+    threading.Thread(target=loop, daemon=True).start()
+    finished = done.wait(ticks * 1.5 + 5)
+    if not finished:
+        print(f"{name:>9} | loop MACET di tick ke-{len(times) + 1} (mount hang, CPU/RAM ikut berhenti update)")
+        return
+    times.sort()
+    print(f"{name:>9} | p50 {times[len(times) // 2] * 1000:>8.2f} ms | max {times[-1] * 1000:>8.2f} ms | "
+          f"{loop.disks} disk di tick terakhir")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--mounts', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=2.0, help='ms per disk_usage / disk_partitions')
+    parser.add_argument('--hung', type=int, default=1, help='jumlah mount yang hang')
+    parser.add_argument('--ticks', type=int, default=10)
+    args = parser.parse_args()
+    stop = threading.Event()
+
+    print(f"📊 {args.mounts} mount, {args.latency} ms per syscall, {args.hung} mount hang, {args.ticks} tick @ 1 dtk")
+    calls = fake_fs(args.mounts, args.latency, 0, stop)
+    run('lama', old_stats, args.ticks)
+    print(f"{'':>9}   disk_partitions {calls['partitions']}x, disk_usage {calls['usage']:,}x")
+    calls = fake_fs(args.mounts, args.latency, 0, stop)
+    host = HostStats()
+    run('hoststats', host.collect, args.ticks)
+    print(f"{'':>9}   disk_partitions {calls['partitions']}x, disk_usage {calls['usage']:,}x")
+    host.close()
+
+    if args.hung:
+        print(f"--- dengan {args.hung} mount hang ---")
+        fake_fs(args.mounts, args.latency, args.hung, stop)
+        run('lama', old_stats, args.ticks)
+        fake_fs(args.mounts, args.latency, args.hung, stop)
+        host = HostStats()
+        run('hoststats', host.collect, args.ticks)
+    stop.set()
+    os._exit(0)
@@ -0,0 +1,54 @@
+# Benchmark ICMP: ping3 per host di thread pool (cara lama) vs IcmpMux (1 socket, icmp.py).
+# Target-nya alamat loopback 127.0.x.y (semua dibalas kernel), jadi gak nyentuh jaringan.
+# Butuh root / CAP_NET_RAW, atau sysctl net.ipv4.ping_group_range yang mencakup grup user ini.
+# Jalankan: python benchmarks/bench_icmp.py [--hosts 5000] [--count 3] [--modes ping3,mux]
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from prober import ProbeEngine  # noqa: E402
+
+
+def targets(n):
+    return [(i, f"127.{(i >> 16) & 255}.{(i >> 8) & 255}.{i & 255}", 0) for i in range(1, n + 1)]
+
+
+def run(mode, hosts, count, rounds):
+    engine = ProbeEngine(deadline=60, icmp_count=count)
+    if mode == 'ping3':
+        if engine.icmp: engine.icmp.close()
+        engine.icmp = None
+    elif engine.icmp is None:
+        print("⚠️ Gak ada izin socket ICMP (raw/dgram), mode mux dilewati")
+        return None
+    best = None
+    for _ in range(rounds):
+        wall, cpu = time.perf_counter(), time.process_time()
+        results = engine.sweep(targets(hosts))
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        up = sum(1 for r in results.values() if r['status'] == 'UP')
+        if best is None or wall < best[0]: best = (wall, cpu, up)
+    engine.close()
+    return best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hosts', type=int, default=5000)
+    parser.add_argument('--count', type=int, default=3, help='paket per host (mode mux)')
+    parser.add_argument('--modes', default='ping3,mux')
+    parser.add_argument('--rounds', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"📊 ICMP sweep {args.hosts} host (loopback), terbaik dari {args.rounds} putaran")
+    print(f"{'mode':>6} | {'paket/host':>10} | {'waktu':>8} | {'host/dtk':>9} | {'CPU':>7} | {'UP':>6}")
+    for mode in args.modes.split(','):
+        res = run(mode, args.hosts, args.count, args.rounds)
+        if res is None: continue
+        wall, cpu, up = res
+        print(f"{mode:>6} | {1 if mode == 'ping3' else args.count:>10} | {wall:>6.2f} s | {args.hosts / wall:>9,.0f} | "
+              f"{cpu / wall:>6.0%} | {up:>6,}")
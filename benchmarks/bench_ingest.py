@@ -0,0 +1,100 @@
+# Load generator ingest agent: 1 POST per sampel (/api/agent/report) vs batch (/api/agent/bulk).
+# Default-nya nyalain NetWatch di proses ini (port acak, DB sementara); --url buat nembak server lain.
+# Jalankan: python benchmarks/bench_ingest.py [--seconds 5] [--threads 8] [--batch 50] [--agents 200]
+import argparse
+import gzip
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+METRICS = ['cpu', 'ram', 'load1', 'disk.read_bps', 'disk.write_bps', 'net.sent_bps', 'net.recv_bps', 'procs']
+
+
+def start_local_server():
+    tmp = tempfile.mkdtemp(prefix='netwatch-bench-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+    import logging
+    from werkzeug.serving import make_server
+    import netwatch
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    with netwatch.app.app_context(): netwatch.db.create_all()
+    netwatch.db_writer.start()
+    server = make_server('127.0.0.1', 0, netwatch.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_port}", netwatch
+
+
+def sample(ts):
+    return dict({'ts': ts}, **{m: round(random.uniform(0, 100), 1) for m in METRICS})
+
+
+def worker(mode, url, agents, batch, stop, counter, lock):
+    session = requests.Session()
+    n = 0
+    while not stop.is_set():
+        name = f"load-{random.choice(agents)}"
+        ts = time.time()
+        if mode == 'single':
+            s = sample(ts)
+            r = session.post(f"{url}/api/agent/report", json={'name': name, 'cpu': s['cpu'], 'ram': s['ram']})
+            sent = 1
+        else:
+            payload = {'agents': [{'name': name, 'samples': [sample(ts - i) for i in range(batch)]}]}
+            if mode == 'bulk-msgpack':
+                body, ctype = msgpack.packb(payload), 'application/msgpack'
+            else:
+                body, ctype = json.dumps(payload).encode(), 'application/json'
+            r = session.post(f"{url}/api/agent/bulk", data=gzip.compress(body),
+                             headers={'Content-Type': ctype, 'Content-Encoding': 'gzip'})
+            sent = batch
+        if r.status_code == 200: n += sent
+    with lock: counter[0] += n
+
+
+def run(mode, url, args):
+    stop, lock, counter = threading.Event(), threading.Lock(), [0]
+    agents = list(range(args.agents))
+    threads = [threading.Thread(target=worker, args=(mode, url, agents, args.batch, stop, counter, lock))
+               for _ in range(args.threads)]
+    start = time.perf_counter()
+    for t in threads: t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads: t.join()
+    return counter[0] / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help='server NetWatch yang sudah jalan (default: nyalain lokal)')
+    parser.add_argument('--seconds', type=float, default=5)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--batch', type=int, default=50, help='sampel per request bulk')
+    parser.add_argument('--agents', type=int, default=200)
+    args = parser.parse_args()
+
+    url = args.url
+    if not url: url, _ = start_local_server()
+    modes = ['single', 'bulk-json'] + (['bulk-msgpack'] if msgpack else [])
+    print(f"📊 Agent ingest load test -> {url} ({args.threads} threads, {args.seconds:.0f}s, "
+          f"{len(METRICS)} metrics/sample, batch {args.batch})")
+    base = None
+    for mode in modes:
+        rate = run(mode, url, args)
+        base = base or rate
+        print(f"{mode:>13}: {rate:>10,.0f} samples/s  ({rate / base:.1f}x)")
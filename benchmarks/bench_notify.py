@@ -0,0 +1,93 @@
+# Benchmark notifikasi: requests.post per pesan (cara lama) vs Notifier (notifier.py), lawan mock Telegram lokal.
+#   1. Berapa lama loop monitor ketahan waktu API lambat (--delay detik per request)
+#   2. Throughput kirim + jumlah koneksi TCP (keep-alive vs koneksi baru tiap pesan)
+#   3. API mati + proses "restart": pesan di outbox tetap terkirim setelah API hidup lagi
+# Jalankan: python benchmarks/bench_notify.py [--messages 300] [--delay 0.5]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_telegram import MockTelegram  # noqa: E402
+from notifier import Notifier  # noqa: E402
+
+TOKEN, CHAT = 'bench-token', '42'
+
+
+def old_send(api, text):
+    # Persis cara lama sysgaze.send_telegram_alert (plus timeout)
+    requests.post(f"{api}/bot{TOKEN}/sendMessage", data={'chat_id': CHAT, 'text': text}, timeout=10)
+
+
+def notifier(api, outbox):
+    return Notifier('bench', token=TOKEN, chat_id=CHAT, api=api, outbox=outbox, backoff=0.2, backoff_max=1)
+
+
+def caller_block(outbox, delay, alerts=5):
+    mock = MockTelegram(delay=delay).start()
+    t = time.perf_counter()
+    for i in range(alerts): old_send(mock.url, f"alert {i}")
+    old = (time.perf_counter() - t) / alerts
+    n = notifier(mock.url, outbox).start()
+    t = time.perf_counter()
+    for i in range(alerts): n.send(f"alert {i}")
+    new = (time.perf_counter() - t) / alerts
+    n.flush(60)
+    mock.stop()
+    return old, new
+
+
+def throughput(outbox, messages):
+    mock = MockTelegram().start()
+    t = time.perf_counter()
+    for i in range(messages): old_send(mock.url, f"msg {i}")
+    old = (messages / (time.perf_counter() - t), len(mock.connections))
+    mock.connections.clear()
+    n = notifier(mock.url, outbox).start()
+    t = time.perf_counter()
+    for i in range(messages): n.send(f"msg {i}")
+    n.flush(120)
+    new = (messages / (time.perf_counter() - t), len(mock.connections))
+    mock.stop()
+    return old, new
+
+
+def outage(outbox, messages=10):
+    mock = MockTelegram().start()
+    mock.down = True
+    n = notifier(mock.url, outbox).start()
+    for i in range(messages): n.send(f"down {i}")
+    time.sleep(1)
+    stored = n.pending()
+    # "Restart": notifier baru, outbox sama. API hidup lagi.
+    mock.down = False
+    fresh = notifier(mock.url, outbox).start()
+    deadline = time.time() + 30
+    while fresh.pending() and time.time() < deadline: time.sleep(0.1)
+    delivered = len({m['text'] for m in mock.messages})
+    mock.stop()
+    return stored, delivered, mock.requests
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--messages', type=int, default=300)
+    parser.add_argument('--delay', type=float, default=0.5, help='detik per request di mock (API lambat)')
+    args = parser.parse_args()
+    tmp = tempfile.mkdtemp(prefix='notify-bench-')
+
+    old, new = caller_block(os.path.join(tmp, 'a.db'), args.delay)
+    print(f"⏱️ Loop monitor ketahan per alert (API {args.delay} dtk): lama {old * 1000:,.0f} ms | notifier {new * 1000:,.2f} ms")
+    (old_rate, old_conn), (new_rate, new_conn) = throughput(os.path.join(tmp, 'b.db'), args.messages)
+    print(f"📊 {args.messages} pesan: lama {old_rate:,.0f} pesan/dtk, {old_conn} koneksi | "
+          f"notifier {new_rate:,.0f} pesan/dtk, {new_conn} koneksi")
+    stored, delivered, attempts = outage(os.path.join(tmp, 'c.db'))
+    print(f"📬 API mati: {stored} pesan nunggu di outbox -> setelah restart + API hidup: {delivered} terkirim "
+          f"({attempts} request total)")
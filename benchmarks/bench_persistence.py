@@ -0,0 +1,60 @@
+# Benchmark tulis PingHistory: commit per device (cara lama) vs WriteBuffer (bulk, 1 transaksi).
+# Jalankan: python benchmarks/bench_persistence.py [--sweeps 3] [--sizes 100,1000,10000]
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# DB sementara, jangan sampai nyentuh netwatch.db asli
+TMP_DIR = tempfile.mkdtemp(prefix='netwatch-bench-')
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(TMP_DIR, 'bench.db')}"
+
+from netwatch import app, db, PingHistory  # noqa: E402
+from storage import WriteBuffer  # noqa: E402
+
+
+def reset():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+
+
+def run_per_row(devices, sweeps):
+    reset()
+    start = time.perf_counter()
+    with app.app_context():
+        for _ in range(sweeps):
+            for dev_id in range(devices):
+                db.session.add(PingHistory(device_id=dev_id, latency=12))
+                db.session.commit()
+    return devices * sweeps / (time.perf_counter() - start)
+
+
+def run_buffered(devices, sweeps):
+    reset()
+    writer = WriteBuffer(app, db, flush_interval=3600, flush_rows=10**9, max_rows=10**9)
+    start = time.perf_counter()
+    for _ in range(sweeps):
+        now = datetime.now()
+        writer.add(PingHistory, [{'device_id': dev_id, 'latency': 12, 'timestamp': now} for dev_id in range(devices)])
+        writer.flush()
+    return devices * sweeps / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sweeps', type=int, default=3)
+    parser.add_argument('--sizes', default='100,1000,10000')
+    args = parser.parse_args()
+
+    print(f"📊 PingHistory write benchmark ({args.sweeps} sweeps, db: {TMP_DIR})")
+    print(f"{'devices':>8} | {'per-row rows/s':>15} | {'buffered rows/s':>15} | {'speedup':>7}")
+    for n in [int(x) for x in args.sizes.split(',')]:
+        old = run_per_row(n, args.sweeps)
+        new = run_buffered(n, args.sweeps)
+        print(f"{n:>8} | {old:>15,.0f} | {new:>15,.0f} | {new / old:>6.1f}x")
@@ -0,0 +1,77 @@
+# Simulasi alarm SysGaze: threshold instan + ALERT_COOLDOWN global (cara lama) vs rule sliding window (rules.py).
+# Data sintetis 1 sampel/detik, jam palsu (gak nunggu beneran):
+#   - CPU: spike pendek 2-5 detik tiap ~3 menit + 1x beban tinggi 5 menit
+#   - RAM: naik turun di sekitar threshold
+#   - Disk C: stabil di 95% (sudah penuh), Disk D: naik pelan dari 40% (~7%/jam)
+# Jalankan: python benchmarks/bench_rules.py [--hours 6]
+import argparse
+import os
+import random
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('TELEGRAM_TOKEN', '')
+
+from rules import RuleEngine  # noqa: E402
+from sysgaze import ALERT_RULES, CPU_THRESHOLD, DISK_THRESHOLD, RAM_THRESHOLD  # noqa: E402
+
+
+def stream(seconds, seed=1):
+    rng = random.Random(seed)
+    spike_until, next_spike = 0, rng.randint(60, 300)
+    for t in range(seconds):
+        if t >= next_spike:
+            spike_until, next_spike = t + rng.randint(2, 5), t + rng.randint(60, 300)
+        cpu = rng.uniform(95, 100) if t < spike_until else rng.uniform(10, 40)
+        if 7200 <= t < 7500: cpu = rng.uniform(90, 100)   # beban tinggi beneran 5 menit
+        ram = RAM_THRESHOLD + rng.uniform(-3, 1.5)
+        disk_d = min(100.0, round(40 + t * 7 / 3600 + rng.uniform(-0.2, 0.2), 1))
+        yield t, {'cpu': round(cpu, 1), 'ram': round(ram, 1), 'disk:C:': 95.0, 'disk:D:': disk_d}
+
+
+def old_alerts(seconds, cooldown=60):
+    # Salinan logika monitor_task sebelum rules.py
+    out, last = [], -cooldown - 1
+    for t, m in stream(seconds):
+        if t - last <= cooldown: continue
+        msg = []
+        if m['cpu'] > CPU_THRESHOLD: msg.append('CPU')
+        if m['ram'] > RAM_THRESHOLD: msg.append('RAM')
+        msg += [k for k in ('disk:C:', 'disk:D:') if m[k] > DISK_THRESHOLD]
+        if msg:
+            out.append((t, msg))
+            last = t
+    return out
+
+
+def new_alerts(seconds):
+    engine = RuleEngine(ALERT_RULES)
+    out, cost = [], 0.0
+    for t, m in stream(seconds):
+        start = time.perf_counter()
+        lines = engine.observe(m, now=t)
+        cost += time.perf_counter() - start
+        if lines: out.append((t, lines))
+    return out, cost / seconds, engine
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--hours', type=float, default=6)
+    args = parser.parse_args()
+    seconds = int(args.hours * 3600)
+
+    old = old_alerts(seconds)
+    new, cost, engine = new_alerts(seconds)
+    print(f"📊 {args.hours} jam data, 4 metric/detik")
+    print(f"   lama : {len(old)} pesan Telegram, {sum('CPU' in m for _, m in old)} berisi CPU")
+    print(f"   rules: {len(new)} pesan Telegram, {engine.stats['alerts']} alert + {engine.stats['resolved']} normal lagi, "
+          f"{cost * 1e6:.1f} µs per tick")
+    first_d = next((t for t, lines in new if any('D:' in line and 'penuh dalam' in line for line in lines)), None)
+    full_d = next((t for t, m in stream(seconds) if m['disk:D:'] > DISK_THRESHOLD), None)
+    print(f"   disk D: prediksi penuh dikirim di jam ke-{first_d / 3600:.1f}" if first_d is not None else "   disk D: belum diprediksi",
+          f"| threshold {DISK_THRESHOLD:.0f}% baru kena di jam ke-{full_d / 3600:.1f}" if full_d else '')
+    for t, lines in new[:12]:
+        print(f"   {t // 3600:02d}:{t % 3600 // 60:02d}:{t % 60:02d}  " + ' | '.join(lines))
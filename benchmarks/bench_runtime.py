@@ -0,0 +1,90 @@
+# Benchmark footprint: launcher.py (1 interpreter per service) vs launcher.py --unified (runtime.py, 1 proses).
+# Tiap mode dijalankan beneran, tunggu --warmup detik, lalu ukur selama --seconds detik:
+# RSS / USS total semua proses (launcher + anak-anaknya) dan CPU time yang kepakai.
+# Service yang gagal start (dependency gak ada, misal cv2 buat Commander) ikut dilaporkan.
+# Jalankan dari folder project: python benchmarks/bench_runtime.py [--warmup 15] [--seconds 30]
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+import urllib.request
+
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PORTS = {'netwatch': 5000, 'sysgaze': 5001}
+
+
+def tree(proc):
+    try:
+        return [proc] + proc.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return []
+
+
+def usage(procs):
+    rss = uss = cpu = 0.0
+    alive = 0
+    for p in procs:
+        try:
+            if p.status() == psutil.STATUS_ZOMBIE: continue   # service yang crash waktu start (belum di-reap launcher)
+            mem = p.memory_full_info()
+            t = p.cpu_times()
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            continue
+        rss += mem.rss
+        uss += getattr(mem, 'uss', mem.rss)
+        cpu += t.user + t.system
+        alive += 1
+    return {'rss': rss, 'uss': uss, 'cpu': cpu, 'procs': alive}
+
+
+def port_up(port):
+    try:
+        urllib.request.urlopen(f"http://127.0.0.1:{port}/login", timeout=1)
+        return True
+    except Exception as e:
+        return getattr(e, 'code', None) is not None   # 4xx/5xx = server tetap hidup
+
+
+def run(label, args, warmup, seconds):
+    env = dict(os.environ, PYTHONUNBUFFERED='1')
+    proc = subprocess.Popen([sys.executable, 'launcher.py'] + args, cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    root = psutil.Process(proc.pid)
+    time.sleep(warmup)
+    before = usage(tree(root))
+    time.sleep(seconds)
+    procs = tree(root)
+    after = usage(procs)
+    up = [name for name, port in PORTS.items() if port_up(port)]
+
+    proc.send_signal(signal.SIGINT)   # sama dengan CTRL+C: launcher matikan semua anaknya
+    try:
+        proc.wait(15)
+    except subprocess.TimeoutExpired:
+        for p in procs:
+            try: p.kill()
+            except psutil.NoSuchProcess: pass
+    time.sleep(2)
+
+    cpu = (after['cpu'] - before['cpu']) / seconds * 100
+    print(f"{label:>9} | {after['procs']} proses | RSS {after['rss'] / 2**20:7.1f} MB | USS {after['uss'] / 2**20:7.1f} MB | "
+          f"CPU {cpu:5.2f}% | web hidup: {', '.join(up) or '-'}")
+    return after, cpu
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--warmup', type=float, default=15)
+    parser.add_argument('--seconds', type=float, default=30)
+    args = parser.parse_args()
+
+    print(f"📊 warmup {args.warmup:.0f} dtk, ukur {args.seconds:.0f} dtk, mode server {os.getenv('NETWATCH_ASYNC_MODE', 'threading')}")
+    old, old_cpu = run('launcher', [], args.warmup, args.seconds)
+    new, new_cpu = run('unified', ['--unified'], args.warmup, args.seconds)
+    if old['uss']:
+        print(f"   unified: USS {(1 - new['uss'] / old['uss']) * 100:.0f}% lebih hemat, "
+              f"CPU {old_cpu:.2f}% -> {new_cpu:.2f}%")
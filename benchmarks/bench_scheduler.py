@@ -0,0 +1,97 @@
+# Simulasi jadwal probe: sweep tetap tiap 3 detik (cara lama) vs ProbeScheduler adaptif.
+# Jam-nya palsu (tanpa network), jadi 1 jam simulasi selesai dalam hitungan detik.
+# Yang diukur: jumlah probe, probe yang habis ke device DOWN (= timeout terbuang) dan
+# delay deteksi perubahan status (mulai DOWN / balik UP sampai ketahuan monitor), dipisah per arah.
+# Jalankan: python benchmarks/bench_scheduler.py [--devices 1000] [--hours 1] [--flappy 0.05] [--down 0.02] [--outages 0.1]
+import argparse
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scheduler import ProbeScheduler  # noqa: E402
+
+
+def pct(values, p):
+    if not values: return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+# --- Skenario: tiap device punya daftar interval (mulai, selesai) saat dia DOWN ---
+def build_world(args, seed):
+    rng = random.Random(seed)
+    span = args.hours * 3600
+    world = {}
+    for dev_id in range(1, args.devices + 1):
+        roll, downs = rng.random(), []
+        if roll < args.down:
+            downs = [(0, span + 1)]                          # mati terus
+        elif roll < args.down + args.flappy:
+            t = rng.uniform(0, 60)
+            while t < span:                                  # link jelek: putus-nyambung
+                length = rng.uniform(5, 40)
+                downs.append((t, t + length))
+                t += length + rng.uniform(20, 300)
+        elif roll < args.down + args.flappy + args.outages:
+            t = rng.uniform(0, span - 600)                   # 1x gangguan beberapa menit
+            downs = [(t, t + rng.uniform(60, 600))]
+        world[dev_id] = downs
+    return world
+
+
+def is_down(downs, t):
+    return any(a <= t < b for a, b in downs)
+
+
+def simulate(world, hours, fixed=None):
+    span = hours * 3600
+    clock = [0.0]
+    sched = ProbeScheduler(clock=lambda: clock[0], rng=random.Random(1))
+    sched.sync({dev_id: fixed for dev_id in world})
+    seen = {dev_id: None for dev_id in world}
+    probes = down_probes = 0
+    delays = {'DOWN': [], 'UP': []}
+    while True:
+        due_at = sched.next_due()
+        if due_at is None or due_at > span: break
+        clock[0] = due_at
+        for dev_id in sched.pop_due(window=0.25):
+            downs = world[dev_id]
+            status = 'DOWN' if is_down(downs, clock[0]) else 'UP'
+            probes += 1
+            if status == 'DOWN': down_probes += 1
+            if seen[dev_id] is not None and status != seen[dev_id]:
+                # Delay = sekarang - kapan status asli terakhir berubah
+                edges = [a for a, _ in downs if a <= clock[0]] + [b for _, b in downs if b <= clock[0]]
+                delays[status].append(clock[0] - max(edges))
+            seen[dev_id] = status
+            sched.report(dev_id, status)
+    return probes, down_probes, delays
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--devices', type=int, default=1000)
+    parser.add_argument('--hours', type=float, default=1)
+    parser.add_argument('--fixed', type=float, default=3, help='interval sweep lama (detik)')
+    parser.add_argument('--flappy', type=float, default=0.05, help='porsi device putus-nyambung')
+    parser.add_argument('--down', type=float, default=0.02, help='porsi device mati terus')
+    parser.add_argument('--outages', type=float, default=0.1, help='porsi device stabil yang sempat gangguan 1x')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    world = build_world(args, args.seed)
+    print(f"📊 Probe scheduling: {args.devices} device, {args.hours:g} jam simulasi "
+          f"(flappy {args.flappy:.0%}, mati {args.down:.0%}, gangguan 1x {args.outages:.0%})")
+    print(f"{'mode':>9} | {'probe':>10} | {'probe/dtk':>9} | {'ke DOWN':>9} | {'deteksi DOWN p50/p99':>20} | {'deteksi UP p50/p99':>18}")
+    base = None
+    for mode, fixed in (('fixed', args.fixed), ('adaptive', None)):
+        probes, down_probes, delays = simulate(world, args.hours, fixed)
+        base = base or probes
+        down, up = delays['DOWN'], delays['UP']
+        print(f"{mode:>9} | {probes:>10,} | {probes / (args.hours * 3600):>9,.0f} | {down_probes:>9,} | "
+              f"{pct(down, .5):>7.1f} s / {pct(down, .99):>6.1f} s | {pct(up, .5):>6.1f} s / {pct(up, .99):>5.1f} s"
+              + (f"   ({probes / base:.0%} dari fixed)" if mode == 'adaptive' else ''))
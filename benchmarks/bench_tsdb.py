@@ -0,0 +1,85 @@
+# Bandingkan backend time-series: SQLite (baris ORM) vs Parquet+DuckDB (kolomnar).
+# Ukur: ukuran disk dan waktu agregasi 1 bulan (raw, tanpa rollup) per device.
+# Jalankan: python benchmarks/bench_tsdb.py [--devices 10] [--days 30] [--interval 30]
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+TMP_DIR = tempfile.mkdtemp(prefix='netwatch-bench-')
+DB_PATH = os.path.join(TMP_DIR, 'bench.db')
+os.environ['DATABASE_URL'] = f"sqlite:///{DB_PATH}"
+
+from netwatch import app, db, PingHistory  # noqa: E402
+from rollup import range_series  # noqa: E402
+from storage import ensure_indexes  # noqa: E402
+import tsdb  # noqa: E402
+
+
+def generate(devices, days, interval):
+    now = datetime.now().replace(microsecond=0)
+    start = now - timedelta(days=days)
+    for dev in range(1, devices + 1):
+        rows = []
+        t = start
+        while t < now:
+            rows.append({'device_id': dev, 'latency': None if random.random() < 0.02 else random.randint(5, 60), 'timestamp': t})
+            t += timedelta(seconds=interval)
+        yield rows
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(path) for f in files)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--devices', type=int, default=10)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--interval', type=int, default=30, help='detik antar sampel')
+    args = parser.parse_args()
+    if tsdb.duckdb is None:
+        sys.exit("❌ Butuh duckdb + pyarrow: pip install duckdb pyarrow")
+
+    parquet = tsdb.ParquetBackend(root=os.path.join(TMP_DIR, 'tsdb'), segment_rows=10**9)
+    total = 0
+    t_sqlite = t_parquet = 0.0
+    with app.app_context():
+        db.create_all()
+        ensure_indexes(db)
+        for rows in generate(args.devices, args.days, args.interval):
+            total += len(rows)
+            t = time.perf_counter()
+            db.session.execute(PingHistory.__table__.insert(), rows)
+            db.session.commit()
+            t_sqlite += time.perf_counter() - t
+            t = time.perf_counter()
+            parquet.write('ping', rows)
+            parquet.flush()
+            t_parquet += time.perf_counter() - t
+    parquet.compact(datetime.now() + timedelta(days=1))
+
+    end = datetime.now()
+    start = end - timedelta(days=args.days)
+    with app.app_context():
+        t = time.perf_counter()
+        for dev in range(1, args.devices + 1):
+            a = range_series(db, PingHistory, None, {'device_id': dev}, start, end, 3600)
+        q_sqlite = (time.perf_counter() - t) / args.devices * 1000
+    t = time.perf_counter()
+    for dev in range(1, args.devices + 1):
+        b = parquet.aggregate('ping', dev, start, end, 3600)
+    q_parquet = (time.perf_counter() - t) / args.devices * 1000
+
+    print(f"📊 {total:,} samples ({args.devices} devices x {args.days} days @ {args.interval}s), data: {TMP_DIR}")
+    print(f"{'backend':>8} | {'ingest rows/s':>13} | {'disk MB':>8} | {'bytes/row':>9} | {'30d agg ms':>10}")
+    for name, ingest, size, q in (('sqlite', total / t_sqlite, os.path.getsize(DB_PATH), q_sqlite),
+                                  ('parquet', total / t_parquet, dir_size(os.path.join(TMP_DIR, 'tsdb')), q_parquet)):
+        print(f"{name:>8} | {ingest:>13,.0f} | {size / 1e6:>8.1f} | {size / total:>9.1f} | {q:>10.1f}")
+    print(f"   (cek hasil sama: {len(a['values'])} vs {len(b['values'])} bucket)")
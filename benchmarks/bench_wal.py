@@ -0,0 +1,94 @@
+# Stress test baca/tulis barengan: thread writer nge-flush batch PingHistory terus-terusan
+# (kayak WriteBuffer), beberapa thread reader nembak query chart. Dibandingkan per DB_PROFILE.
+# Jalankan: python benchmarks/bench_wal.py [--seconds 10] [--readers 4] [--batch 5000]
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def pct(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100.0 * len(values)))] if values else 0
+
+
+def child(args):
+    # Dijalankan di proses terpisah biar engine/pool tiap profil bersih
+    from netwatch import app, db, PingHistory
+    from storage import ensure_indexes
+
+    with app.app_context():
+        db.create_all()
+        ensure_indexes(db)
+        now = datetime.now()
+        seed = [{'device_id': i % 200, 'latency': 10, 'timestamp': now - timedelta(seconds=i)} for i in range(200000)]
+        db.session.execute(PingHistory.__table__.insert(), seed)
+        db.session.commit()
+
+    stop = threading.Event()
+    written = [0]
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def writer():
+        with app.app_context():
+            while not stop.is_set():
+                now = datetime.now()
+                rows = [{'device_id': i % 200, 'latency': 12, 'timestamp': now} for i in range(args.batch)]
+                try:
+                    db.session.execute(PingHistory.__table__.insert(), rows)
+                    db.session.commit()
+                    written[0] += len(rows)
+                except Exception:
+                    db.session.rollback()
+
+    def reader(n):
+        with app.app_context():
+            while not stop.is_set():
+                t = time.perf_counter()
+                try:
+                    PingHistory.query.filter_by(device_id=n).order_by(PingHistory.timestamp.desc()).limit(20).all()
+                    db.session.commit()
+                    ms = (time.perf_counter() - t) * 1000
+                    with lock: latencies.append(ms)
+                except Exception:
+                    db.session.rollback()
+                    with lock: errors[0] += 1
+                time.sleep(0.01)
+
+    threads = [threading.Thread(target=writer)] + [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    for t in threads: t.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for t in threads: t.join()
+
+    print(f"{os.environ['DB_PROFILE']:>10} | {written[0] / args.seconds:>12,.0f} | {len(latencies):>7} | "
+          f"{pct(latencies, 50):>7.1f} | {pct(latencies, 99):>7.1f} | {max(latencies or [0]):>8.1f} | {errors[0]:>6}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--readers', type=int, default=4)
+    parser.add_argument('--batch', type=int, default=5000)
+    parser.add_argument('--child', action='store_true')
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        sys.exit(0)
+
+    print(f"📊 Concurrent read/write stress ({args.seconds:.0f}s, {args.readers} readers, batch {args.batch})")
+    print(f"{'profile':>10} | {'writes rows/s':>12} | {'reads':>7} | {'p50 ms':>7} | {'p99 ms':>7} | {'max ms':>8} | {'errors':>6}")
+    for profile in ('legacy', 'production'):
+        tmp = tempfile.mkdtemp(prefix='netwatch-bench-')
+        env = dict(os.environ, DB_PROFILE=profile, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        subprocess.run([sys.executable, os.path.abspath(__file__), '--child', '--seconds', str(args.seconds),
+                        '--readers', str(args.readers), '--batch', str(args.batch)], env=env, check=True)
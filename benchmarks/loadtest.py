@@ -0,0 +1,146 @@
+# Load test lokal NetWatch: banyak websocket dashboard + POST agent barengan, lapor latency p50/p99.
+# Server dinyalakan sendiri per mode (NETWATCH_ASYNC_MODE), DB-nya di folder temp.
+# Jalankan: python benchmarks/loadtest.py [--mode threading,gevent] [--sockets 1000] [--posters 50] [--seconds 10]
+#           python benchmarks/loadtest.py --url http://127.0.0.1:5000   (pakai server yang sudah jalan)
+from gevent import monkey
+monkey.patch_all()
+
+import argparse  # noqa: E402
+import json  # noqa: E402
+import os  # noqa: E402
+import random  # noqa: E402
+import socket  # noqa: E402
+import subprocess  # noqa: E402
+import sys  # noqa: E402
+import tempfile  # noqa: E402
+import time  # noqa: E402
+
+import gevent  # noqa: E402
+import requests  # noqa: E402
+import simple_websocket  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import resource
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))   # ribuan socket butuh fd banyak
+except (ImportError, ValueError, OSError):
+    pass
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(mode):
+    port = free_port()
+    tmp = tempfile.mkdtemp(prefix='netwatch-bench-')
+    env = dict(os.environ, NETWATCH_ASYNC_MODE=mode, NETWATCH_PORT=str(port),
+               DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'loadtest.db')}", TSDB_PATH=os.path.join(tmp, 'tsdb'))
+    proc = subprocess.Popen([sys.executable, 'netwatch.py'], cwd=ROOT, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    for _ in range(150):
+        try:
+            requests.get(f"{url}/login", timeout=1)
+            return proc, url
+        except requests.RequestException:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"server mode {mode} gak mau nyala")
+
+
+def pct(values, p):
+    if not values: return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+# --- 1 tab dashboard: handshake persis socket.io di browser (polling dulu, lalu upgrade ke websocket) ---
+def dashboard(url, stop, stats):
+    t0 = time.perf_counter()
+    try:
+        r = requests.get(f"{url}/socket.io/?EIO=4&transport=polling", timeout=30)
+        sid = json.loads(r.text[1:])['sid']          # "0{sid, upgrades, pingInterval, ...}"
+        ws = simple_websocket.Client.connect(url.replace('http', 'ws', 1) + f"/socket.io/?EIO=4&transport=websocket&sid={sid}")
+        ws.send('2probe')
+        if ws.receive(timeout=30) != '3probe': raise RuntimeError('upgrade gagal')
+        ws.send('5')                                  # upgrade selesai
+        ws.send('40')                                 # connect ke namespace "/"
+        while not (ws.receive(timeout=30) or '').startswith('40'): pass
+    except Exception:
+        stats['ws_errors'] += 1
+        return
+    stats['connect'].append((time.perf_counter() - t0) * 1000)
+    try:
+        while not stop.is_set():
+            msg = ws.receive(timeout=0.5)
+            if msg is None: continue
+            if msg == '2': ws.send('3')   # ping -> pong
+            elif msg.startswith('42'): stats['events'] += 1
+    except Exception:
+        stats['ws_dropped'] += 1
+    finally:
+        try: ws.close()
+        except Exception: pass
+
+
+# --- 1 agent yang lapor terus (closed loop) ---
+def poster(url, idx, stop, stats):
+    session = requests.Session()
+    while not stop.is_set():
+        t0 = time.perf_counter()
+        try:
+            r = session.post(f"{url}/api/agent/report", timeout=10,
+                             json={'name': f"LT-{idx}", 'cpu': random.randint(0, 100), 'ram': random.randint(0, 100)})
+            ok = r.status_code == 200
+        except requests.RequestException:
+            ok = False
+        if ok: stats['post'].append((time.perf_counter() - t0) * 1000)
+        else: stats['post_errors'] += 1
+
+
+def run(url, args):
+    stats = {'connect': [], 'post': [], 'events': 0, 'ws_errors': 0, 'ws_dropped': 0, 'post_errors': 0}
+    stop = gevent.event.Event()
+    sockets = []
+    for _ in range(args.sockets):
+        sockets.append(gevent.spawn(dashboard, url, stop, stats))
+        gevent.sleep(0.002)   # jangan SYN-flood backlog listen server
+    gevent.sleep(1)
+    posters = [gevent.spawn(poster, url, i, stop, stats) for i in range(args.posters)]
+    start = time.perf_counter()
+    gevent.sleep(args.seconds)
+    stop.set()
+    elapsed = time.perf_counter() - start
+    gevent.joinall(posters + sockets, timeout=15)
+    return stats, elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url', help='server NetWatch yang sudah jalan (default: nyalain lokal per mode)')
+    parser.add_argument('--mode', default='threading,gevent', help='mode server yang dibandingkan')
+    parser.add_argument('--sockets', type=int, default=1000, help='websocket dashboard barengan')
+    parser.add_argument('--posters', type=int, default=50, help='agent POST barengan')
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    print(f"📊 Load test: {args.sockets} websocket + {args.posters} agent POST, {args.seconds:.0f}s")
+    for mode in ([None] if args.url else args.mode.split(',')):
+        proc, url = (None, args.url) if args.url else start_server(mode)
+        try:
+            stats, elapsed = run(url, args)
+        finally:
+            if proc:
+                proc.terminate()
+                proc.wait(10)
+        c, p = stats['connect'], stats['post']
+        print(f"⚙️ {mode or url}")
+        print(f"   websocket : {len(c)}/{args.sockets} connect (p50 {pct(c, .5):.1f} ms | p99 {pct(c, .99):.1f} ms), "
+              f"gagal {stats['ws_errors']}, putus {stats['ws_dropped']}, event diterima {stats['events']:,}")
+        print(f"   POST agent: {len(p) / elapsed:,.0f} req/s | p50 {pct(p, .5):.1f} ms | p99 {pct(p, .99):.1f} ms | "
+              f"max {max(p, default=0):.1f} ms | error {stats['post_errors']}")
@@ -0,0 +1,111 @@
+# Mock Bot API Telegram lokal buat testing notifier.py tanpa token asli / tanpa internet.
+# Pesan yang diterima disimpan di RAM (dan di-print), bisa dibikin lambat / error / kena rate limit.
+# Jalankan: python benchmarks/mock_telegram.py [--port 8081] [--delay 0] [--fail 0] [--limit 0]
+#   lalu set TELEGRAM_API=http://127.0.0.1:8081 (TELEGRAM_TOKEN / TELEGRAM_CHAT_ID boleh isi apa aja)
+# Dari Python: mock = MockTelegram(delay=2).start(); ... mock.messages; mock.stop()
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+class MockTelegram:
+    def __init__(self, port=0, delay=0.0, fail=0.0, limit=0, verbose=False):
+        self.delay = delay      # detik per request (simulasi API lambat)
+        self.fail = fail        # 0..1, peluang balas 502
+        self.limit = limit      # max pesan per detik, lebihnya dibalas 429 + retry_after
+        self.down = False       # True = semua request dibalas 503
+        self.verbose = verbose
+        self.messages = []
+        self.requests = 0
+        self.connections = set()
+        self.lock = threading.Lock()
+        self.window = [0, 0]
+        self.server = ThreadingHTTPServer(('127.0.0.1', port), self._handler())
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _reply(self, method, fields):
+        with self.lock:
+            self.requests += 1
+            if self.down: return 503, {'ok': False, 'error_code': 503, 'description': 'Service Unavailable'}
+            if self.fail and random.random() < self.fail:
+                return 502, {'ok': False, 'error_code': 502, 'description': 'Bad Gateway'}
+            now = int(time.time())
+            if self.window[0] != now: self.window = [now, 0]
+            if self.limit and self.window[1] >= self.limit:
+                return 429, {'ok': False, 'error_code': 429, 'description': 'Too Many Requests: retry after 1',
+                             'parameters': {'retry_after': 1}}
+            self.window[1] += 1
+            if method not in ('sendMessage', 'sendPhoto'):
+                return 404, {'ok': False, 'error_code': 404, 'description': 'Not Found'}
+            if not fields.get('chat_id'):
+                return 400, {'ok': False, 'error_code': 400, 'description': 'Bad Request: chat not found'}
+            if fields.get('parse_mode') == 'Markdown' and fields.get('text', '').count('_') % 2:
+                return 400, {'ok': False, 'error_code': 400, 'description': "Bad Request: can't parse entities"}
+            message = {'method': method, 'ts': time.time(), **fields}
+            self.messages.append(message)
+            if self.verbose: print(f"📨 {method} -> {fields.get('chat_id')}: {fields.get('text') or fields.get('caption')}")
+            return 200, {'ok': True, 'result': {'message_id': len(self.messages)}}
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'   # keep-alive, biar reuse koneksi kelihatan di mock.connections
+            wbufsize = 65536                # header + body 1x kirim (kalau dipisah kena Nagle / delayed ACK 40 ms)
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                mock.connections.add(self.client_address)
+                ctype = self.headers.get('Content-Type', '')
+                if ctype.startswith('multipart/'):
+                    fields = {'file_bytes': len(body)}
+                    for part in body.split(b'--')[1:]:
+                        head, _, value = part.partition(b'\r\n\r\n')
+                        if b'name="' in head and b'filename=' not in head:
+                            name = head.split(b'name="')[1].split(b'"')[0].decode()
+                            fields[name] = value.rstrip(b'\r\n').decode(errors='replace')
+                elif ctype.startswith('application/json'):
+                    fields = json.loads(body or b'{}')
+                else:
+                    fields = {k: v[0] for k, v in parse_qs(body.decode()).items()}
+                if mock.delay: time.sleep(mock.delay)
+                code, reply = mock._reply(self.path.rsplit('/', 1)[-1], fields)
+                data = json.dumps(reply).encode()
+                self.send_response(code)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--delay', type=float, default=0.0, help='detik per request')
+    parser.add_argument('--fail', type=float, default=0.0, help='peluang 502 (0..1)')
+    parser.add_argument('--limit', type=int, default=0, help='max pesan/detik sebelum 429')
+    args = parser.parse_args()
+    mock = MockTelegram(args.port, args.delay, args.fail, args.limit, verbose=True).start()
+    print(f"🤖 Mock Telegram jalan di {mock.url} (TELEGRAM_API={mock.url})")
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt:
+        mock.stop()
@@ -0,0 +1,170 @@
+import os
+import threading
+import time
+
+from flask import request
+
+# --- KONFIGURASI BROADCAST ---
+BROADCAST_TICK = float(os.getenv('BROADCAST_TICK', '1'))                    # kirim update ke browser tiap N detik
+BROADCAST_SNAPSHOT_EVERY = float(os.getenv('BROADCAST_SNAPSHOT_EVERY', '30'))  # snapshot lengkap tiap N detik
+
+
+# ==========================================
+# BROADCASTER (COALESCE + DELTA)
+# ==========================================
+# Dulu tiap laporan agent / tiap sweep langsung emit SELURUH isi dashboard ke semua browser.
+# Sekarang update cuma ditandai, lalu tiap BROADCAST_TICK detik dikirim SATU pesan per channel
+# yang isinya hanya item yang berubah:
+#   {"seq": 42, "full": false, "changed": {key: value}, "removed": [key]}
+# Snapshot lengkap ({"seq", "full": true, "items": {...}}) dikirim:
+#   - ke semua browser tiap BROADCAST_SNAPSHOT_EVERY detik (yang ketinggalan jadi sinkron lagi)
+#   - ke satu browser yang minta lewat event 'resync' (baru connect / seq-nya bolong)
+class Channel:
+    def __init__(self, name, source=None):
+        self.name = name
+        self.source = source     # source(keys) -> {key: value}; keys=None = semua
+        self.state = {}          # key -> value terakhir yang sudah dikirim
+        self.pending = {}        # key -> value baru (push)
+        self.touched = set()     # key yang nilainya perlu diambil dari source (pull)
+        self.removed = set()
+        self.seq = 0
+
+
+class Broadcaster:
+    def __init__(self, socketio, tick=BROADCAST_TICK, snapshot_every=BROADCAST_SNAPSHOT_EVERY, local=False):
+        self.socketio = socketio
+        # local=True: emit cuma ke browser yang nyambung ke proses ini (mode cluster, tiap proses web
+        # punya broadcaster + seq sendiri, jadi gak boleh diteruskan ke message queue)
+        self.local = local
+        self.tick = tick
+        self.snapshot_every = snapshot_every
+        self.channels = {}
+        self.lock = threading.Lock()
+        self.running = False
+        self.stats = {'ticks': 0, 'deltas': 0, 'snapshots': 0, 'resyncs': 0, 'items': 0}
+        socketio.on_event('resync', self._on_resync)
+
+    def channel(self, name, source=None):
+        self.channels[name] = Channel(name, source)
+        return self
+
+    def start(self):
+        if self.running: return self
+        self.running = True
+        self.socketio.start_background_task(self._run)
+        return self
+
+    # --- sisi producer (monitor / endpoint agent) ---
+    def update(self, name, items):
+        # Push nilai baru: {key: value}
+        ch = self.channels[name]
+        with self.lock:
+            for key, value in items.items():
+                key = str(key)
+                ch.pending[key] = value
+                ch.removed.discard(key)
+
+    def touch(self, name, keys):
+        # Tandai key berubah, nilainya diambil dari source pas tick (laporan beruntun cuma dihitung sekali)
+        ch = self.channels[name]
+        with self.lock:
+            for key in keys:
+                key = str(key)
+                ch.touched.add(key)
+                ch.removed.discard(key)
+
+    def remove(self, name, keys):
+        ch = self.channels[name]
+        with self.lock:
+            for key in keys:
+                key = str(key)
+                ch.pending.pop(key, None)
+                ch.touched.discard(key)
+                ch.removed.add(key)
+
+    # --- tick ---
+    def _run(self):
+        last_snapshot = time.time()
+        while self.running:
+            self.socketio.sleep(self.tick)
+            try:
+                self.flush()
+                if time.time() - last_snapshot >= self.snapshot_every:
+                    last_snapshot = time.time()
+                    for name in self.channels: self.send_snapshot(name)
+            except Exception as e:
+                print(f"❌ Broadcaster error: {e}")
+
+    def flush(self):
+        sent = 0
+        for ch in self.channels.values():
+            msg = self._delta(ch)
+            if msg is None: continue
+            self._emit(ch.name, msg)
+            self.stats['deltas'] += 1
+            sent += 1
+        self.stats['ticks'] += 1
+        return sent
+
+    def _delta(self, ch):
+        with self.lock:
+            touched, ch.touched = ch.touched, set()
+            pending, ch.pending = ch.pending, {}
+            removed, ch.removed = ch.removed, set()
+        if touched and ch.source is not None:
+            try:
+                fresh = {str(k): v for k, v in ch.source(list(touched)).items()}
+            except Exception:
+                self._restore(ch, touched, pending, removed)
+                raise
+            for key in touched:
+                if key in fresh: pending.setdefault(key, fresh[key])
+                else: removed.add(key)   # source udah gak punya (misal agent di-evict)
+
+        with self.lock:
+            # Cuma yang nilainya beda dari yang terakhir dikirim
+            changed = {k: v for k, v in pending.items() if ch.state.get(k) != v}
+            removed = [k for k in removed if k in ch.state]
+            if not changed and not removed: return None
+            ch.state.update(changed)
+            for key in removed: del ch.state[key]
+            ch.seq += 1
+            self.stats['items'] += len(changed)
+            return {'seq': ch.seq, 'full': False, 'changed': changed, 'removed': removed}
+
+    def _restore(self, ch, touched, pending, removed):
+        # Source error: key yang sudah diambil dikembalikan biar ikut tick berikutnya (bukan nunggu snapshot 30 dtk).
+        # Yang masuk selama source jalan lebih baru, jadi gak ditimpa.
+        with self.lock:
+            for key in touched:
+                if key not in ch.removed: ch.touched.add(key)
+            for key, value in pending.items():
+                if key not in ch.removed: ch.pending.setdefault(key, value)
+            for key in removed:
+                if key not in ch.pending and key not in ch.touched: ch.removed.add(key)
+
+    def snapshot(self, name):
+        ch = self.channels[name]
+        with self.lock:
+            seq, items = ch.seq, dict(ch.state)
+        # Channel ber-source: ambil langsung dari sumbernya (bisa ada yang belum pernah di-touch di proses ini).
+        # seq dibaca duluan, jadi isi snapshot paling-paling lebih baru dari seq-nya, gak pernah lebih lama.
+        if ch.source is not None:
+            items = {str(k): v for k, v in ch.source(None).items()}
+        return {'seq': seq, 'full': True, 'items': items}
+
+    def send_snapshot(self, name, to=None):
+        msg = self.snapshot(name)
+        self._emit(name, msg, to)
+        self.stats['snapshots'] += 1
+
+    def _on_resync(self, name=None):
+        names = [name] if name in self.channels else list(self.channels)
+        self.stats['resyncs'] += 1
+        for n in names:
+            self._emit(n, self.snapshot(n), request.sid)
+
+    def _emit(self, name, msg, to=None):
+        extra = {'ignore_queue': True} if self.local else {}
+        if to is None: self.socketio.emit(name, msg, **extra)
+        else: self.socketio.emit(name, msg, to=to, **extra)
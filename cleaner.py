@@ -6,6 +6,8 @@ from datetime import datetime
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
 
+import heartbeat
+
 # --- KONFIGURASI PATH ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DOWNLOADS_DIR = os.path.join(os.path.expanduser("~"), "Downloads")
@@ -136,7 +138,10 @@ def start_watchdog():
     observer.schedule(event_handler, DOWNLOADS_DIR, recursive=False)
     observer.start()
     try:
-        while True: time.sleep(1)
+        while True:
+            time.sleep(1)
+            # Heartbeat ke launcher.py cuma kalau observer masih hidup (thread watchdog bisa mati diam-diam)
+            if observer.is_alive(): heartbeat.beat()
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
@@ -144,15 +149,21 @@ def start_watchdog():
 # ==========================================
 # MAIN EXECUTION
 # ==========================================
-if __name__ == "__main__":
+def start():
     # 1. Jalankan Sapu Jagat (Rapikan folder utama)
     sweep_root_folder()
     
     # 2. Jalankan Penghapus File Tua
     clean_old_archives()
 
+def serve():
+    start_watchdog()
+
+if __name__ == "__main__":
+    start()
+
     # 3. Cek Mode (Bot atau Manual)
     if len(sys.argv) > 1 and sys.argv[1] == "once":
         print("\n🤖 Mode Bot: Tugas Selesai. Exiting...")
     else:
-        start_watchdog()
\ No newline at end of file
+        serve()
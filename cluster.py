@@ -0,0 +1,249 @@
+import bisect
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import socketio
+
+# --- KONFIGURASI CLUSTER ---
+# Default semua jalan di 1 proses (NETWATCH_ROLE=all, tanpa message queue) = perilaku lama.
+# Multi-proses: tiap proses pilih role-nya, semua nyambung lewat NETWATCH_MQ yang sama.
+#   web    : dashboard + websocket (fan-out ke browser)
+#   ingest : /api/agent/* (laporan agent)
+#   prober : sweep device milik shard-nya (consistent hashing device_id)
+NETWATCH_ROLE = os.getenv('NETWATCH_ROLE', 'all')
+NETWATCH_MQ = os.getenv('NETWATCH_MQ', '')                # sqlite:///cluster.db atau redis://host:6379/0
+NETWATCH_STATE = os.getenv('NETWATCH_STATE', '')          # file SQLite shared state (default: ikut NETWATCH_MQ / cluster.db)
+NETWATCH_WORKER = int(os.getenv('NETWATCH_WORKER', '0'))  # nomor prober ini (0..NETWATCH_PROBERS-1)
+NETWATCH_PROBERS = int(os.getenv('NETWATCH_PROBERS', '1'))
+MQ_POLL = float(os.getenv('MQ_POLL', '0.05'))             # detik, interval polling queue SQLite
+MQ_RETENTION = float(os.getenv('MQ_RETENTION', '60'))     # detik, pesan lama di queue SQLite dibuang
+
+ROLES = ('web', 'ingest', 'prober')
+CLUSTER_EVENT = '__netwatch_cluster__'   # pesan internal antar proses, gak pernah sampai ke browser
+
+
+def _sqlite_path(url):
+    return url[len('sqlite:///'):] if url.startswith('sqlite:///') else url
+
+
+def _connect(path):
+    con = sqlite3.connect(path, timeout=15, isolation_level=None, check_same_thread=False)
+    con.execute('PRAGMA journal_mode=WAL')
+    con.execute('PRAGMA synchronous=NORMAL')
+    return con
+
+
+# ==========================================
+# MESSAGE QUEUE SOCKET.IO
+# ==========================================
+# Pesan internal (CLUSTER_EVENT) dibelokkan ke callback lokal, sisanya diproses seperti biasa
+# (emit dari proses mana pun sampai ke browser yang nyambung di proses web mana pun).
+class ClusterMixin:
+    on_cluster = None
+    relay = True   # False: proses tanpa browser (prober murni) cuma butuh pesan internal
+
+    def _handle_emit(self, message):
+        if message.get('event') == CLUSTER_EVENT:
+            if self.on_cluster:
+                data = message['data']
+                self.on_cluster(data[0] if isinstance(data, list) else data)
+            return
+        if self.relay: super()._handle_emit(message)
+
+
+class SQLiteManager(ClusterMixin, socketio.PubSubManager):
+    # Pengganti Redis buat 1 mesin: tabel append-only di file SQLite (WAL), di-poll tiap MQ_POLL detik.
+    # Payload JSON, bukan pickle: siapa pun yang bisa nulis cluster.db gak boleh bisa jalanin kode di proses lain.
+    name = 'sqlite'
+
+    def __init__(self, url='sqlite:///cluster.db', channel='socketio', write_only=False, logger=None, json=None):
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self.path = _sqlite_path(url)
+        self.local = threading.local()
+        self.last_cleanup = 0
+        con = self._con()
+        con.execute('CREATE TABLE IF NOT EXISTS mq_messages (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                    'channel TEXT NOT NULL, payload BLOB NOT NULL, created REAL NOT NULL)')
+
+    def _con(self):
+        con = getattr(self.local, 'con', None)
+        if con is None: con = self.local.con = _connect(self.path)
+        return con
+
+    def _publish(self, data):
+        con = self._con()
+        now = time.time()
+        con.execute('INSERT INTO mq_messages (channel, payload, created) VALUES (?, ?, ?)',
+                    (self.channel, self.json.dumps(data), now))
+        if now - self.last_cleanup > MQ_RETENTION:
+            self.last_cleanup = now
+            con.execute('DELETE FROM mq_messages WHERE created < ?', (now - MQ_RETENTION,))
+
+    def _listen(self):
+        con = self._con()
+        # Cuma pesan baru (yang lama sudah basi buat browser)
+        last = con.execute('SELECT COALESCE(MAX(id), 0) FROM mq_messages').fetchone()[0]
+        while True:
+            rows = con.execute('SELECT id, payload FROM mq_messages WHERE id > ? AND channel = ? ORDER BY id',
+                               (last, self.channel)).fetchall()
+            for msg_id, payload in rows:
+                last = msg_id
+                yield payload   # JSON (sama dengan Redis manager), di-decode PubSubManager._thread pakai self.json
+            if not rows: self.server.sleep(MQ_POLL)
+
+
+class RedisManager(ClusterMixin, socketio.RedisManager):
+    pass
+
+
+def client_manager(url=NETWATCH_MQ, on_cluster=None, write_only=False, relay=True):
+    if not url: return None
+    if url.startswith('redis'): mgr = RedisManager(url, write_only=write_only)
+    elif url.startswith('sqlite'): mgr = SQLiteManager(url, write_only=write_only)
+    else: raise ValueError(f"NETWATCH_MQ gak dikenal: {url}")
+    mgr.on_cluster = on_cluster
+    mgr.relay = relay
+    return mgr
+
+
+# ==========================================
+# SHARED STATE
+# ==========================================
+# Pengganti global per proses (status device, speedtest, snapshot agent): key/value JSON di SQLite,
+# dikelompokkan per namespace. Semua proses baca/tulis file yang sama.
+class SharedState:
+    def __init__(self, path):
+        self.path = path
+        self.local = threading.local()
+        self._con().execute('CREATE TABLE IF NOT EXISTS shared_state (ns TEXT NOT NULL, key TEXT NOT NULL, '
+                            'value TEXT NOT NULL, updated REAL NOT NULL, PRIMARY KEY (ns, key))')
+
+    def _con(self):
+        con = getattr(self.local, 'con', None)
+        if con is None: con = self.local.con = _connect(self.path)
+        return con
+
+    def set_many(self, ns, items):
+        if not items: return
+        now = time.time()
+        con = self._con()
+        with con:
+            con.execute('BEGIN')
+            con.executemany('INSERT OR REPLACE INTO shared_state (ns, key, value, updated) VALUES (?, ?, ?, ?)',
+                            [(ns, str(k), json.dumps(v, default=str), now) for k, v in items.items()])
+
+    def get_many(self, ns, keys=None):
+        con = self._con()
+        if keys is None:
+            rows = con.execute('SELECT key, value FROM shared_state WHERE ns = ?', (ns,)).fetchall()
+        else:
+            keys = [str(k) for k in keys]
+            rows = []
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                rows += con.execute(f"SELECT key, value FROM shared_state WHERE ns = ? AND key IN ({','.join('?' * len(chunk))})",
+                                    [ns] + chunk).fetchall()
+        return {k: json.loads(v) for k, v in rows}
+
+    def get(self, ns, key, default=None):
+        return self.get_many(ns, [key]).get(str(key), default)
+
+    def delete(self, ns, keys, older_than=None):
+        # older_than: cuma hapus yang gak di-update selama N detik (proses lain mungkin masih nulis)
+        con = self._con()
+        gone = []
+        with con:
+            con.execute('BEGIN')
+            for key in map(str, keys):
+                if older_than is None:
+                    cur = con.execute('DELETE FROM shared_state WHERE ns = ? AND key = ?', (ns, key))
+                else:
+                    cur = con.execute('DELETE FROM shared_state WHERE ns = ? AND key = ? AND updated < ?',
+                                      (ns, key, time.time() - older_than))
+                if cur.rowcount: gone.append(key)
+        return gone
+
+
+# ==========================================
+# CONSISTENT HASHING (SHARD PROBER)
+# ==========================================
+# Tiap prober dapat titik-titik virtual di ring; device milik titik pertama searah jarum jam.
+# Tambah/kurang prober cuma mindahin ~1/N device, bukan ngocok ulang semuanya.
+class HashRing:
+    def __init__(self, nodes, vnodes=64):
+        self.ring = sorted((_hash(f"{node}#{i}"), node) for node in nodes for i in range(vnodes))
+        self.points = [h for h, _ in self.ring]
+
+    def owner(self, key):
+        i = bisect.bisect(self.points, _hash(str(key))) % len(self.ring)
+        return self.ring[i][1]
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], 'big')
+
+
+# ==========================================
+# CLUSTER
+# ==========================================
+class Cluster:
+    def __init__(self, role=NETWATCH_ROLE, mq=NETWATCH_MQ, state=NETWATCH_STATE,
+                 worker=NETWATCH_WORKER, probers=NETWATCH_PROBERS):
+        roles = {r.strip() for r in role.split(',') if r.strip()}
+        self.roles = set(ROLES) if 'all' in roles else roles
+        unknown = self.roles - set(ROLES)
+        if unknown: raise ValueError(f"NETWATCH_ROLE gak dikenal: {', '.join(sorted(unknown))}")
+        if 'prober' in self.roles and not 0 <= worker < probers:
+            # Nomor di luar ring = gak kebagian device sama sekali, diam-diam gak nge-probe apa pun
+            raise ValueError(f"NETWATCH_WORKER={worker} harus 0..{probers - 1} (NETWATCH_PROBERS={probers})")
+        self.mq = mq
+        self.enabled = bool(mq)
+        self.worker = worker
+        self.node = f"prober-{worker}"
+        self.ring = HashRing([f"prober-{i}" for i in range(max(1, probers))])
+        self.state = None
+        if self.enabled:
+            path = state or (_sqlite_path(mq) if mq.startswith('sqlite') else 'cluster.db')
+            self.state = SharedState(path)
+        self.handlers = {}
+
+    def has(self, role):
+        return role in self.roles
+
+    @property
+    def leader(self):
+        # Tugas yang cukup 1 proses (rollup, retensi, compaction): prober nomor 0
+        return self.has('prober') and self.worker == 0
+
+    def owns(self, device_id):
+        return self.ring.owner(device_id) == self.node
+
+    def client_manager(self):
+        # Proses tanpa role web gak punya browser: ingest cukup nulis ke queue,
+        # prober ikut dengerin buat pesan internal (misal device dihapus di proses web)
+        return client_manager(self.mq, on_cluster=self._dispatch, write_only=not (self.has('web') or self.has('prober')),
+                              relay=self.has('web'))
+
+    def listen(self, sio):
+        # Manager socket.io baru mulai baca queue waktu browser pertama nyambung; prober gak pernah dapat browser
+        server = sio.server
+        if self.enabled and not server.manager_initialized:
+            server.manager_initialized = True
+            server.manager.initialize()
+
+    # --- notifikasi antar proses ---
+    def on(self, kind, handler):
+        self.handlers[kind] = handler
+
+    def publish(self, sio, kind, **payload):
+        sio.emit(CLUSTER_EVENT, dict(payload, kind=kind))
+
+    def _dispatch(self, data):
+        handler = self.handlers.get(data.get('kind'))
+        if handler:
+            try: handler(data)
+            except Exception as e: print(f"❌ Cluster handler error: {e}")
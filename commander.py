@@ -19,6 +19,9 @@ import cleaner
 import google.generativeai as genai
 import PIL.Image  
 
+import heartbeat
+from notifier import Notifier
+
 # --- IMPORT FITUR REPORT ---
 try:
     from reporter import generate_pdf
@@ -37,11 +40,23 @@ except:
     MY_CHAT_ID = 0
 
 if not TELEGRAM_TOKEN:
-    print("❌ ERROR FATAL: Token Telegram tidak ditemukan di .env!")
-    exit()
+    # Raise, bukan exit(): di mode --unified (runtime.py) cuma Commander yang di-skip, service lain tetap jalan
+    raise RuntimeError("❌ ERROR FATAL: Token Telegram tidak ditemukan di .env!")
 
 # --- [PENTING] INISIALISASI BOT DISINI ---
-bot = telebot.TeleBot(TELEGRAM_TOKEN)
+class HeartbeatBot(telebot.TeleBot):
+    # Heartbeat ke launcher.py dari loop polling itu sendiri: tiap getUpdates (long poll maks 60 dtk) mulai
+    # dan selesai / error = loop masih jalan. Kalau polling nyangkut, heartbeat berhenti dan Commander di-restart.
+    def get_updates(self, *args, **kwargs):
+        heartbeat.beat()
+        try:
+            return super().get_updates(*args, **kwargs)
+        finally:
+            heartbeat.beat()
+
+bot = HeartbeatBot(TELEGRAM_TOKEN)
+# Alert otomatis (sentry) lewat antrian + outbox, balasan command tetap langsung lewat bot
+notifier = Notifier('commander', token=TELEGRAM_TOKEN, chat_id=MY_CHAT_ID)
 
 # --- GLOBAL VARIABLES ---
 SENTRY_ACTIVE = False
@@ -109,10 +124,7 @@ def sentry_mode_task():
             file_ts = datetime.now().strftime("%H%M%S")
             filepath = os.path.join(WEBCAM_DIR, f"INTRUDER_{file_ts}.jpg")
             cv2.imwrite(filepath, frame1)
-            try:
-                with open(filepath, 'rb') as photo:
-                    bot.send_photo(MY_CHAT_ID, photo, caption="🚨 <b>SENTRY ALERT!</b>", parse_mode="HTML")
-            except: pass
+            notifier.send_photo(filepath, caption="🚨 <b>SENTRY ALERT!</b>", parse_mode="HTML")
             time.sleep(5)
             ret, frame1 = cap.read()
             ret, frame2 = cap.read()
@@ -126,14 +138,25 @@ def sentry_mode_task():
 # ==========================================
 # 📡 FUNGSI PELAPOR (SYS GAZE REPORTER)
 # ==========================================
+AGENT_NAME = 'COMMANDER-LAPTOP'
+
+# Mode --unified (runtime.py): di-set ke MetricsBus, CPU/RAM ambil dari sampel bersama, bukan psutil sendiri
+metrics_bus = None
+
+def read_host_metrics(interval=None):
+    if metrics_bus is not None:
+        snap = metrics_bus.collect()
+        return snap['cpu'], snap['ram_percent']
+    return psutil.cpu_percent(interval=interval), psutil.virtual_memory().percent
+
 def task_report_to_dashboard():
     time.sleep(3) 
+    session = requests.Session()   # 1 koneksi keep-alive, bukan koneksi baru tiap 2 detik
     while True:
         try:
-            cpu = psutil.cpu_percent()
-            ram = psutil.virtual_memory().percent
-            payload = {'name': 'COMMANDER-LAPTOP', 'cpu': cpu, 'ram': ram}
-            requests.post("http://127.0.0.1:5000/api/agent/report", json=payload, timeout=1)
+            cpu, ram = read_host_metrics()
+            payload = {'name': AGENT_NAME, 'cpu': cpu, 'ram': ram}
+            session.post("http://127.0.0.1:5000/api/agent/report", json=payload, timeout=1)
         except: pass 
         time.sleep(2)
 
@@ -379,8 +402,7 @@ def send_report_pdf(message):
 @bot.message_handler(commands=['status'])
 def check_status(message):
     if not is_authorized(message): return
-    cpu = psutil.cpu_percent(interval=1)
-    ram = psutil.virtual_memory().percent
+    cpu, ram = read_host_metrics(interval=1)
     bot.reply_to(message, f"📊 **STATUS:**\n🔥 CPU: {cpu}%\n💾 RAM: {ram}%")
 
 @bot.message_handler(commands=['public'])
@@ -475,11 +497,15 @@ def handle_text_message(message):
     bot.reply_to(message, ai_reply) 
 
 # --- MAIN LOOP ---
-if __name__ == "__main__":
-    t_report = threading.Thread(target=task_report_to_dashboard)
-    t_report.daemon = True 
-    t_report.start()
-    
+def start(report=True):
+    # report=False: mode --unified, laporan CPU/RAM ke dashboard dikirim runtime.py langsung (tanpa HTTP)
+    if report:
+        t_report = threading.Thread(target=task_report_to_dashboard)
+        t_report.daemon = True 
+        t_report.start()
+    notifier.start()
+
+def serve():
     print("🔄 Menghubungkan ke Server Telegram...")
     while True:
         try:
@@ -489,4 +515,8 @@ if __name__ == "__main__":
             time.sleep(1)
         except Exception as e:
             print(f"❌ Error: {e}")
-            time.sleep(5)
\ No newline at end of file
+            time.sleep(5)
+
+if __name__ == "__main__":
+    start()
+    serve()
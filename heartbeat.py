@@ -0,0 +1,25 @@
+import os
+import time
+
+# --- KONFIGURASI HEARTBEAT ---
+# HEARTBEAT_FILE di-set launcher.py per service yang gak punya port HTTP (Commander, Cleaner).
+# beat() dipanggil dari loop utama service (bukan thread terpisah), jadi loop yang nyangkut = heartbeat berhenti.
+# Kosong (jalan manual / mode --unified) = semua fungsi di sini gak ngapa-ngapain.
+HEARTBEAT_FILE = os.getenv('HEARTBEAT_FILE', '')
+HEARTBEAT_INTERVAL = float(os.getenv('HEARTBEAT_INTERVAL', '5'))   # detik antar tulis file
+
+_last = 0.0
+
+
+def beat(force=False):
+    # Panggil dari loop utama service: file cuma ditulis tiap HEARTBEAT_INTERVAL, sisanya return doang
+    global _last
+    if not HEARTBEAT_FILE: return
+    now = time.time()
+    if not force and now - _last < HEARTBEAT_INTERVAL: return
+    _last = now
+    try:
+        with open(HEARTBEAT_FILE, 'w') as f: f.write(f"{os.getpid()} {now:.0f}")
+    except OSError as e:
+        print(f"⚠️ Heartbeat gagal ditulis: {e}")
+
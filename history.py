@@ -0,0 +1,113 @@
+import math
+import os
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_right
+
+# --- KONFIGURASI HISTORY ---
+HISTORY_SECONDS = int(os.getenv('HISTORY_SECONDS', '3600'))       # sampel disimpan (1 sampel/detik = 1 jam)
+HISTORY_MAX_SERIES = int(os.getenv('HISTORY_MAX_SERIES', '32'))   # batas jumlah metric (cpu, ram, disk:*)
+
+MAGIC = b'SGH1'
+NAN = float('nan')
+
+
+class RingBuffer:
+    # Buffer melingkar di atas array.array: ukurannya tetap dari awal (capacity x itemsize byte),
+    # append O(1) tanpa alokasi baru, sampel paling lama otomatis ketimpa
+    def __init__(self, capacity, typecode='f', fill=NAN):
+        self.capacity = capacity
+        self.data = array(typecode, [fill]) * capacity
+        self.head = 0    # posisi tulis berikutnya
+        self.count = 0
+
+    def append(self, v):
+        self.data[self.head] = v
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity: self.count += 1
+
+    def ordered(self, last=None):
+        # last N sampel (default semua), urut dari yang paling lama, hasilnya array baru
+        n = self.count if last is None else min(last, self.count)
+        start = (self.head - n) % self.capacity
+        if start + n <= self.capacity: return self.data[start:start + n]
+        return self.data[start:] + self.data[:self.head]
+
+    def nbytes(self):
+        return self.capacity * self.data.itemsize
+
+
+# ==========================================
+# HISTORY METRIC (BUAT BACKFILL CHART)
+# ==========================================
+# 1 ring timestamp (float64) + 1 ring per metric (float32), semua sejajar: sampel ke-i di tiap ring
+# punya timestamp yang sama. Metric yang baru muncul / gak ada di sampel tertentu diisi NaN.
+# Memori per metric = HISTORY_SECONDS x 4 byte, gak tumbuh.
+#
+# Format pack() (little-endian), dibaca langsung jadi Float64Array / Float32Array di browser:
+#   'SGH1' | uint32 jumlah sampel | uint16 jumlah metric | per metric: uint8 panjang nama + nama utf-8
+#   | padding sampai kelipatan 8 | float64[n] timestamp (detik) | float32[n] per metric, urut sesuai nama
+class MetricHistory:
+    def __init__(self, capacity=HISTORY_SECONDS, max_series=HISTORY_MAX_SERIES):
+        self.capacity = capacity
+        self.max_series = max_series
+        self.ts = RingBuffer(capacity, 'd', 0.0)
+        self.series = {}
+        self.lock = threading.Lock()
+
+    def record(self, ts, values):
+        with self.lock:
+            for name in values:
+                if name not in self.series and len(self.series) < self.max_series:
+                    ring = self.series[name] = RingBuffer(self.capacity)
+                    # Sejajarkan dengan ring timestamp: sampel sebelumnya dianggap kosong
+                    ring.head, ring.count = self.ts.head, self.ts.count
+            self.ts.append(ts)
+            for name, ring in self.series.items():
+                v = values.get(name)
+                ring.append(NAN if v is None else v)
+
+    def forget(self, name):
+        # Metric yang hilang (disk di-unmount) dibuang biar slot HISTORY_MAX_SERIES-nya bisa dipakai lagi
+        with self.lock: self.series.pop(name, None)
+
+    def pack(self, since=None):
+        with self.lock:
+            times = self.ts.ordered()
+            if since is not None:
+                times = times[bisect_right(times, since):]
+            n = len(times)
+            names = list(self.series)
+            columns = [self.series[name].ordered(n) for name in names]
+        head = MAGIC + struct.pack('<IH', n, len(names))
+        for name in names:
+            # Dipotong di batas karakter: byte UTF-8 setengah bikin TextDecoder di browser salah baca nama
+            raw = name.encode()[:255].decode('utf-8', 'ignore').encode()
+            head += struct.pack('<B', len(raw)) + raw
+        head += b'\0' * (-len(head) % 8)
+        if sys.byteorder == 'big':
+            for arr in [times] + columns: arr.byteswap()
+        return b''.join([head, times.tobytes()] + [col.tobytes() for col in columns])
+
+    def nbytes(self):
+        return self.ts.nbytes() + sum(ring.nbytes() for ring in self.series.values())
+
+
+def unpack(blob):
+    # Kebalikan pack() (buat testing / benchmark): {'ts': [...], 'cpu': [...], ...}, NaN -> None
+    if blob[:4] != MAGIC: raise ValueError('bukan snapshot history')
+    n, count = struct.unpack_from('<IH', blob, 4)
+    pos, names = 10, []
+    for _ in range(count):
+        size = blob[pos]
+        names.append(blob[pos + 1:pos + 1 + size].decode())
+        pos += 1 + size
+    pos += -pos % 8
+    out = {'ts': list(struct.unpack_from(f'<{n}d', blob, pos))}
+    pos += 8 * n
+    for name in names:
+        out[name] = [None if math.isnan(v) else v for v in struct.unpack_from(f'<{n}f', blob, pos)]
+        pos += 4 * n
+    return out
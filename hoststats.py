@@ -0,0 +1,138 @@
+import os
+import select
+import sys
+import time
+
+import psutil
+
+import serving
+
+# --- KONFIGURASI HOST STATS ---
+HOSTSTATS_MOUNT_REFRESH = float(os.getenv('HOSTSTATS_MOUNT_REFRESH', '60'))   # detik, baca ulang daftar partisi
+HOSTSTATS_DISK_INTERVAL = float(os.getenv('HOSTSTATS_DISK_INTERVAL', '5'))    # detik antar sampel disk_usage per mount
+HOSTSTATS_DISK_TIMEOUT = float(os.getenv('HOSTSTATS_DISK_TIMEOUT', '2'))      # mount yang gak jawab segini = hang
+HOSTSTATS_WORKERS = int(os.getenv('HOSTSTATS_WORKERS', '8'))                  # thread OS buat disk_usage / partisi
+
+MOUNTS_FILE = '/proc/self/mounts'
+
+
+class MountWatcher:
+    # Linux: /proc/self/mounts ngasih "exceptional condition" di select() tiap tabel mount berubah,
+    # jadi gak perlu baca ulang daftar partisi tiap detik. OS lain: cuma pakai HOSTSTATS_MOUNT_REFRESH.
+    def __init__(self):
+        self.file = None
+        if sys.platform.startswith('linux'):
+            try:
+                self.file = open(MOUNTS_FILE)
+                self.file.read()
+            except OSError:
+                self.file = None
+
+    def changed(self):
+        if self.file is None: return False
+        try:
+            _, _, exc = select.select([], [], [self.file], 0)
+        except (OSError, ValueError):
+            return False
+        if not exc: return False
+        self.file.seek(0)
+        self.file.read()   # event di-reset dengan baca ulang dari awal
+        return True
+
+
+# ==========================================
+# HOST STATS (CPU / RAM / DISK / UPTIME)
+# ==========================================
+# collect() gak pernah nunggu disk: disk_usage tiap mount jalan di thread OS sendiri (serving.native_executor),
+# hasilnya diambil kalau sudah selesai. Mount yang belum jawab > HOSTSTATS_DISK_TIMEOUT (NFS / SMB hang)
+# ditandai timeout dan gak dikirimi request baru sampai request lamanya balik.
+# Daftar partisi di-cache, dibaca ulang kalau tabel mount berubah atau tiap HOSTSTATS_MOUNT_REFRESH.
+# Nilai statis (boot time, total RAM) dihitung sekali aja.
+class HostStats:
+    def __init__(self, mount_refresh=HOSTSTATS_MOUNT_REFRESH, disk_interval=HOSTSTATS_DISK_INTERVAL,
+                 disk_timeout=HOSTSTATS_DISK_TIMEOUT, workers=HOSTSTATS_WORKERS):
+        self.mount_refresh = mount_refresh
+        self.disk_interval = disk_interval
+        self.disk_timeout = disk_timeout
+        self.pool = serving.native_executor(workers, 'hoststats')
+        self.watcher = MountWatcher()
+        self.boot_time = psutil.boot_time()
+        self.ram_total = round(psutil.virtual_memory().total / (1024**3), 2)
+        self.partitions = None     # future / list partisi
+        self.partitions_at = 0.0
+        self.mounts = {}           # mountpoint -> {'device', 'future', 'started', 'usage', 'sampled'}
+        self.stats = {'partition_scans': 0, 'disk_samples': 0, 'timeouts': 0}
+        psutil.cpu_percent(interval=None)   # pemanasan, bacaan pertama selalu 0
+        self._refresh_partitions()
+
+    def collect(self):
+        ram = psutil.virtual_memory()
+        uptime_hours = round((time.time() - self.boot_time) / 3600, 1)
+        return {
+            'cpu': psutil.cpu_percent(interval=None),
+            'ram_percent': ram.percent,
+            'ram_text': f"{round(ram.used / (1024**3), 2)}/{self.ram_total} GB",
+            'disks': self.disks(),
+            'uptime': f"{uptime_hours} Hours"
+        }
+
+    # --- daftar partisi ---
+    def _refresh_partitions(self):
+        if self.partitions is not None and not isinstance(self.partitions, list): return   # scan lama belum selesai
+        self.partitions = self.pool.submit(psutil.disk_partitions)
+        self.partitions_at = time.time()
+        self.stats['partition_scans'] += 1
+
+    def _sync_partitions(self):
+        now = time.time()
+        if self.watcher.changed() or now - self.partitions_at >= self.mount_refresh:
+            self._refresh_partitions()
+        fut = self.partitions
+        if isinstance(fut, list) or not fut.done(): return
+        try:
+            parts = fut.result()
+        except Exception as e:
+            print(f"⚠️ Gagal baca daftar partisi: {e}")
+            parts = []
+        self.partitions = parts
+        keep = {}
+        for p in parts:
+            if 'cdrom' in p.opts or p.fstype == '': continue
+            keep[p.mountpoint] = self.mounts.get(p.mountpoint) or {'device': p.device, 'future': None, 'started': 0.0,
+                                                                   'usage': None, 'sampled': 0.0}
+        self.mounts = keep
+
+    # --- disk_usage per mount ---
+    def disks(self):
+        self._sync_partitions()
+        now = time.time()
+        out = []
+        for mountpoint, m in self.mounts.items():
+            fut = m['future']
+            if fut is not None and fut.done():
+                m['future'] = None
+                try:
+                    m['usage'] = fut.result()
+                    m['sampled'] = now
+                    self.stats['disk_samples'] += 1
+                except Exception:
+                    m['usage'], m['sampled'] = None, now   # gak bisa dibaca (permission / device hilang)
+            hung = m['future'] is not None and now - m['started'] > self.disk_timeout
+            if hung and not m.get('hung'): self.stats['timeouts'] += 1
+            m['hung'] = hung
+            if m['future'] is None and now - m['sampled'] >= self.disk_interval:
+                m['future'] = self.pool.submit(psutil.disk_usage, mountpoint)
+                m['started'] = now
+            usage = m['usage']
+            if usage is None and not hung: continue
+            disk = {'letter': m['device'].replace('\\', ''), 'mount': mountpoint,
+                    'percent': usage.percent if usage else 0,
+                    'free': f"{round(usage.free / (1024**3), 1)} GB Free" if usage else 'Timeout'}
+            if hung:
+                disk['stale'] = True
+                if usage: disk['free'] += ' (timeout)'
+            out.append(disk)
+        return out
+
+    def close(self):
+        self.pool.shutdown(wait=False)
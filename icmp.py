@@ -0,0 +1,184 @@
+import asyncio
+import os
+import socket
+import struct
+import time
+
+# --- KONFIGURASI ICMP ---
+ICMP_COUNT = int(os.getenv('ICMP_COUNT', '3'))              # paket echo per host per probe (buat jitter & loss)
+ICMP_INTERVAL = float(os.getenv('ICMP_INTERVAL', '0.02'))   # detik antar paket ke host yang sama
+ICMP_RATE = int(os.getenv('ICMP_RATE', '20000'))            # batas paket/detik keluar dari 1 socket
+ICMP_MODE = os.getenv('ICMP_MODE', 'auto')                  # auto | raw | dgram | ping3
+
+ECHO_REQUEST, ECHO_REPLY = 8, 0
+PAYLOAD = b'netwatch' * 7   # 56 byte, sama dengan ping bawaan
+PACE_BURST = 0.005   # detik, paket boleh dikirim "kecepatan" selama window ini (sleep asyncio gak presisi < 1 ms)
+
+
+def checksum(data):
+    if len(data) % 2: data += b'\0'
+    return fold(sum(struct.unpack(f'!{len(data) // 2}H', data)))
+
+
+def fold(total):
+    while total >> 16: total = (total & 0xffff) + (total >> 16)
+    return ~total & 0xffff
+
+
+# Checksum ICMP itu penjumlahan 16-bit: bagian yang tetap (type + payload) dihitung sekali aja
+ECHO_BASE_SUM = 0xffff & ~checksum(struct.pack('!BBHHH', ECHO_REQUEST, 0, 0, 0, 0) + PAYLOAD)
+
+
+def open_socket(mode=ICMP_MODE):
+    # raw butuh root / CAP_NET_RAW. dgram = ICMP tanpa root di Linux (sysctl net.ipv4.ping_group_range)
+    kinds = {'raw': [socket.SOCK_RAW], 'dgram': [socket.SOCK_DGRAM]}.get(mode, [socket.SOCK_RAW, socket.SOCK_DGRAM])
+    if mode == 'ping3': return None, None
+    for kind in kinds:
+        try:
+            sock = socket.socket(socket.AF_INET, kind, socket.IPPROTO_ICMP)
+        except (PermissionError, OSError):
+            continue
+        sock.setblocking(False)
+        try: sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        except OSError: pass
+        return sock, 'raw' if kind == socket.SOCK_RAW else 'dgram'
+    return None, None
+
+
+def summarize(rtts, sent):
+    # rtts: list RTT (ms) yang dibalas, urut sesuai paket
+    received = len(rtts)
+    loss = round(100 * (sent - received) / sent) if sent else 100
+    if not received:
+        return {'sent': sent, 'received': 0, 'loss': loss, 'min': None, 'avg': None, 'max': None, 'jitter': None}
+    # Jitter = rata-rata selisih RTT paket berurutan (mirip RFC 3550, tanpa smoothing)
+    jitter = sum(abs(b - a) for a, b in zip(rtts, rtts[1:])) / (received - 1) if received > 1 else 0.0
+    return {'sent': sent, 'received': received, 'loss': loss, 'min': min(rtts), 'avg': sum(rtts) / received,
+            'max': max(rtts), 'jitter': jitter}
+
+
+# ==========================================
+# ICMP MULTIPLEXER
+# ==========================================
+# 1 socket ICMP dipakai semua host (ping3 buka socket baru + blocking per panggilan).
+# Balasan dicocokkan lewat sequence (16 bit, global) + IP pengirim, jadi ribuan host
+# bisa ditunggu barengan di 1 event loop tanpa thread.
+class IcmpMux:
+    instances = 0
+
+    def __init__(self, loop, sock, kind, rate=ICMP_RATE):
+        self.loop = loop
+        self.sock = sock
+        self.kind = kind
+        # Identifier unik per socket (raw socket nerima semua balasan ICMP di mesin ini).
+        # Mode dgram: identifier diganti kernel (= port socket), balasan juga sudah dipisah kernel.
+        IcmpMux.instances += 1
+        self.ident = (os.getpid() * 31 + IcmpMux.instances) & 0xffff
+        self.seq = 0
+        self.pending = {}                   # seq -> (probe, nomor paket, waktu kirim)
+        self.rate = rate
+        self.next_slot = 0.0
+        self.stats = {'sent': 0, 'received': 0, 'stray': 0}
+        loop.add_reader(sock.fileno(), self._on_readable)
+
+    @classmethod
+    def open(cls, loop, mode=ICMP_MODE, rate=ICMP_RATE):
+        sock, kind = open_socket(mode)
+        return cls(loop, sock, kind, rate) if sock else None
+
+    def close(self):
+        try: self.loop.remove_reader(self.sock.fileno())
+        except Exception: pass
+        self.sock.close()
+        for probe, _, _ in list(self.pending.values()): self._finish(probe)
+
+    async def ping(self, host, count=ICMP_COUNT, timeout=1.0, interval=ICMP_INTERVAL):
+        ip = host if is_ipv4(host) else await self.resolve(host)
+        if ip is None: return None
+        # Gak ada coroutine / sleep per paket: paket ke-2 dst dijadwalkan call_later,
+        # balasan ngisi probe langsung dari _on_readable, 1 future per host
+        await self._pace(count)
+        probe = {'ip': ip, 'rtts': [None] * count, 'left': count, 'seqs': [], 'fut': self.loop.create_future()}
+        self._send(probe, 0)
+        for i in range(1, count):
+            self.loop.call_later(interval * i, self._send, probe, i)
+        timer = self.loop.call_later(interval * (count - 1) + timeout, self._finish, probe)
+        try:
+            await probe['fut']
+        finally:
+            timer.cancel()
+            self._finish(probe)
+        return summarize([rtt for rtt in probe['rtts'] if rtt is not None], count)
+
+    async def resolve(self, host):
+        try:
+            infos = await self.loop.getaddrinfo(host, None, family=socket.AF_INET, type=socket.SOCK_DGRAM)
+            return infos[0][4][0]
+        except (OSError, IndexError):
+            return None
+
+    async def _pace(self, packets):
+        # Rata-rata ICMP_RATE paket/detik biar buffer NIC / router gak banjir (balasan hilang = loss palsu)
+        now = time.perf_counter()
+        self.next_slot = max(self.next_slot, now) + packets / self.rate
+        delay = self.next_slot - now - PACE_BURST
+        if delay > 0: await asyncio.sleep(delay)
+
+    def _send(self, probe, index):
+        if probe['fut'].done(): return
+        # Cari sequence yang lagi gak dipakai (65536 paket in-flight sudah jauh di atas kebutuhan)
+        for _ in range(0x10000):
+            self.seq = (self.seq + 1) & 0xffff
+            if self.seq not in self.pending: break
+        else:
+            return
+        seq = self.seq
+        packet = struct.pack('!BBHHH', ECHO_REQUEST, 0, fold(ECHO_BASE_SUM + self.ident + seq), self.ident, seq) + PAYLOAD
+        try:
+            self.sock.sendto(packet, (probe['ip'], 0))
+        except OSError:
+            return   # buffer kirim penuh / network unreachable = paket hilang
+        self.pending[seq] = (probe, index, time.perf_counter())
+        probe['seqs'].append(seq)
+        self.stats['sent'] += 1
+
+    def _on_readable(self):
+        while True:
+            try:
+                data, addr = self.sock.recvfrom(2048)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                return
+            # Raw socket ikut bawa header IP, dgram langsung ICMP
+            offset = (data[0] & 0x0f) * 4 if self.kind == 'raw' else 0
+            if len(data) < offset + 8: continue
+            icmp_type, _, _, ident, seq = struct.unpack_from('!BBHHH', data, offset)
+            if icmp_type != ECHO_REPLY or (self.kind == 'raw' and ident != self.ident):
+                continue   # echo request kita sendiri (loopback) / ping proses lain
+            entry = self.pending.get(seq)
+            if entry is None or entry[0]['ip'] != addr[0]:
+                self.stats['stray'] += 1
+                continue
+            del self.pending[seq]
+            probe, index, sent_at = entry
+            if probe['fut'].done(): continue
+            probe['rtts'][index] = (time.perf_counter() - sent_at) * 1000
+            probe['left'] -= 1
+            self.stats['received'] += 1
+            if not probe['left']: probe['fut'].set_result(None)
+
+    def _finish(self, probe):
+        # Timeout / selesai: sequence yang gak dibalas dilepas biar bisa dipakai lagi
+        for seq in probe['seqs']:
+            entry = self.pending.get(seq)
+            if entry is not None and entry[0] is probe: del self.pending[seq]
+        if not probe['fut'].done(): probe['fut'].set_result(None)
+
+
+def is_ipv4(host):
+    try:
+        socket.inet_aton(host)
+        return host.count('.') == 3
+    except OSError:
+        return False
@@ -1,75 +1,305 @@
+# --- MODE UNIFIED (python launcher.py --unified): semua service di 1 proses, lihat runtime.py ---
+# Dicek paling atas: runtime.py harus sempat patch gevent sebelum modul lain (subprocess, threading) ke-import
+import sys
+if __name__ == '__main__' and '--unified' in sys.argv:
+    import runtime
+    runtime.main()
+    sys.exit(0)
+
+import json
 import subprocess
+import threading
 import time
-import sys
 import os
 import signal
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import psutil
+from dotenv import load_dotenv
+
+load_dotenv()
 
 # --- KONFIGURASI ---
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+LOG_DIR = os.path.join(BASE_DIR, "storage", "logs")              # stdout/stderr tiap service (dulu DEVNULL)
+HEARTBEAT_DIR = os.path.join(BASE_DIR, "storage", "heartbeat")
+
+LAUNCHER_CHECK_INTERVAL = float(os.getenv('LAUNCHER_CHECK_INTERVAL', '2'))      # detik antar health check
+LAUNCHER_READY_TIMEOUT = float(os.getenv('LAUNCHER_READY_TIMEOUT', '60'))       # belum ready segini = restart
+LAUNCHER_START_WAIT = float(os.getenv('LAUNCHER_START_WAIT', '10'))             # tunggu ready sebelum start service berikutnya
+LAUNCHER_HEALTH_FAILS = int(os.getenv('LAUNCHER_HEALTH_FAILS', '3'))            # check gagal berturut-turut = restart
+LAUNCHER_HEARTBEAT_TIMEOUT = float(os.getenv('LAUNCHER_HEARTBEAT_TIMEOUT', '120'))  # > long poll Telegram Commander (60 dtk)
+LAUNCHER_RESTART_MAX = float(os.getenv('LAUNCHER_RESTART_MAX', '60'))           # batas backoff restart (detik)
+LAUNCHER_STOP_TIMEOUT = float(os.getenv('LAUNCHER_STOP_TIMEOUT', '10'))         # tunggu berhenti halus sebelum di-kill
+LAUNCHER_STATUS_HOST = os.getenv('LAUNCHER_STATUS_HOST', '127.0.0.1')
+LAUNCHER_STATUS_PORT = int(os.getenv('LAUNCHER_STATUS_PORT', '5010'))           # GET /status, 0 = mati
+
+# Urutan = urutan start (NetWatch duluan karena yang lain lapor ke sana), shutdown dibalik.
+# port -> health check HTTP, heartbeat -> service tulis file (heartbeat.py) tiap beberapa detik
 scripts = [
-    {"name": "NetWatch Security", "file": "netwatch.py",  "port": 5000},
-    {"name": "SysGaze Monitor",   "file": "sysgaze.py",   "port": 5001},
-    {"name": "IT-Ops Commander",  "file": "commander.py", "port": None},
-    {"name": "The Cleaner",       "file": "cleaner.py",   "port": None}
+    {"name": "NetWatch Security", "file": "netwatch.py",  "port": int(os.getenv('NETWATCH_PORT', '5000')), "path": "/login"},
+    {"name": "SysGaze Monitor",   "file": "sysgaze.py",   "port": int(os.getenv('SYSGAZE_PORT', '5001')), "path": "/"},
+    {"name": "IT-Ops Commander",  "file": "commander.py", "port": None, "heartbeat": True},
+    {"name": "The Cleaner",       "file": "cleaner.py",   "port": None, "heartbeat": True}
 ]
 
-processes = []
+children = []
+started_at = time.time()
 
-def start_services():
-    print("🚀 INITIALIZING IT-OPS SILENT PROTOCOL...")
-    print("==========================================")
-    
-    for item in scripts:
-        if not os.path.exists(item['file']):
-            print(f"❌ File hilang: {item['file']}")
-            continue
 
-        print(f"✅ Starting {item['name']}...", end=" ")
-        
+# ==========================================
+# 1 SERVICE = 1 CHILD PROCESS YANG DIAWASI
+# ==========================================
+# state: starting -> ready -> (unhealthy / crashed -> backoff -> starting ...) ; stopped waktu shutdown
+class Child:
+    def __init__(self, item):
+        self.name = item['name']
+        self.file = item['file']
+        self.port = item.get('port')
+        self.path = item.get('path', '/')
+        self.heartbeat = os.path.join(HEARTBEAT_DIR, os.path.splitext(self.file)[0]) if item.get('heartbeat') else None
+        self.proc = None
+        self.ps = None
+        self.state = 'stopped'
+        self.started = 0.0
+        self.ready_at = None
+        self.fails = 0
+        self.restarts = 0
+        self.delay = 1.0
+        self.next_start = 0.0
+        self.last_exit = None
+        self.reason = None
+        self.cpu = 0.0
+        self.rss = 0
+
+    def start(self):
+        env = dict(os.environ, PYTHONUNBUFFERED='1')
+        if self.heartbeat:
+            env['HEARTBEAT_FILE'] = self.heartbeat
+            try: os.remove(self.heartbeat)   # heartbeat sisa run sebelumnya jangan dianggap hidup
+            except OSError: pass
+        log = open(os.path.join(LOG_DIR, os.path.splitext(self.file)[0] + '.log'), 'a')
+        log.write(f"\n===== {time.strftime('%Y-%m-%d %H:%M:%S')} start {self.file} =====\n")
+        log.flush()
+
         # --- TEKNIK RAHASIA: MATIKAN POPUP WINDOW ---
         # creationflags=0x08000000 (CREATE_NO_WINDOW) -> Khusus Windows biar gak muncul CMD baru
-        # stdout=subprocess.DEVNULL -> Biar log-nya gak nyampur di sini (jadi bersih)
-        
+        # Linux/Mac: session sendiri, CTRL+C di terminal cuma kena launcher, anak dimatikan berurutan dari sini
         if sys.platform == "win32":
             CREATE_NO_WINDOW = 0x08000000
-            p = subprocess.Popen(
-                ["python", item['file']],
+            self.proc = subprocess.Popen(
+                [sys.executable, self.file], cwd=BASE_DIR, env=env,
                 creationflags=CREATE_NO_WINDOW,
-                stdout=subprocess.DEVNULL, 
-                stderr=subprocess.DEVNULL
+                stdout=log, stderr=subprocess.STDOUT
             )
         else:
             # Buat Linux/Mac
-            p = subprocess.Popen(
-                ["python", item['file']],
-                stdout=subprocess.DEVNULL, 
-                stderr=subprocess.DEVNULL
+            self.proc = subprocess.Popen(
+                [sys.executable, self.file], cwd=BASE_DIR, env=env, start_new_session=True,
+                stdout=log, stderr=subprocess.STDOUT
             )
-            
-        processes.append(p)
-        print("OK! [Background Mode]")
-        time.sleep(1)
+        log.close()   # handle-nya sudah diwarisi child
+
+        self.ps = psutil.Process(self.proc.pid)
+        self.ps.cpu_percent(None)   # pemanasan, bacaan pertama selalu 0
+        self.state = 'starting'
+        self.started = time.time()
+        self.ready_at = None
+        self.fails = 0
+
+    # --- health check ---
+    def healthy(self):
+        if self.port:
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{self.port}{self.path}", timeout=2) as res:
+                    return res.status < 500
+            except Exception as e:
+                return 400 <= getattr(e, 'code', 500) < 500   # 4xx (misal redirect login) = server tetap jawab
+        if self.heartbeat:
+            try: return time.time() - os.path.getmtime(self.heartbeat) < LAUNCHER_HEARTBEAT_TIMEOUT
+            except OSError: return False
+        return True
+
+    def sample(self):
+        try:
+            with self.ps.oneshot():
+                self.cpu = self.ps.cpu_percent(None)
+                self.rss = self.ps.memory_info().rss
+        except (psutil.NoSuchProcess, psutil.AccessDenied):
+            self.cpu, self.rss = 0.0, 0
+
+    def check(self, now):
+        if self.state == 'backoff':
+            if now >= self.next_start:
+                print(f"🔁 Restarting {self.name} (restart ke-{self.restarts})...")
+                self.start()
+            return
+        if self.state not in ('starting', 'ready', 'unhealthy'): return
+
+        code = self.proc.poll()
+        if code is not None:
+            self.last_exit = code
+            return self.restart(f"exit code {code}")
+        self.sample()
+
+        ok = self.healthy()
+        if self.ready_at is None:
+            if ok:
+                self.ready_at = now
+                self.state = 'ready'
+                print(f"✅ {self.name} READY ({now - self.started:.1f} dtk, PID {self.proc.pid})")
+            elif now - self.started > LAUNCHER_READY_TIMEOUT:
+                self.restart(f"gak ready dalam {LAUNCHER_READY_TIMEOUT:.0f} dtk")
+            return
+        if ok:
+            if self.state == 'unhealthy': print(f"✅ {self.name} sehat lagi")
+            self.fails, self.state = 0, 'ready'
+            if now - self.started > LAUNCHER_RESTART_MAX: self.delay = 1.0   # sudah stabil, backoff direset
+            return
+        self.fails += 1
+        self.state = 'unhealthy'
+        if self.fails >= LAUNCHER_HEALTH_FAILS:
+            self.restart(f"health check gagal {self.fails}x" if self.port else "heartbeat berhenti")
+
+    def restart(self, reason):
+        print(f"❌ {self.name} DOWN: {reason}. Restart dalam {self.delay:.0f} dtk")
+        self.reason = reason
+        self.stop()
+        self.restarts += 1
+        self.state = 'backoff'
+        self.next_start = time.time() + self.delay
+        self.delay = min(self.delay * 2, LAUNCHER_RESTART_MAX)
+
+    def stop(self, timeout=LAUNCHER_STOP_TIMEOUT):
+        # Linux/Mac: CTRL+C (SIGINT) dulu biar service sempat beres-beres, kalau gak berhenti baru di-kill.
+        # Windows: child tanpa console gak bisa dikirimi CTRL+BREAK, langsung terminate() kayak dulu.
+        self.state = 'stopped'
+        self.cpu, self.rss = 0.0, 0
+        if self.proc is None or self.proc.poll() is not None: return
+        try:
+            if sys.platform == "win32": self.proc.terminate()
+            else: self.proc.send_signal(signal.SIGINT)
+            self.proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            print(f"⚠️ {self.name} gak berhenti dalam {timeout:.0f} dtk, kill")
+            self.proc.kill()
+            self.proc.wait()
+        except OSError:
+            pass
+
+    def snapshot(self, now):
+        running = self.state in ('starting', 'ready', 'unhealthy')
+        return {
+            'name': self.name, 'file': self.file, 'state': self.state,
+            'pid': self.proc.pid if running else None,
+            'ready': self.state == 'ready',
+            'uptime': round(now - self.started) if running else 0,
+            'restarts': self.restarts, 'last_exit': self.last_exit, 'last_reason': self.reason,
+            'cpu_percent': self.cpu, 'rss_mb': round(self.rss / (1024**2), 1),
+            'check': f"http :{self.port}{self.path}" if self.port else ('heartbeat' if self.heartbeat else 'process'),
+        }
+
+
+# ==========================================
+# STATUS ENDPOINT (GET /status, JSON)
+# ==========================================
+def status():
+    now = time.time()
+    me = psutil.Process()
+    services = [c.snapshot(now) for c in children]
+    return {
+        'launcher': {'pid': me.pid, 'uptime': round(now - started_at), 'cpu_percent': me.cpu_percent(None),
+                     'rss_mb': round(me.memory_info().rss / (1024**2), 1)},
+        'services': services,
+        'total': {'cpu_percent': round(sum(s['cpu_percent'] for s in services), 1),
+                  'rss_mb': round(sum(s['rss_mb'] for s in services), 1)},
+    }
+
+
+class StatusHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/status'):
+            self.send_error(404)
+            return
+        body = json.dumps(status(), indent=2).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args): pass   # gak usah log tiap request
+
+
+def start_status_server():
+    if not LAUNCHER_STATUS_PORT: return
+    try:
+        server = ThreadingHTTPServer((LAUNCHER_STATUS_HOST, LAUNCHER_STATUS_PORT), StatusHandler)
+    except OSError as e:
+        print(f"⚠️ Status endpoint gagal dibuka di port {LAUNCHER_STATUS_PORT}: {e}")
+        return
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"📈 Status CPU/RAM per service: http://{LAUNCHER_STATUS_HOST}:{LAUNCHER_STATUS_PORT}/status")
+
+
+def start_services():
+    print("🚀 INITIALIZING IT-OPS SILENT PROTOCOL...")
+    print("==========================================")
+    os.makedirs(LOG_DIR, exist_ok=True)
+    os.makedirs(HEARTBEAT_DIR, exist_ok=True)
+
+    for item in scripts:
+        if not os.path.exists(os.path.join(BASE_DIR, item['file'])):
+            print(f"❌ File hilang: {item['file']}")
+            continue
+
+        print(f"✅ Starting {item['name']}...")
+        child = Child(item)
+        child.start()
+        children.append(child)
+
+        # Tunggu ready dulu (maks LAUNCHER_START_WAIT) sebelum service berikutnya, bukan sleep(1) buta
+        deadline = time.time() + LAUNCHER_START_WAIT
+        while time.time() < deadline and child.state == 'starting':
+            time.sleep(0.5)
+            child.check(time.time())
+        if child.state != 'ready':
+            print(f"⏳ {item['name']} belum ready ({child.state}), lanjut. Log: storage/logs/{os.path.splitext(item['file'])[0]}.log")
 
     print("==========================================")
     print("💻 STATUS: ALL SYSTEMS RUNNING.")
     print("ℹ️  Web Dashboard: http://127.0.0.1:5000")
     print("🛑 Tekan CTRL + C di sini untuk mematikan SEMUA bot.")
 
+def supervise():
+    # Keep alive + health check semua anak buah
+    while True:
+        time.sleep(LAUNCHER_CHECK_INTERVAL)
+        now = time.time()
+        for child in children: child.check(now)
+
 def stop_services():
     print("\n\n🛑 Shutting down all services...")
-    for p in processes:
-        try:
-            p.terminate() # Bunuh proses secara halus
-        except:
-            pass
+    # Urutan kebalikan start: Cleaner & Commander dulu, NetWatch (yang nerima laporan) terakhir
+    for child in reversed(children):
+        if child.state == 'stopped': continue
+        print(f"   ⏹️ {child.name}...", end=" ", flush=True)
+        child.stop()
+        print(f"stopped (exit {child.proc.returncode})")
     print("✅ All services stopped. Bye!")
 
+def handle_term(signum, frame):
+    # SIGTERM (systemd / docker stop) diperlakukan sama dengan CTRL+C
+    raise KeyboardInterrupt
+
 # --- JALANKAN ---
 if __name__ == '__main__':
+    signal.signal(signal.SIGTERM, handle_term)
     try:
+        start_status_server()
         start_services()
-        # Loop biar script induk gak mati (Keep Alive)
-        while True:
-            time.sleep(1)
+        supervise()
     except KeyboardInterrupt:
         # Kalau user tekan Ctrl+C, matikan semua anak buahnya
-        stop_services()
\ No newline at end of file
+        stop_services()
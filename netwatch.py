@@ -1,44 +1,63 @@
+# --- MODE SERVER (NETWATCH_ASYNC_MODE=gevent): patch harus sebelum import lainnya ---
+import serving
+serving.patch()
+
 import os
-import socket
 import threading
 import time
-import sqlite3
 import random  # <-- PENTING BUAT ANGKA ACAK
-from datetime import datetime
+from datetime import datetime, timedelta
 
 # --- THIRD-PARTY IMPORTS ---
-import requests
 # import speedtest  <-- KITA MATIKAN BIAR GAK BERAT
 from dotenv import load_dotenv
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import LoginManager, UserMixin, login_user, login_required, logout_user, current_user
 from flask_socketio import SocketIO
 from flask_sqlalchemy import SQLAlchemy
-from ping3 import ping
 from werkzeug.security import generate_password_hash, check_password_hash
 
+from prober import ProbeEngine
+from probes import PHASES, parse_config
+from scheduler import ProbeScheduler
+from storage import WriteBuffer, ensure_columns, ensure_indexes, engine_options, apply_profile
+from tsdb import create_backend
+from telemetry import AgentTelemetry, BulkError, decode_bulk
+from broadcaster import Broadcaster
+from cluster import Cluster
+from alerting import AlertManager
+from notifier import Notifier
+from topology import Topology
+
 # Load Environment Variables (.env)
 load_dotenv()
 
 app = Flask(__name__)
 
 # --- KONFIGURASI ---
-TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
-TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'default-dev-key')
 
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///netwatch.db'
+app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'sqlite:///netwatch.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# WAL + pool koneksi (lihat storage.py, DB_PROFILE=legacy buat balik ke default SQLite)
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
+
+# Jadwal probe per device diatur ProbeScheduler (scheduler.py, interval dasar = SCHED_BASE / SWEEP_INTERVAL)
+SCHED_BATCH_WINDOW = float(os.getenv('SCHED_BATCH_WINDOW', '0.25'))   # device yang jatuh tempo berdekatan digabung 1 sweep
+DEVICE_REFRESH = float(os.getenv('DEVICE_REFRESH', '10'))             # detik, baca ulang daftar device dari DB
+NETWATCH_PORT = int(os.getenv('NETWATCH_PORT', '5000'))
 
 db = SQLAlchemy(app)
+with app.app_context(): apply_profile(db.engine)
 login_manager = LoginManager(app)
 login_manager.login_view = 'login'
 
-# Gunakan 'threading' agar kompatibel
-socketio = SocketIO(app, cors_allowed_origins='*', async_mode='threading')
+# Role proses ini + koordinasi multi-proses (NETWATCH_ROLE / NETWATCH_MQ, lihat cluster.py)
+cluster = Cluster()
 
-# --- DATA PENYIMPANAN SEMENTARA (RAM) ---
-remote_agents = {} 
+# 'threading' (dev) atau 'gevent' (production), lihat serving.py
+# Mode cluster: emit lewat message queue biar sampai ke browser di proses web mana pun
+socketio = SocketIO(app, cors_allowed_origins='*', async_mode=serving.ASYNC_MODE, client_manager=cluster.client_manager())
 
 # --- DATABASE MODELS ---
 class User(UserMixin, db.Model):
@@ -56,6 +75,10 @@ class Device(db.Model):
     ip = db.Column(db.String(20), nullable=False)
     port = db.Column(db.Integer, default=0) 
     icon = db.Column(db.String(30), default='bi-hdd-network')
+    probe_interval = db.Column(db.Integer)   # detik, NULL = adaptif (scheduler.py)
+    probe_type = db.Column(db.String(20))     # NULL = otomatis (port 0 -> icmp, selain itu tcp), lihat probes.py
+    probe_config = db.Column(db.String(500))  # JSON / singkatan, contoh http: "/health" atau {"path": "/", "expect_body": "ok"}
+    parent_id = db.Column(db.Integer)         # router / switch di depannya (topology.py), NULL = langsung terjangkau
 
 class EventLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -67,34 +90,133 @@ class EventLog(db.Model):
 class PingHistory(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     device_id = db.Column(db.Integer)
-    latency = db.Column(db.Integer) # ms
-    timestamp = db.Column(db.DateTime, default=datetime.now)
+    latency = db.Column(db.Integer) # ms, NULL = DOWN (buat hitung loss%)
+    # Rincian waktu per fase (ms), NULL kalau fase itu gak ada (ICMP / koneksi keep-alive dipakai ulang)
+    dns_ms = db.Column(db.Float)
+    connect_ms = db.Column(db.Float)
+    tls_ms = db.Column(db.Float)
+    ttfb_ms = db.Column(db.Float)
+    timestamp = db.Column(db.DateTime, default=datetime.now, index=True)
+    # Query chart selalu "device X antara jam A-B" -> index gabungan
+    __table_args__ = (db.Index('ix_ping_history_device_ts', 'device_id', 'timestamp'),)
+
+# Hasil downsampling PingHistory (lihat rollup.py): resolution 60 = per menit, 3600 = per jam
+class PingRollup(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    device_id = db.Column(db.Integer, nullable=False)
+    resolution = db.Column(db.Integer, nullable=False)
+    bucket = db.Column(db.DateTime, nullable=False)
+    samples = db.Column(db.Integer, default=0)
+    lost = db.Column(db.Integer, default=0)
+    lat_min = db.Column(db.Float)
+    lat_avg = db.Column(db.Float)
+    lat_max = db.Column(db.Float)
+    lat_p95 = db.Column(db.Float)
+    __table_args__ = (
+        db.Index('ix_ping_rollup_device_res_bucket', 'device_id', 'resolution', 'bucket', unique=True),
+        db.Index('ix_ping_rollup_res_bucket', 'resolution', 'bucket'),
+    )
 
-# Global Vars
+# Telemetry agent format "panjang": 1 baris = 1 metric (cpu, ram, ...) per waktu
+class AgentSample(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    agent = db.Column(db.String(100), nullable=False)
+    metric = db.Column(db.String(50), nullable=False)
+    value = db.Column(db.Float)
+    timestamp = db.Column(db.DateTime, default=datetime.now, index=True)
+    __table_args__ = (db.Index('ix_agent_sample_agent_metric_ts', 'agent', 'metric', 'timestamp'),)
+
+# Global Vars (mode cluster: disalin juga ke cluster.state biar proses lain bisa baca)
 last_status_map = {}
+devices_changed = threading.Event()   # add/delete device -> monitor baca ulang daftar device
 latest_speed = {'dl': '--', 'ul': '--', 'ping': '--'}
 
+# Semua tulisan dari monitor lewat sini (bulk insert, 1 transaksi per flush)
+db_writer = WriteBuffer(app, db)
+# Storage time-series (TSDB_BACKEND=sqlite / parquet, lihat tsdb.py)
+tsdb = create_backend(app, db, db_writer, {'ping': PingHistory, 'agent': AgentSample}, PingRollup)
+# Data agent: ring buffer di RAM + histori di tsdb (pengganti dict remote_agents)
+telemetry = AgentTelemetry(tsdb)
+# Update dashboard dikumpulin per tick & dikirim diff-nya saja (lihat broadcaster.py)
+if cluster.enabled:
+    # Data datang dari proses prober/ingest lewat shared state, tiap proses web fan-out ke browser-nya sendiri
+    broadcaster = Broadcaster(socketio, local=True)
+    for _channel in ('update_monitor', 'update_agents'):
+        broadcaster.channel(_channel, source=lambda keys, ch=_channel: cluster.state.get_many(ch, keys))
+    cluster.on('touch', lambda m: (broadcaster.touch(m['channel'], m['keys']), broadcaster.remove(m['channel'], m['removed'])))
+else:
+    broadcaster = Broadcaster(socketio).channel('update_monitor').channel('update_agents', source=telemetry.snapshot)
+
 # --- HELPERS ---
+# 1 proses: langsung ke broadcaster. Cluster: tulis ke shared state lalu kabari proses web lewat queue.
+def publish_monitor(items, removed=()):
+    # items: {device_id: hasil probe}
+    if not cluster.enabled:
+        broadcaster.update('update_monitor', items)
+        broadcaster.remove('update_monitor', removed)
+        return
+    cluster.state.set_many('update_monitor', items)
+    cluster.state.delete('update_monitor', removed)
+    cluster.publish(socketio, 'touch', channel='update_monitor', keys=list(items), removed=[str(k) for k in removed])
+
+pending_agents, pending_evicted = set(), set()
+pending_lock = threading.Lock()
+
+def publish_agents(names, removed=()):
+    if not cluster.enabled:
+        broadcaster.touch('update_agents', names)
+        broadcaster.remove('update_agents', removed)
+        return
+    # Laporan agent bisa ratusan/detik -> dikumpulin, dikirim per tick oleh task_publish_agents
+    with pending_lock:
+        pending_agents.update(names)
+        pending_evicted.update(removed)
+
+def task_publish_agents():
+    while True:
+        socketio.sleep(broadcaster.tick)
+        with pending_lock:
+            names, evicted = list(pending_agents), list(pending_evicted)
+            pending_agents.clear()
+            pending_evicted.clear()
+        if not names and not evicted: continue
+        try:
+            cluster.state.set_many('update_agents', telemetry.snapshot(names))
+            # Agent yang di-evict proses ini mungkin masih lapor ke proses ingest lain
+            gone = cluster.state.delete('update_agents', evicted, older_than=telemetry.ttl)
+            cluster.publish(socketio, 'touch', channel='update_agents', keys=names, removed=gone)
+        except Exception as e:
+            print(f"❌ Publish agent error: {e}")
+
+
+# Telegram lewat notifier.py: antrian + outbox SQLite + retry, jadi gak pernah nahan thread alert / monitor
+notifier = Notifier('netwatch')
+
 def send_telegram(msg):
-    if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID: return
-    try: requests.post(f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage", data={"chat_id": TELEGRAM_CHAT_ID, "text": msg, "parse_mode": "Markdown"})
-    except: pass
+    notifier.send(msg, parse_mode='Markdown')
 
-def check_port_open(ip, port):
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(1)
-        res = sock.connect_ex((ip, int(port)))
-        sock.close()
-        return res == 0
-    except: return False
+# Antrian alert: histeresis N-of-M, deteksi flapping, digest & rate limit per tujuan
+alerts = AlertManager({'telegram': send_telegram})
+
+# Daftar device berubah (add / delete / parent): monitor baca ulang sekarang, bukan nunggu DEVICE_REFRESH.
+# Mode cluster: prober di proses lain dikabari lewat message queue (device yang dihapus berhenti di-alert).
+def on_devices_changed(removed=()):
+    for dev_id in removed: alerts.forget(int(dev_id))
+    devices_changed.set()
+
+def notify_devices_changed(removed=()):
+    on_devices_changed(removed)
+    if cluster.enabled: cluster.publish(socketio, 'devices', removed=[int(i) for i in removed])
+
+cluster.on('devices', lambda m: on_devices_changed(m.get('removed', ())))
 
 # --- ROUTES ---
 @app.route('/')
 @login_required
 def index():
     devices = Device.query.all()
-    return render_template('dashboard_ultimate.html', targets=devices, speed=latest_speed, agents=remote_agents)
+    speed = cluster.state.get('speed', 'latest', latest_speed) if cluster.enabled else latest_speed
+    return render_template('dashboard_ultimate.html', targets=devices, speed=speed, agents=telemetry.snapshot())
 
 @app.route('/login', methods=['GET', 'POST'])
 def login():
@@ -112,8 +234,19 @@ def logout(): logout_user(); return redirect(url_for('login'))
 @app.route('/add_device', methods=['POST'])
 @login_required
 def add_device():
-    db.session.add(Device(name=request.form['name'], ip=request.form['ip'], port=int(request.form['port']), icon=request.form['icon']))
+    probe_type = request.form.get('probe_type') or None
+    probe_config = (request.form.get('probe_config') or '').strip() or None
+    try: parse_config(probe_type, probe_config)
+    except ValueError as e:
+        # Ditolak di sini, bukan nanti jadi FAILED / ERR terus di dashboard
+        flash(f"Probe Check tidak valid: {e}")
+        return redirect(url_for('index'))
+    db.session.add(Device(name=request.form['name'], ip=request.form['ip'], port=int(request.form['port']), icon=request.form['icon'],
+                          probe_interval=request.form.get('probe_interval', type=int),
+                          probe_type=probe_type, probe_config=probe_config,
+                          parent_id=request.form.get('parent_id', type=int) or None))
     db.session.commit()
+    notify_devices_changed()
     return redirect(url_for('index'))
 
 @app.route('/delete_device/<int:id>')
@@ -121,87 +254,274 @@ def add_device():
 def delete_device(id):
     d = Device.query.get(id)
     if d: 
-        PingHistory.query.filter_by(device_id=id).delete()
+        tsdb.delete('ping', id)
+        publish_monitor({}, removed=[id])
+        # Device di belakangnya jadi langsung terjangkau (bukan ikut terhapus)
+        Device.query.filter_by(parent_id=id).update({'parent_id': None})
         db.session.delete(d)
         db.session.commit()
+        notify_devices_changed(removed=[id])
     return redirect(url_for('index'))
 
+@app.route('/api/device/<int:id>/parent', methods=['POST'])
+@login_required
+def set_parent(id):
+    # {"parent_id": 3} / {"parent_id": null}. Parent yang bikin siklus ditolak
+    d = Device.query.get_or_404(id)
+    body = request.get_json(silent=True)
+    if not isinstance(body, dict): return jsonify({'error': 'body harus JSON {"parent_id": ...}'}), 400
+    parent_id = body.get('parent_id') or None
+    if parent_id is not None:
+        # "3" (dari form) boleh, [1] / "abc" / 2.5 / true ditolak
+        if isinstance(parent_id, bool) or (isinstance(parent_id, float) and not parent_id.is_integer()):
+            return jsonify({'error': 'parent_id harus angka'}), 400
+        try: parent_id = int(parent_id)
+        except (TypeError, ValueError): return jsonify({'error': 'parent_id harus angka'}), 400
+        parents = dict(db.session.query(Device.id, Device.parent_id).all())
+        if parent_id not in parents: return jsonify({'error': 'parent tidak ada'}), 400
+        node, seen = parent_id, set()
+        while node is not None and node not in seen:
+            if node == id: return jsonify({'error': 'parent membentuk siklus'}), 400
+            seen.add(node)
+            node = parents.get(node)
+    d.parent_id = parent_id
+    db.session.commit()
+    notify_devices_changed()
+    return jsonify({'id': id, 'parent_id': parent_id})
+
 @app.route('/api/chart/<int:device_id>')
 @login_required
 def api_chart(device_id):
-    data = PingHistory.query.filter_by(device_id=device_id).order_by(PingHistory.timestamp.desc()).limit(20).all()
-    data.reverse()
-    return jsonify({
-        'labels': [d.timestamp.strftime('%H:%M:%S') for d in data],
-        'values': [d.latency for d in data]
-    })
+    # ?range=<detik> -> otomatis pilih tier raw / 1 menit / 1 jam. Tanpa range: 20 sampel terakhir.
+    span = request.args.get('range', type=int)
+    if not span:
+        data = tsdb.recent('ping', device_id, 20)
+        return jsonify({
+            'labels': [ts.strftime('%H:%M:%S') for ts, _ in data],
+            'values': [v for _, v in data]
+        })
+
+    now = datetime.now()
+    return jsonify(tsdb.chart('ping', device_id, now - timedelta(seconds=span), now))
+
+def parse_time(value, default):
+    # Terima epoch detik (1700000000) atau ISO (2025-01-31T10:00)
+    # Angka di luar range platform (1e20, inf) / bukan angka -> coba ISO; gagal juga -> ValueError (400)
+    if not value: return default
+    try: return datetime.fromtimestamp(float(value))
+    except (ValueError, OverflowError, OSError): pass
+    return datetime.fromisoformat(value)
+
+@app.route('/api/chart/<int:device_id>/range')
+@login_required
+def api_chart_range(device_id):
+    # ?from=&to=&step=<detik> -> series per bucket, diagregasi di DB (bukan kirim data mentah)
+    try:
+        end = parse_time(request.args.get('to'), datetime.now())
+        start = parse_time(request.args.get('from'), end - timedelta(hours=1))
+        step = request.args.get('step', 0, type=int)
+    except (ValueError, OverflowError, OSError):
+        return jsonify({"status": "error", "message": "from/to harus epoch atau ISO 8601"}), 400
+    if start >= end:
+        return jsonify({"status": "error", "message": "from harus sebelum to"}), 400
+
+    series = tsdb.aggregate('ping', device_id, start, end, step)
+    series.update({'from': start.isoformat(), 'to': end.isoformat()})
+    return jsonify(series)
 
 # --- [API] UNTUK NERIMA LAPORAN AGENT ---
+def ingest_agent(name, metrics, ip=None):
+    # Dipakai /api/agent/report, dan langsung (tanpa HTTP) oleh reporter Commander di mode --unified
+    telemetry.ingest(name, metrics, ip=ip)
+    publish_agents([name])
+
 @app.route('/api/agent/report', methods=['POST'])
 def agent_report():
     try:
         data = request.json
-        agent_name = data.get('name')
-        remote_agents[agent_name] = {
-            'cpu': data.get('cpu'),
-            'ram': data.get('ram'),
-            'ip': request.remote_addr, 
-            'last_seen': datetime.now().strftime('%H:%M:%S')
-        }
-        socketio.emit('update_agents', remote_agents)
+        ingest_agent(data.get('name'), {'cpu': data.get('cpu'), 'ram': data.get('ram')}, ip=request.remote_addr)
         return jsonify({"status": "success"}), 200
     except Exception as e:
         print(f"❌ Agent Error: {e}")
         return jsonify({"status": "error"}), 500
 
+@app.route('/api/agent/bulk', methods=['POST'])
+def agent_bulk():
+    # Batch sampel dari 1 / banyak agent sekaligus:
+    #   {"agents": [{"name": "PC-1", "samples": [{"ts": 1700000000.0, "cpu": 12, "ram": 40, ...}, ...]}]}
+    # Body boleh JSON atau msgpack (Content-Type: application/msgpack), boleh di-gzip (Content-Encoding: gzip)
+    try:
+        data = decode_bulk(request)
+    except BulkError as e:
+        return jsonify({"status": "error", "message": str(e)}), e.code
+    except Exception as e:
+        return jsonify({"status": "error", "message": f"payload rusak: {e}"}), 400
+
+    batches = data.get('agents') if isinstance(data, dict) and 'agents' in data else [data]
+    if not isinstance(batches, list): batches = []
+    received, accepted, names = 0, 0, []
+    for batch in batches:
+        if not isinstance(batch, dict) or not batch.get('name'): continue
+        raw = batch.get('samples')
+        samples = [(s.get('ts'), {k: v for k, v in s.items() if k != 'ts'})
+                   for s in (raw if isinstance(raw, list) else []) if isinstance(s, dict)]
+        received += len(samples)
+        count = telemetry.ingest_batch(str(batch['name']), samples, ip=request.remote_addr)
+        if count: names.append(str(batch['name']))
+        accepted += count
+    if received and not accepted:
+        return jsonify({"status": "error", "message": "semua sampel punya ts tidak valid", "rejected": received}), 400
+    if accepted: publish_agents(names)
+    return jsonify({"status": "success", "accepted": accepted, "rejected": received - accepted}), 200
+
+@app.route('/api/agent/<path:name>/history')
+@login_required
+def agent_history(name):
+    # ?metric=cpu|ram&range=<detik> (default 1 jam). Dari RAM kalau masih ada, sisanya dari DB.
+    metric = request.args.get('metric', 'cpu')
+    span = request.args.get('range', 3600, type=int)
+    return jsonify(telemetry.chart(name, metric, span))
+
 # --- BACKGROUND TASKS ---
-def task_monitor():
-    print("🚀 Monitor Started (Database Mode)...")
+def init_services():
     with app.app_context():
         db.create_all()
+        ensure_columns(db)
+        ensure_indexes(db)
         if not User.query.filter_by(username='admin').first():
             db.session.add(User(username='admin', password_hash=generate_password_hash('admin123')))
             db.session.commit()
 
+    db_writer.start()
+    # Rollup / retensi / compaction cukup di 1 proses (prober nomor 0)
+    tsdb.start(maintenance=cluster.leader)
+    if cluster.has('ingest'):
+        telemetry.start(on_evict=lambda gone: publish_agents([], removed=gone))
+        if cluster.enabled: socketio.start_background_task(task_publish_agents)
+    if cluster.has('web'): broadcaster.start()
+
+def probe_config(device):
+    # Config rusak jangan bikin seluruh monitor berhenti: pakai default probe-nya
+    try: return parse_config(device.probe_type, device.probe_config)
+    except ValueError as e:
+        print(f"⚠️ probe_config {device.name} tidak valid ({e}), pakai default")
+        return {}
+
+def task_monitor():
+    print(f"🚀 Monitor Started (Database Mode, shard {cluster.node})...")
+    if cluster.enabled:
+        # Status terakhir dari shared state: device yang pindah shard gak bikin alert palsu
+        last_status_map.update({int(k): v for k, v in cluster.state.get_many('status').items()})
+    alerts.seed(last_status_map)
+    alerts.start()
+    notifier.start()   # sisa outbox dari run sebelumnya langsung dikirim
+    published = {}
+    engine = ProbeEngine()
+    # Tiap device punya jadwal sendiri (stabil -> jarang, flapping -> sering, DOWN -> retry eksponensial)
+    scheduler = ProbeScheduler()
+    devices, last_refresh = {}, 0.0
+    # Parent / child (Device.parent_id): device di belakang parent yang DOWN gak di-probe
+    topology, names = Topology(), {}
+    raw_status = {}   # hasil probe terakhir (belum dikonfirmasi N-of-M), buat deteksi parent yang baru mulai gagal
     while True:
         with app.app_context():
             try:
-                targets = Device.query.all()
-                results = []
-                for d in targets:
-                    try:
-                        if d.port > 0:
-                            is_up = check_port_open(d.ip, d.port)
-                            status, lat_txt, color, lat_val = ('UP', f"Port {d.port}", 'success', 1) if is_up else ('DOWN', 'Closed', 'danger', 0)
-                        else:
-                            lat_val_raw = ping(d.ip, timeout=1)
-                            if lat_val_raw is None:
-                                status, lat_txt, color, lat_val = 'DOWN', 'Timeout', 'danger', 0
+                if devices_changed.is_set() or time.time() - last_refresh >= DEVICE_REFRESH:
+                    devices_changed.clear()
+                    last_refresh = time.time()
+                    everything = Device.query.all()
+                    # Mode cluster: cuma device milik shard ini (consistent hashing di cluster.py)
+                    owned = [d for d in everything if cluster.owns(d.id)]
+                    devices = {d.id: (d.name, d.ip, d.port, d.probe_type, probe_config(d)) for d in owned}
+                    # Topologi tetap dari semua device: parent bisa saja milik shard lain
+                    topology.update({d.id: d.parent_id for d in everything})
+                    names = {d.id: d.name for d in everything}
+                    raw_status = {k: v for k, v in raw_status.items() if k in devices}
+                    scheduler.sync({d.id: d.probe_interval for d in owned})
+
+                due = [dev_id for dev_id in scheduler.pop_due(window=SCHED_BATCH_WINDOW) if dev_id in devices]
+                if due:
+                    statuses = last_status_map
+                    foreign = {a for dev_id in due for a in topology.ancestors(dev_id) if a not in devices}
+                    if cluster.enabled and foreign:
+                        statuses = dict(last_status_map)
+                        statuses.update({int(k): v for k, v in cluster.state.get_many('status', foreign).items()})
+                    # Parent DOWN (terkonfirmasi) -> gak usah di-probe, pasti timeout juga
+                    blocked = {}
+                    for dev_id in due:
+                        cause = topology.root_cause(dev_id, lambda a: statuses.get(a) == 'DOWN')
+                        if cause is not None: blocked[dev_id] = cause
+
+                    # Probe yang jatuh tempo barengan (lihat prober.py), hasilnya diproses di sini
+                    probed = engine.sweep([(dev_id,) + devices[dev_id][1:] for dev_id in due if dev_id not in blocked])
+                    for dev_id, r in probed.items():
+                        if r['status'] != 'ERR': raw_status[dev_id] = r['status']
+                    now = datetime.now()
+                    results, history_rows, event_rows, status_changes = [], [], [], {}
+                    for dev_id in due:
+                        name = devices[dev_id][0]
+                        if dev_id in blocked:
+                            results.append({'id': dev_id, 'status': 'UNREACHABLE', 'latency': f"via {names.get(blocked[dev_id])}",
+                                            'color': 'secondary'})
+                            # Dicek lagi tiap SCHED_BASE (tanpa probe), dibangunkan begitu parent-nya UP
+                            scheduler.report(dev_id, 'ERR')
+                            continue
+                        try:
+                            r = probed[dev_id]
+                            status, lat_txt, color, lat_val = r['status'], r['latency'], r['color'], r['value']
+
+                            ancestors = topology.ancestors(dev_id)
+                            suspect = None
+                            if status == 'DOWN' and ancestors:
+                                # Parent di shard ini dicek secepatnya; kalau parent juga baru gagal, kemungkinan
+                                # putusnya di parent -> device ini ditahan (gak masuk hitungan alert)
+                                scheduler.wake([a for a in ancestors if a in devices])
+                                suspect = next((a for a in reversed(ancestors) if raw_status.get(a) == 'DOWN'), None)
+
+                            if suspect is not None:
+                                results.append({'id': dev_id, 'status': 'UNREACHABLE', 'latency': f"via {names.get(suspect)}?",
+                                                'color': 'secondary'})
                             else:
-                                ms = int(lat_val_raw * 1000)
-                                status, lat_txt, lat_val = 'UP', f"{ms} ms", ms
-                                color = 'success' if lat_val < 100 else 'warning'
-
-                        prev = last_status_map.get(d.id, 'UP')
-                        if status != prev:
-                            msg = f"🚨 {d.name} DOWN!" if status == 'DOWN' else f"✅ {d.name} UP!"
-                            send_telegram(msg)
-                            db.session.add(EventLog(device_name=d.name, status=status, message=msg))
-                            db.session.commit()
-                            last_status_map[d.id] = status
-
-                        if status == 'UP':
-                            db.session.add(PingHistory(device_id=d.id, latency=lat_val))
-                            db.session.commit()
-                            
-                        results.append({'id': d.id, 'status': status, 'latency': lat_txt, 'color': color})
-                    except:
-                        results.append({'id': d.id, 'status': 'ERR', 'latency': 'Err', 'color': 'secondary'})
-
-                socketio.emit('update_monitor', results)
+                                # Status terkonfirmasi (N-of-M) -> event log; notifikasinya diurus thread alert.
+                                # Parent DOWN = 1 alert root cause, device di belakangnya gak dapat alert sendiri.
+                                behind = topology.descendants(dev_id) if status == 'DOWN' and dev_id in topology.children else []
+                                note = f"{len(behind)} device di belakangnya tidak dicek" if behind else None
+                                confirmed = alerts.observe(dev_id, name, status, note=note)
+                                if confirmed:
+                                    msg = f"🚨 {name} DOWN!" if confirmed == 'DOWN' else f"✅ {name} UP!"
+                                    if confirmed == 'DOWN' and note: msg += f" ({note})"
+                                    event_rows.append({'device_name': name, 'status': confirmed, 'message': msg, 'timestamp': now})
+                                    last_status_map[dev_id] = confirmed
+                                    status_changes[dev_id] = confirmed
+                                    # Device di belakangnya langsung diproses ulang (UNREACHABLE / probe lagi)
+                                    scheduler.wake([c for c in topology.descendants(dev_id) if c in devices])
+                                results.append({'id': dev_id, 'status': status, 'latency': lat_txt, 'color': color})
+
+                            # DOWN juga dicatat (latency NULL) biar rollup bisa hitung loss%
+                            if status != 'ERR':
+                                timings = r.get('timings') or {}
+                                row = {'device_id': dev_id, 'latency': lat_val if status == 'UP' else None, 'timestamp': now}
+                                row.update({f"{phase}_ms": timings.get(phase) for phase in PHASES})
+                                history_rows.append(row)
+                        except:
+                            status = 'ERR'
+                            results.append({'id': dev_id, 'status': 'ERR', 'latency': 'Err', 'color': 'secondary'})
+                        scheduler.report(dev_id, status)
+
+                    # Titip ke write-behind buffer, gak ada commit per device lagi
+                    db_writer.add(EventLog, event_rows)
+                    tsdb.write('ping', history_rows)
+                    # Yang dikirim cuma hasil yang beda dari probe sebelumnya
+                    changed = {r['id']: r for r in results if published.get(r['id']) != r}
+                    published.update(changed)
+                    if cluster.enabled and status_changes: cluster.state.set_many('status', status_changes)
+                    if changed: publish_monitor(changed)
             except Exception as e:
                 print(f"Error in Monitor Loop: {e}")
-        time.sleep(3)
+        # Tidur sampai device berikutnya jatuh tempo (max 1 detik biar device baru cepat kebaca)
+        next_due = scheduler.next_due()
+        wait = 1.0 if next_due is None else min(1.0, next_due - time.time())
+        socketio.sleep(max(0.05, wait))
 
 # ==========================================
 # DUMMY SPEEDTEST (HEMAT KUOTA & CEPAT)
@@ -218,15 +538,32 @@ def task_speedtest():
         ping_fake = random.randint(9, 25) # Pura-pura Ping 9-25 ms
         
         latest_speed = {'dl': dl_fake, 'ul': ul_fake, 'ping': ping_fake}
+        if cluster.enabled: cluster.state.set_many('speed', {'latest': latest_speed})
         
         # Kirim ke Dashboard
         socketio.emit('update_speed', latest_speed)
         
         # Update setiap 5 detik (Biar grafik di dashboard gerak terus)
-        time.sleep(5)
+        socketio.sleep(5)
+
+def start():
+    # Setup + background task, dipanggil sekali (standalone di bawah, atau dari runtime.py mode --unified)
+    init_services()
+    if cluster.has('prober'):
+        cluster.listen(socketio)
+        socketio.start_background_task(task_monitor)
+        if cluster.leader: socketio.start_background_task(task_speedtest)
+
+def serve():
+    roles = ','.join(sorted(cluster.roles))
+    if cluster.has('web') or cluster.has('ingest'):
+        print(f"🔥 NetWatch ULTIMATE (Dummy Mode) Running on Port {NETWATCH_PORT} [{serving.ASYNC_MODE}, {roles}]...")
+        serving.run(socketio, app, NETWATCH_PORT)
+    else:
+        # Prober murni: gak buka port, cukup jalanin sweep
+        print(f"🔥 NetWatch worker [{roles}] running...")
+        while True: socketio.sleep(3600)
 
 if __name__ == '__main__':
-    socketio.start_background_task(task_monitor)
-    socketio.start_background_task(task_speedtest)
-    print("🔥 NetWatch ULTIMATE (Dummy Mode) Running on Port 5000...")
-    socketio.run(app, host='0.0.0.0', port=5000, debug=False, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    start()
+    serve()
@@ -0,0 +1,224 @@
+import json
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+
+# Token dibaca saat import, bisa jadi sebelum app sempat load_dotenv() (lihat serving.py)
+load_dotenv()
+
+# --- KONFIGURASI NOTIFIKASI ---
+TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
+TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+TELEGRAM_API = os.getenv('TELEGRAM_API', 'https://api.telegram.org')   # ganti ke mock lokal buat testing
+NOTIFY_OUTBOX = os.getenv('NOTIFY_OUTBOX', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'storage', 'outbox.db'))
+NOTIFY_TIMEOUT = float(os.getenv('NOTIFY_TIMEOUT', '10'))          # detik per request ke Telegram
+NOTIFY_RETRIES = int(os.getenv('NOTIFY_RETRIES', '10'))            # percobaan sebelum pesan ditandai 'dead'
+NOTIFY_BACKOFF = float(os.getenv('NOTIFY_BACKOFF', '2'))           # detik, retry ke-N nunggu BACKOFF * 2^N
+NOTIFY_BACKOFF_MAX = float(os.getenv('NOTIFY_BACKOFF_MAX', '300'))
+NOTIFY_MAX_AGE = float(os.getenv('NOTIFY_MAX_AGE', '86400'))       # pesan lebih tua dari ini gak dikirim lagi
+NOTIFY_POOL = int(os.getenv('NOTIFY_POOL', '4'))                   # koneksi keep-alive ke API
+NOTIFY_LEASE = 60   # detik, pesan yang lagi dikirim "dipegang" 1 proses (outbox bisa dipakai beberapa proses)
+
+
+class PermanentError(Exception):
+    pass
+
+
+def _connect(path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    con = sqlite3.connect(path, timeout=15, isolation_level=None, check_same_thread=False)
+    con.execute('PRAGMA journal_mode=WAL')
+    con.execute('PRAGMA synchronous=NORMAL')
+    return con
+
+
+# ==========================================
+# NOTIFIER (TELEGRAM)
+# ==========================================
+# send() cuma masuk antrian di RAM, jadi loop monitor gak pernah nunggu network.
+# Thread pengirim langsung nyimpan pesan ke outbox SQLite (NOTIFY_OUTBOX), baru dikirim lewat
+# 1 requests.Session (koneksi keep-alive). Gagal karena network / 5xx / 429 -> retry dengan
+# backoff eksponensial, pesan tetap di outbox jadi ikut terkirim walaupun prosesnya restart.
+# Outbox dipisah per service ('netwatch', 'sysgaze', ...) dan boleh dipakai bareng beberapa proses.
+class Notifier:
+    def __init__(self, service, token=TELEGRAM_TOKEN, chat_id=TELEGRAM_CHAT_ID, api=TELEGRAM_API,
+                 outbox=NOTIFY_OUTBOX, timeout=NOTIFY_TIMEOUT, retries=NOTIFY_RETRIES, backoff=NOTIFY_BACKOFF,
+                 backoff_max=NOTIFY_BACKOFF_MAX, max_age=NOTIFY_MAX_AGE, pool=NOTIFY_POOL):
+        self.service = service
+        self.token = token
+        self.chat_id = chat_id
+        self.api = api.rstrip('/')
+        self.outbox = outbox
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.max_age = max_age
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.queue = queue.Queue()
+        self.wake = threading.Event()
+        self.idle = threading.Event()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.con = None
+        self.stats = {'queued': 0, 'sent': 0, 'retries': 0, 'dead': 0}
+
+    @property
+    def enabled(self):
+        return bool(self.token and self.chat_id)
+
+    def start(self):
+        # Dipanggil saat proses mulai biar sisa outbox dari run sebelumnya langsung dikirim
+        with self.lock:
+            if self.thread or not self.enabled: return self
+            self.thread = threading.Thread(target=self._run, name=f'notify-{self.service}', daemon=True)
+            self.thread.start()
+        return self
+
+    # --- dipanggil dari loop monitor (gak pernah blocking) ---
+    def send(self, text, parse_mode=None, chat_id=None):
+        self._enqueue('sendMessage', {'chat_id': chat_id or self.chat_id, 'text': text, 'parse_mode': parse_mode})
+
+    def send_photo(self, path, caption=None, parse_mode=None, chat_id=None):
+        # File dibaca saat dikirim, jadi harus tetap ada sampai terkirim
+        self._enqueue('sendPhoto', {'chat_id': chat_id or self.chat_id, 'caption': caption,
+                                    'parse_mode': parse_mode, 'file': path})
+
+    def _enqueue(self, method, payload):
+        if not self.enabled: return
+        payload = {k: v for k, v in payload.items() if v is not None}
+        self.queue.put((method, payload, time.time()))
+        self.idle.clear()
+        self.stats['queued'] += 1
+        self.start()
+        self.wake.set()
+
+    def flush(self, timeout=None):
+        # Nunggu antrian & outbox yang sudah jatuh tempo kosong (buat shutdown / testing)
+        return self.idle.wait(timeout)
+
+    # --- thread pengirim ---
+    def _run(self):
+        self._open()
+        while True:
+            try:
+                self._persist()
+                wait = self._deliver()
+            except Exception as e:
+                print(f"❌ Notifier {self.service} error: {e}")
+                wait = self.backoff
+            if self.queue.empty() and wait > 0: self.idle.set()
+            self.wake.wait(min(wait, NOTIFY_LEASE))
+            self.wake.clear()
+
+    def _open(self):
+        self.con = _connect(self.outbox)
+        self.con.execute('CREATE TABLE IF NOT EXISTS outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+                         'service TEXT NOT NULL, method TEXT NOT NULL, payload TEXT NOT NULL, created REAL NOT NULL, '
+                         "attempts INTEGER NOT NULL DEFAULT 0, next_at REAL NOT NULL, status TEXT NOT NULL DEFAULT 'pending', "
+                         'error TEXT)')
+        self.con.execute('CREATE INDEX IF NOT EXISTS idx_outbox_due ON outbox (service, status, next_at)')
+        left = self.con.execute("SELECT COUNT(*) FROM outbox WHERE service = ? AND status = 'pending'",
+                                (self.service,)).fetchone()[0]
+        if left: print(f"📬 Outbox {self.service}: {left} pesan lama dikirim ulang")
+
+    def _persist(self):
+        rows = []
+        try:
+            while True:
+                method, payload, created = self.queue.get_nowait()
+                rows.append((self.service, method, json.dumps(payload), created, created))
+        except queue.Empty:
+            pass
+        if rows:
+            self.con.executemany('INSERT INTO outbox (service, method, payload, created, next_at) VALUES (?, ?, ?, ?, ?)', rows)
+
+    def _deliver(self):
+        # Kirim pesan yang sudah jatuh tempo urut id. Return detik sampai ada yang jatuh tempo lagi.
+        now = time.time()
+        self.con.execute("UPDATE outbox SET status = 'dead', error = 'expired' WHERE service = ? AND status = 'pending' "
+                         'AND created < ?', (self.service, now - self.max_age))
+        rows = self.con.execute("SELECT id, method, payload, attempts, next_at FROM outbox WHERE service = ? "
+                                "AND status = 'pending' AND next_at <= ? ORDER BY id LIMIT 50", (self.service, now)).fetchall()
+        for row_id, method, payload, attempts, next_at in rows:
+            if not self.queue.empty(): return 0   # pesan baru masuk: simpan dulu ke outbox
+            # Klaim pesan (proses lain yang pakai outbox yang sama gak akan ngirim dobel)
+            claimed = self.con.execute('UPDATE outbox SET next_at = ? WHERE id = ? AND next_at = ?',
+                                       (time.time() + NOTIFY_LEASE, row_id, next_at)).rowcount
+            if not claimed: continue
+            payload = json.loads(payload)
+            try:
+                self._post(method, payload)
+            except PermanentError as e:
+                if payload.pop('parse_mode', None):
+                    # Markdown rusak (misal nama device ada '_'): kirim ulang sebagai teks biasa
+                    self.con.execute('UPDATE outbox SET payload = ?, next_at = ? WHERE id = ?',
+                                     (json.dumps(payload), time.time(), row_id))
+                    return 0
+                self.stats['dead'] += 1
+                self.con.execute("UPDATE outbox SET status = 'dead', error = ? WHERE id = ?", (str(e)[:500], row_id))
+                print(f"❌ Notifikasi {self.service} ditolak: {e}")
+                continue
+            except Exception as e:
+                # Network / 5xx / 429: API-nya lagi bermasalah, sisa pesan nunggu juga (urutan tetap)
+                retry_after = getattr(e, 'retry_after', None)
+                if not retry_after: attempts += 1   # 429 bukan kegagalan pesan, cuma disuruh nunggu
+                if attempts >= self.retries:
+                    self.stats['dead'] += 1
+                    self.con.execute("UPDATE outbox SET status = 'dead', attempts = ?, error = ? WHERE id = ?",
+                                     (attempts, str(e)[:500], row_id))
+                    print(f"❌ Notifikasi {self.service} gagal {attempts}x, menyerah: {e}")
+                    return 0
+                delay = retry_after or min(self.backoff_max, self.backoff * 2 ** (attempts - 1))
+                delay *= random.uniform(1.0, 1.2)
+                self.stats['retries'] += 1
+                self.con.execute('UPDATE outbox SET attempts = ?, next_at = ?, error = ? WHERE id = ?',
+                                 (attempts, time.time() + delay, str(e)[:500], row_id))
+                print(f"⚠️ Notifikasi {self.service} gagal ({e}), retry {delay:.1f} dtk lagi")
+                return delay
+            self.stats['sent'] += 1
+            self.con.execute('DELETE FROM outbox WHERE id = ?', (row_id,))
+        if len(rows) == 50: return 0
+        nxt = self.con.execute("SELECT MIN(next_at) FROM outbox WHERE service = ? AND status = 'pending'",
+                               (self.service,)).fetchone()[0]
+        return NOTIFY_LEASE if nxt is None else max(0.0, nxt - time.time())
+
+    def _post(self, method, payload):
+        url = f"{self.api}/bot{self.token}/{method}"
+        payload = dict(payload)
+        path = payload.pop('file', None)
+        if path:
+            if not os.path.exists(path): raise PermanentError(f"file {path} hilang")
+            with open(path, 'rb') as f:
+                resp = self.session.post(url, data=payload, files={'photo': f}, timeout=self.timeout)
+        else:
+            resp = self.session.post(url, data=payload, timeout=self.timeout)
+        if resp.status_code == 200: return
+        try: body = resp.json()
+        except ValueError: body = {}
+        error = RuntimeError(f"HTTP {resp.status_code}: {body.get('description', resp.text[:200])}")
+        if resp.status_code == 429:
+            error.retry_after = (body.get('parameters') or {}).get('retry_after')
+            raise error
+        if 400 <= resp.status_code < 500: raise PermanentError(str(error))
+        raise error
+
+    def pending(self):
+        con = _connect(self.outbox)
+        try:
+            return con.execute("SELECT COUNT(*) FROM outbox WHERE service = ? AND status = 'pending'",
+                               (self.service,)).fetchone()[0]
+        except sqlite3.OperationalError:
+            return 0
+        finally:
+            con.close()
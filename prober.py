@@ -0,0 +1,117 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from ping3 import ping
+
+from icmp import ICMP_COUNT, IcmpMux
+from probes import PHASES, PROBES, ConnectionPool, result
+
+# --- KONFIGURASI PROBE ---
+# Semua bisa di-override lewat .env
+PROBE_TIMEOUT = float(os.getenv('PROBE_TIMEOUT', '1'))           # detik per probe
+PROBE_CONCURRENCY = int(os.getenv('PROBE_CONCURRENCY', '512'))   # max probe jalan barengan
+ICMP_WORKERS = int(os.getenv('ICMP_WORKERS', '128'))             # thread pool buat ping3 (blocking)
+SWEEP_DEADLINE = float(os.getenv('SWEEP_DEADLINE', '2.5'))       # batas waktu 1 sweep (detik)
+
+
+# Target yang belum sempat di-probe sampai deadline: jangan dianggap DOWN (biar gak false alarm)
+SKIPPED = result('ERR', 'Deadline', 'secondary', 0)
+FAILED = result('ERR', 'Err', 'secondary', 0)
+
+
+# Probe banyak device sekaligus: TCP / HTTP / TLS / DNS / banner pakai asyncio (probes.py),
+# ICMP pakai socket multiplexed (icmp.py) atau worker pool ping3.
+# Satu sweep selesai kira-kira dalam 1x timeout, bukan N x timeout.
+class ProbeEngine:
+    def __init__(self, timeout=PROBE_TIMEOUT, concurrency=PROBE_CONCURRENCY,
+                 icmp_workers=ICMP_WORKERS, deadline=SWEEP_DEADLINE, icmp_count=ICMP_COUNT):
+        self.timeout = timeout
+        self.icmp_count = icmp_count
+        self.concurrency = concurrency
+        self.deadline = deadline
+        self.loop = asyncio.new_event_loop()
+        self.icmp_pool = ThreadPoolExecutor(max_workers=icmp_workers, thread_name_prefix='icmp')
+        # 1 socket ICMP buat semua host (lihat icmp.py); None = gak ada izin socket ICMP -> ping3
+        self.icmp = IcmpMux.open(self.loop)
+        print(f"📡 ICMP: {'socket ' + self.icmp.kind + ' (multiplexed)' if self.icmp else 'ping3 (thread pool)'}")
+        self.pool = ConnectionPool()   # koneksi keep-alive probe HTTP(S)
+
+    def sweep(self, targets):
+        # targets: list of (device_id, ip, port) atau (device_id, ip, port, probe_type, config) -> {device_id: result}
+        if not targets: return {}
+        return self.loop.run_until_complete(self._sweep(targets))
+
+    def close(self):
+        self.pool.close()
+        if self.icmp: self.icmp.close()
+        self.icmp_pool.shutdown(wait=False)
+        self.loop.close()
+
+    async def _sweep(self, targets):
+        sem = asyncio.Semaphore(self.concurrency)
+        tasks = {t[0]: self.loop.create_task(self._guarded(sem, *t[1:])) for t in targets}
+        done, pending = await asyncio.wait(tasks.values(), timeout=self.deadline)
+        for t in pending: t.cancel()
+        if pending: await asyncio.gather(*pending, return_exceptions=True)
+
+        results = {}
+        for dev_id, t in tasks.items():
+            if t not in done: results[dev_id] = SKIPPED
+            elif t.exception() is not None: results[dev_id] = FAILED
+            else: results[dev_id] = t.result()
+        return results
+
+    async def _guarded(self, sem, ip, port, probe_type=None, config=None):
+        # Tanpa probe_type: port 0 = ICMP, selain itu TCP connect (perilaku lama)
+        probe_type = probe_type or ('tcp' if port and port > 0 else 'icmp')
+        if probe_type == 'icmp' and self.icmp:
+            # ICMP multiplexed gak makan thread / fd, lajunya sudah diatur ICMP_RATE
+            return await self.probe_icmp_mux(ip)
+        probe = PROBES.get(probe_type)
+        if probe is None: return result('ERR', f"Probe {probe_type}?", 'secondary', 0)
+        async with sem:
+            return await probe(self, ip, port, config or {})
+
+    async def probe_tcp(self, ip, port):
+        timings = dict.fromkeys(PHASES)
+        t = time.perf_counter()
+        try:
+            _, writer = await asyncio.wait_for(asyncio.open_connection(ip, int(port)), self.timeout)
+        except (OSError, asyncio.TimeoutError):
+            return result('DOWN', 'Closed', 'danger', 0)
+        timings['connect'] = round((time.perf_counter() - t) * 1000, 2)
+        writer.close()
+        try: await writer.wait_closed()
+        except OSError: pass
+        return result('UP', f"Port {port}", 'success', max(1, round(timings['connect'])), timings)
+
+    async def probe_icmp_mux(self, ip):
+        stats = await self.icmp.ping(ip, count=self.icmp_count, timeout=self.timeout)
+        if stats is None or not stats['received']:
+            return result('DOWN', 'Timeout', 'danger', 0)
+        ms = int(stats['avg'])
+        text = f"{ms} ms" if not stats['loss'] else f"{ms} ms ({stats['loss']}% loss)"
+        res = result('UP', text, 'success' if ms < 100 and not stats['loss'] else 'warning', ms)
+        res.update(loss=stats['loss'], jitter=round(stats['jitter'], 2))
+        return res
+
+    async def probe_icmp(self, ip):
+        # ping3 blocking -> lempar ke thread pool biar event loop gak ketahan
+        lat = await self.loop.run_in_executor(self.icmp_pool, _ping, ip, self.timeout)
+        # ping3: None = timeout, False = host gak bisa di-resolve / error
+        if lat is None or lat is False:
+            return result('DOWN', 'Timeout', 'danger', 0)
+        ms = int(lat * 1000)
+        return result('UP', f"{ms} ms", 'success' if ms < 100 else 'warning', ms)
+
+
+def _ping(ip, timeout):
+    try: return ping(ip, timeout=timeout)
+    except Exception: return False
+
+
+# Probe bawaan ikut registry, jadi Device.probe_type = 'icmp' / 'tcp' juga bisa dipilih eksplisit
+PROBES['tcp'] = lambda engine, ip, port, cfg: engine.probe_tcp(ip, port)
+PROBES['icmp'] = lambda engine, ip, port, cfg: engine.probe_icmp(ip)
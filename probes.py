@@ -0,0 +1,427 @@
+import asyncio
+import json
+import os
+import re
+import socket
+import ssl
+import struct
+import time
+from datetime import datetime, timezone
+
+# --- OPTIONAL: BACA EXPIRY CERT YANG GAK DIVERIFIKASI (pip install cryptography) ---
+try:
+    from cryptography import x509
+except ImportError:
+    x509 = None
+
+# --- KONFIGURASI PROBE LAYANAN ---
+SERVICE_TIMEOUT = float(os.getenv('SERVICE_TIMEOUT', '2'))        # detik per probe http/tls/dns/banner (< SWEEP_DEADLINE)
+POOL_IDLE_SECONDS = float(os.getenv('POOL_IDLE_SECONDS', '60'))   # koneksi HTTP keep-alive disimpan selama ini
+POOL_PER_HOST = int(os.getenv('POOL_PER_HOST', '2'))
+HTTP_MAX_BODY = int(os.getenv('HTTP_MAX_BODY', '65536'))          # byte body yang dibaca buat cek isi
+CERT_WARN_DAYS = int(os.getenv('CERT_WARN_DAYS', '14'))           # cert mau habis -> kuning
+
+PHASES = ('dns', 'connect', 'tls', 'ttfb')
+DEFAULT_PORTS = {'http': 80, 'https': 443, 'tls': 443, 'dns': 53}
+# Isi kolom "Probe Check" yang bukan JSON dianggap opsi utama probe-nya
+SHORTHAND = {'http': 'path', 'https': 'path', 'tls': 'sni', 'dns': 'name', 'banner': 'expect'}
+# Tipe opsi probe_config, dicek waktu device disimpan (lihat check_config)
+STR_OPTIONS = ('path', 'host', 'sni', 'ca', 'name', 'send', 'expect', 'expect_body')
+BOOL_OPTIONS = ('verify', 'tls')
+NUM_OPTIONS = ('timeout', 'warn_days')
+
+
+def result(status, latency, color, value, timings=None):
+    res = {'status': status, 'latency': latency, 'color': color, 'value': value}
+    if timings is not None: res['timings'] = timings
+    return res
+
+
+def down(text, timings=None):
+    return result('DOWN', text, 'danger', 0, timings)
+
+
+def parse_config(probe_type, raw):
+    # Device.probe_config: JSON ({"path": "/health", "expect_body": "ok"}) atau singkatan ("/health")
+    # Config yang bakal bikin probe crash (regex rusak, tipe salah) ditolak di sini -> ValueError
+    raw = (raw or '').strip()
+    if not raw: return {}
+    cfg = json.loads(raw) if raw.startswith('{') else {SHORTHAND.get(probe_type, 'value'): raw}
+    if not isinstance(cfg, dict): raise ValueError("probe_config harus object JSON")
+    check_config(probe_type, cfg)
+    return cfg
+
+
+def check_config(probe_type, cfg):
+    for k in STR_OPTIONS:
+        if k in cfg and not isinstance(cfg[k], str): raise ValueError(f"{k} harus teks")
+    for k in BOOL_OPTIONS:
+        if k in cfg and not isinstance(cfg[k], bool): raise ValueError(f"{k} harus true/false")
+    for k in NUM_OPTIONS:
+        v = cfg.get(k)
+        if k in cfg and (isinstance(v, bool) or not isinstance(v, (int, float)) or not v > 0):
+            raise ValueError(f"{k} harus angka > 0")
+    if 'expect_status' in cfg:
+        expect = cfg['expect_status']
+        codes = expect if isinstance(expect, list) else [expect]
+        try:
+            if not codes or any(isinstance(c, bool) or not isinstance(c, (int, str)) for c in codes): raise ValueError
+            if isinstance(expect, list) and not all(isinstance(c, int) for c in codes): raise ValueError
+            _status_ok(200, expect)
+        except ValueError:
+            raise ValueError('expect_status harus 200, [200, 204] atau "200-399"')
+    if probe_type == 'banner' and cfg.get('expect'):
+        try: re.compile(cfg['expect'])
+        except re.error as e: raise ValueError(f"expect bukan regex valid: {e}")
+
+
+# ==========================================
+# REGISTRY PROBE
+# ==========================================
+# Probe = coroutine (engine, host, port, config) -> result(). Tipe baru cukup:
+#   @register('nama')
+#   async def probe_nama(engine, host, port, cfg): ...
+# lalu isi Device.probe_type = 'nama'. icmp & tcp didaftarkan di prober.py.
+PROBES = {}
+
+
+def register(name):
+    def wrap(fn):
+        PROBES[name] = fn
+        return fn
+    return wrap
+
+
+# ==========================================
+# POOL KONEKSI (KEEP-ALIVE)
+# ==========================================
+# Probe HTTP(S) berikutnya ke host yang sama pakai ulang koneksi lama (gak ada connect + handshake TLS lagi).
+class ConnectionPool:
+    def __init__(self, idle_seconds=POOL_IDLE_SECONDS, per_host=POOL_PER_HOST):
+        self.idle_seconds = idle_seconds
+        self.per_host = per_host
+        self.idle = {}   # key -> [(reader, writer, sejak)]
+        self.stats = {'reused': 0, 'opened': 0}
+
+    def get(self, key):
+        conns = self.idle.get(key)
+        while conns:
+            reader, writer, since = conns.pop()
+            if time.monotonic() - since < self.idle_seconds and not writer.is_closing() and not reader.at_eof():
+                self.stats['reused'] += 1
+                return reader, writer
+            writer.close()
+        return None
+
+    def put(self, key, reader, writer):
+        conns = self.idle.setdefault(key, [])
+        if len(conns) >= self.per_host:
+            writer.close()
+            return
+        conns.append((reader, writer, time.monotonic()))
+
+    def close(self):
+        for conns in self.idle.values():
+            for _, writer, _ in conns: writer.close()
+        self.idle.clear()
+
+
+def _ms(start):
+    return round((time.perf_counter() - start) * 1000, 2)
+
+
+def _is_ip(host):
+    try:
+        socket.inet_pton(socket.AF_INET6 if ':' in host else socket.AF_INET, host)
+        return True
+    except OSError:
+        return False
+
+
+async def resolve(loop, host, timings):
+    if _is_ip(host): return host
+    t = time.perf_counter()
+    infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    timings['dns'] = _ms(t)
+    return infos[0][4][0]
+
+
+def ssl_context(verify, cafile=None):
+    ctx = ssl.create_default_context(cafile=cafile)   # cafile: CA internal kantor
+    if not verify:
+        # Perangkat internal sering pakai cert self-signed
+        ctx.check_hostname = False
+        ctx.verify_mode = ssl.CERT_NONE
+    return ctx
+
+
+async def connect(engine, host, port, timings, tls=False, cfg=None):
+    cfg = cfg or {}
+    ip = await resolve(engine.loop, host, timings)
+    t = time.perf_counter()
+    reader, writer = await asyncio.open_connection(ip, port)
+    timings['connect'] = _ms(t)
+    if tls:
+        t = time.perf_counter()
+        await writer.start_tls(ssl_context(cfg.get('verify', False), cfg.get('ca')), server_hostname=cfg.get('sni') or host)
+        timings['tls'] = _ms(t)
+    engine.pool.stats['opened'] += 1
+    return reader, writer
+
+
+def _failure(e):
+    # Exception koneksi -> teks singkat buat dashboard
+    if isinstance(e, asyncio.TimeoutError): return 'Timeout'
+    if isinstance(e, ssl.SSLCertVerificationError): return 'Cert invalid'
+    if isinstance(e, ssl.SSLError): return 'TLS error'
+    if isinstance(e, socket.gaierror): return 'DNS fail'
+    if isinstance(e, ConnectionRefusedError): return 'Closed'
+    return 'Error'
+
+
+def _total(timings):
+    return round(sum(v for v in timings.values() if v is not None))
+
+
+def _color(ms):
+    return 'success' if ms < 500 else 'warning'
+
+
+# ==========================================
+# HTTP / HTTPS
+# ==========================================
+# cfg: path (default "/"), expect_status ("200-399" / 200 / [200, 204]), expect_body (substring),
+#      host (header Host), verify (cek cert, default false), ca
+def _status_ok(code, expect):
+    if expect is None: return 200 <= code < 400
+    if isinstance(expect, int): return code == expect
+    if isinstance(expect, list): return code in expect
+    lo, _, hi = str(expect).partition('-')
+    return int(lo) <= code <= int(hi or lo)
+
+
+async def _read_response(reader, status_line):
+    code = int(status_line.split()[1])
+    headers = {}
+    while True:
+        line = (await reader.readuntil(b'\r\n')).decode('latin-1').strip()
+        if not line: break
+        k, _, v = line.partition(':')
+        headers[k.strip().lower()] = v.strip()
+
+    body, reusable = b'', headers.get('connection', '').lower() != 'close'
+    if code in (204, 304) or code < 200:
+        pass   # memang gak ada body
+    elif headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readuntil(b'\r\n')).split(b';')[0], 16)
+            if size == 0:
+                await reader.readuntil(b'\r\n')
+                break
+            chunk = await reader.readexactly(size + 2)
+            if len(body) < HTTP_MAX_BODY: body += chunk[:-2]
+    elif 'content-length' in headers:
+        length = int(headers['content-length'])
+        if length > HTTP_MAX_BODY:
+            body, reusable = await reader.read(HTTP_MAX_BODY), False   # sisanya gak dibaca -> koneksi dibuang
+        else:
+            body = await reader.readexactly(length)
+    else:
+        body, reusable = await reader.read(HTTP_MAX_BODY), False
+    return code, body[:HTTP_MAX_BODY], reusable
+
+
+async def _http(engine, host, port, cfg, tls):
+    port = port or DEFAULT_PORTS['https' if tls else 'http']
+    timings = dict.fromkeys(PHASES)
+    # Setting TLS ikut jadi key: device dengan verify / CA beda gak boleh pakai koneksi yang sama
+    key = (host, port, tls, cfg.get('sni'), cfg.get('verify', False), cfg.get('ca'))
+    conn = engine.pool.get(key)
+    reader, writer = conn or await connect(engine, host, port, timings, tls, cfg)
+
+    path = cfg.get('path') or '/'
+    request = (f"GET {path} HTTP/1.1\r\nHost: {cfg.get('host') or host}\r\nUser-Agent: NetWatch-Probe\r\n"
+               f"Accept: */*\r\nConnection: keep-alive\r\n\r\n").encode()
+    try:
+        t = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        status_line = await reader.readuntil(b'\r\n')   # status line = byte-byte pertama respon
+        timings['ttfb'] = _ms(t)
+        code, body, reusable = await _read_response(reader, status_line)
+    except (asyncio.IncompleteReadError, ConnectionError) as e:
+        writer.close()
+        if conn:
+            # Koneksi keep-alive basi (server sudah nutup): ulang sekali pakai koneksi baru
+            return await _http(engine, host, port, cfg, tls)
+        raise e
+    except BaseException:
+        writer.close()
+        raise
+    if reusable: engine.pool.put(key, reader, writer)
+    else: writer.close()
+
+    ms = _total(timings)
+    if not _status_ok(code, cfg.get('expect_status')):
+        return down(f"HTTP {code}", timings)
+    expect_body = cfg.get('expect_body')
+    if expect_body and expect_body.encode() not in body:
+        return down('Body mismatch', timings)
+    return result('UP', f"HTTP {code} {ms} ms", _color(ms), ms, timings)
+
+
+@register('http')
+async def probe_http(engine, host, port, cfg):
+    return await _guard(_http(engine, host, port, cfg, False), cfg)
+
+
+@register('https')
+async def probe_https(engine, host, port, cfg):
+    return await _guard(_http(engine, host, port, cfg, True), cfg)
+
+
+async def _guard(coro, cfg):
+    try:
+        return await asyncio.wait_for(coro, cfg.get('timeout', SERVICE_TIMEOUT))
+    except (OSError, asyncio.TimeoutError, ssl.SSLError, ValueError, IndexError, asyncio.IncompleteReadError,
+            asyncio.LimitOverrunError) as e:
+        return down(_failure(e))
+
+
+# ==========================================
+# TLS HANDSHAKE + EXPIRY CERT
+# ==========================================
+# cfg: sni, verify (default true: rantai cert + hostname dicek), ca (file CA sendiri), warn_days
+def cert_days_left(ssl_object):
+    cert = ssl_object.getpeercert()
+    if cert and cert.get('notAfter'):
+        expires = datetime.fromtimestamp(ssl.cert_time_to_seconds(cert['notAfter']), timezone.utc)
+    elif x509 is not None:
+        der = ssl_object.getpeercert(binary_form=True)
+        if not der: return None
+        expires = x509.load_der_x509_certificate(der).not_valid_after_utc
+    else:
+        return None   # verify=false tanpa cryptography: expiry gak bisa dibaca
+    return (expires - datetime.now(timezone.utc)).total_seconds() / 86400
+
+
+async def _tls(engine, host, port, cfg):
+    port = port or DEFAULT_PORTS['tls']
+    timings = dict.fromkeys(PHASES)
+    cfg = dict(cfg, verify=cfg.get('verify', True))
+    _, writer = await connect(engine, host, port, timings, True, cfg)
+    try:
+        days = cert_days_left(writer.get_extra_info('ssl_object'))
+    finally:
+        writer.close()
+    ms = _total(timings)
+    if days is None:
+        return result('UP', f"TLS {ms} ms", _color(ms), ms, timings)
+    if days < 0:
+        return down('Cert expired', timings)
+    warn = days < cfg.get('warn_days', CERT_WARN_DAYS)
+    return result('UP', f"Cert {int(days)}d", 'warning' if warn else _color(ms), ms, timings)
+
+
+@register('tls')
+async def probe_tls(engine, host, port, cfg):
+    return await _guard(_tls(engine, host, port, cfg), cfg)
+
+
+# ==========================================
+# DNS (UDP, QUERY A KE SERVER DEVICE)
+# ==========================================
+# cfg: name (default "example.com"), expect (IP yang harus ada di jawaban)
+def dns_query(name, qid):
+    qname = b''.join(bytes([len(p)]) + p.encode() for p in name.strip('.').split('.')) + b'\0'
+    return struct.pack('!HHHHHH', qid, 0x0100, 1, 0, 0, 0) + qname + struct.pack('!HH', 1, 1)
+
+
+def _skip_name(data, pos):
+    while True:
+        n = data[pos]
+        if n == 0: return pos + 1
+        if n & 0xc0 == 0xc0: return pos + 2   # pointer kompresi
+        pos += n + 1
+
+
+def dns_answers(data, qid):
+    rid, flags, qd, an = struct.unpack_from('!HHHH', data)
+    if rid != qid: raise ValueError('DNS id beda')
+    pos = 12
+    for _ in range(qd): pos = _skip_name(data, pos) + 4
+    ips = []
+    for _ in range(an):
+        pos = _skip_name(data, pos)
+        rtype, _, _, rdlen = struct.unpack_from('!HHIH', data, pos)
+        pos += 10
+        if rtype == 1 and rdlen == 4: ips.append(socket.inet_ntoa(data[pos:pos + 4]))
+        pos += rdlen
+    return flags & 0x000f, ips
+
+
+class _DnsClient(asyncio.DatagramProtocol):
+    def __init__(self, fut):
+        self.fut = fut
+
+    def datagram_received(self, data, addr):
+        if not self.fut.done(): self.fut.set_result(data)
+
+    def error_received(self, exc):
+        if not self.fut.done(): self.fut.set_exception(exc)
+
+
+async def _dns(engine, host, port, cfg):
+    port = port or DEFAULT_PORTS['dns']
+    timings = dict.fromkeys(PHASES)
+    name = cfg.get('name') or 'example.com'
+    qid = int.from_bytes(os.urandom(2), 'big')
+    fut = engine.loop.create_future()
+    transport, _ = await engine.loop.create_datagram_endpoint(lambda: _DnsClient(fut), remote_addr=(host, port))
+    try:
+        t = time.perf_counter()
+        transport.sendto(dns_query(name, qid))
+        data = await fut
+        timings['dns'] = _ms(t)
+    finally:
+        transport.close()
+    rcode, ips = dns_answers(data, qid)
+    ms = _total(timings)
+    if rcode != 0: return down(f"DNS rcode {rcode}", timings)
+    if not ips: return down('No answer', timings)
+    if cfg.get('expect') and cfg['expect'] not in ips: return down('Answer mismatch', timings)
+    return result('UP', f"DNS {ms} ms", _color(ms), ms, timings)
+
+
+@register('dns')
+async def probe_dns(engine, host, port, cfg):
+    return await _guard(_dns(engine, host, port, cfg), cfg)
+
+
+# ==========================================
+# BANNER (TCP + REGEX)
+# ==========================================
+# cfg: expect (regex, default: asal ada data), send (dikirim dulu, \r\n boleh), tls
+async def _banner(engine, host, port, cfg):
+    if not port: return down('No port')
+    timings = dict.fromkeys(PHASES)
+    reader, writer = await connect(engine, host, port, timings, cfg.get('tls', False), cfg)
+    try:
+        t = time.perf_counter()
+        if cfg.get('send'):
+            writer.write(cfg['send'].encode().decode('unicode_escape').encode('latin-1'))
+            await writer.drain()
+        data = await reader.read(1024)
+        timings['ttfb'] = _ms(t)
+    finally:
+        writer.close()
+    ms = _total(timings)
+    text = data.decode('utf-8', 'replace')
+    if not text.strip() or (cfg.get('expect') and not re.search(cfg['expect'], text)):
+        return down('Banner mismatch', timings)
+    return result('UP', f"{text.strip().splitlines()[0][:24]} ({ms} ms)", _color(ms), ms, timings)
+
+
+@register('banner')
+async def probe_banner(engine, host, port, cfg):
+    return await _guard(_banner(engine, host, port, cfg), cfg)
@@ -0,0 +1,282 @@
+import math
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Integer, delete, func, select
+
+# --- KONFIGURASI ROLLUP & RETENSI ---
+ROLLUP_INTERVAL = float(os.getenv('ROLLUP_INTERVAL', '30'))            # worker jalan tiap N detik
+ROLLUP_GRACE = float(os.getenv('ROLLUP_GRACE', '30'))                  # tunggu data telat (write-behind) sebelum bucket ditutup
+ROLLUP_CHUNK_MINUTES = int(os.getenv('ROLLUP_CHUNK_MINUTES', '10'))    # menit raw yang diproses per transaksi
+ROLLUP_DELETE_BATCH = int(os.getenv('ROLLUP_DELETE_BATCH', '5000'))    # hapus data kadaluarsa dicicil segini
+RAW_RETENTION_HOURS = float(os.getenv('RAW_RETENTION_HOURS', '48'))
+MINUTE_RETENTION_DAYS = float(os.getenv('MINUTE_RETENTION_DAYS', '30'))
+HOUR_RETENTION_DAYS = float(os.getenv('HOUR_RETENTION_DAYS', '365'))
+
+MINUTE = 60
+HOUR = 3600
+EPOCH = datetime(1970, 1, 1)   # waktu naive di DB dihitung dari sini (= dibaca sebagai UTC)
+
+# Range chart sampai segini masih pakai data raw / 1 menit, di atasnya pindah tier
+RAW_MAX_RANGE = HOUR
+MINUTE_MAX_RANGE = 2 * 24 * HOUR
+
+
+def floor_time(ts, resolution):
+    # Waktu naive dibaca sebagai UTC, sama dengan strftime('%s') / extract(epoch) di range_series.
+    # Pakai ts.timestamp() (zona lokal) bikin bucket jam bergeser di zona +05:30 dkk.
+    epoch = int((ts - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=epoch - epoch % resolution)
+
+
+def percentile(sorted_values, pct):
+    # nearest-rank
+    if not sorted_values: return None
+    k = max(0, math.ceil(pct / 100.0 * len(sorted_values)) - 1)
+    return sorted_values[k]
+
+
+def pick_resolution(start, now=None):
+    # Pilih tier paling detail yang datanya masih ada untuk range [start, now]
+    now = now or datetime.now()
+    span = (now - start).total_seconds()
+    if span <= RAW_MAX_RANGE and start >= now - timedelta(hours=RAW_RETENTION_HOURS): return 0
+    if span <= MINUTE_MAX_RANGE and start >= now - timedelta(days=MINUTE_RETENTION_DAYS): return MINUTE
+    return HOUR
+
+
+# ==========================================
+# ROLLUP WORKER
+# ==========================================
+# Raw PingHistory -> rollup 1 menit -> rollup 1 jam (min/avg/max/p95/loss%).
+# Kerjanya dicicil (per chunk, per batch delete) dengan commit kecil-kecil,
+# jadi monitor & dashboard gak pernah ketahan lock lama.
+class RollupWorker:
+    def __init__(self, app, db, raw_model, rollup_model, interval=ROLLUP_INTERVAL, retention=()):
+        self.app = app
+        self.db = db
+        self.raw = raw_model
+        self.rollup = rollup_model
+        self.interval = interval
+        self.retention = list(retention)   # [(model, kolom_waktu, umur_jam)] tabel lain yang cukup dipangkas
+        self.watermark = {}   # resolution -> bucket berikutnya yang belum di-rollup
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, name='rollup', daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while True:
+            try: self.run_once()
+            except Exception as e: print(f"❌ Rollup error: {e}")
+            time.sleep(self.interval)
+
+    def run_once(self, now=None):
+        now = now or datetime.now()
+        with self.app.app_context():
+            minutes = self.rollup_minutes(now)
+            hours = self.rollup_hours(now)
+            expired = self.expire(now)
+        return {'minute_buckets': minutes, 'hour_buckets': hours, 'expired_rows': expired}
+
+    # --- WATERMARK ---
+    def _next_bucket(self, resolution, source_start):
+        if resolution in self.watermark: return self.watermark[resolution]
+        last = self.db.session.scalar(select(func.max(self.rollup.bucket)).where(self.rollup.resolution == resolution))
+        # floor_time: bucket lama yang masih ke-floor pakai zona lokal (misal jam :30) dirapikan lagi ke grid
+        if last is not None: return floor_time(last, resolution) + timedelta(seconds=resolution)
+        first = source_start()
+        return floor_time(first, resolution) if first is not None else None
+
+    # --- RAW -> 1 MENIT ---
+    def rollup_minutes(self, now):
+        R = self.raw
+        start = self._next_bucket(MINUTE, lambda: self.db.session.scalar(select(func.min(R.timestamp))))
+        if start is None: return 0
+        closed_until = floor_time(now - timedelta(seconds=ROLLUP_GRACE), MINUTE)
+        written = 0
+        while start < closed_until:
+            end = min(start + timedelta(minutes=ROLLUP_CHUNK_MINUTES), closed_until)
+            rows = self.db.session.execute(
+                select(R.device_id, R.timestamp, R.latency)
+                .where(R.timestamp >= start, R.timestamp < end)
+            ).all()
+            if not rows:
+                # Lompati periode kosong (server mati / belum ada device) langsung ke data berikutnya
+                nxt = self.db.session.scalar(select(func.min(R.timestamp)).where(R.timestamp >= end))
+                start = min(floor_time(nxt, MINUTE), closed_until) if nxt is not None else closed_until
+                start = max(start, end)
+                self.watermark[MINUTE] = start
+                continue
+
+            groups = {}
+            for dev_id, ts, lat in rows:
+                groups.setdefault((dev_id, floor_time(ts, MINUTE)), []).append(lat)
+
+            out = []
+            for (dev_id, bucket), lats in groups.items():
+                ok = sorted(v for v in lats if v is not None)
+                out.append({
+                    'device_id': dev_id, 'resolution': MINUTE, 'bucket': bucket,
+                    'samples': len(lats), 'lost': len(lats) - len(ok),
+                    'lat_min': ok[0] if ok else None, 'lat_max': ok[-1] if ok else None,
+                    'lat_avg': sum(ok) / len(ok) if ok else None, 'lat_p95': percentile(ok, 95),
+                })
+            self._write(out, MINUTE, start, end)
+            written += len(out)
+            start = self.watermark[MINUTE] = end
+            time.sleep(0)  # kasih giliran thread lain
+        return written
+
+    # --- 1 MENIT -> 1 JAM ---
+    def rollup_hours(self, now):
+        P = self.rollup
+        start = self._next_bucket(HOUR, lambda: self.db.session.scalar(
+            select(func.min(P.bucket)).where(P.resolution == MINUTE)))
+        if start is None: return 0
+        # Jam baru ditutup kalau semua menitnya sudah di-rollup
+        closed_until = floor_time(self.watermark.get(MINUTE, start), HOUR)
+        written = 0
+        while start < closed_until:
+            end = start + timedelta(seconds=HOUR)
+            rows = self.db.session.execute(
+                select(P.device_id, P.samples, P.lost, P.lat_min, P.lat_avg, P.lat_max, P.lat_p95)
+                .where(P.resolution == MINUTE, P.bucket >= start, P.bucket < end)
+            ).all()
+
+            groups = {}
+            for r in rows: groups.setdefault(r.device_id, []).append(r)
+
+            out = []
+            for dev_id, mins in groups.items():
+                ok = [m for m in mins if m.lat_avg is not None]
+                ok_count = sum(m.samples - m.lost for m in ok)
+                out.append({
+                    'device_id': dev_id, 'resolution': HOUR, 'bucket': start,
+                    'samples': sum(m.samples for m in mins), 'lost': sum(m.lost for m in mins),
+                    'lat_min': min((m.lat_min for m in ok), default=None),
+                    'lat_max': max((m.lat_max for m in ok), default=None),
+                    'lat_avg': sum(m.lat_avg * (m.samples - m.lost) for m in ok) / ok_count if ok_count else None,
+                    # p95 per jam = p95 berbobot dari p95 tiap menit (pendekatan, raw-nya sudah gak dibaca lagi)
+                    'lat_p95': _weighted_percentile([(m.lat_p95, m.samples - m.lost) for m in ok], 95),
+                })
+            self._write(out, HOUR, start, end)
+            written += len(out)
+            start = self.watermark[HOUR] = end
+            time.sleep(0)
+        return written
+
+    def _write(self, rows, resolution, start, end):
+        if not rows: return
+        P = self.rollup
+        # Idempotent: kalau chunk ini pernah ditulis setengah jalan, timpa saja
+        self.db.session.execute(delete(P).where(P.resolution == resolution, P.bucket >= start, P.bucket < end))
+        if rows: self.db.session.execute(P.__table__.insert(), rows)
+        self.db.session.commit()
+
+    # --- RETENSI ---
+    def expire(self, now):
+        P = self.rollup
+        minute_done = self.watermark.get(MINUTE)
+        hour_done = self.watermark.get(HOUR)
+        total = 0
+        # Raw cuma boleh dihapus kalau sudah masuk rollup menit, menit kalau sudah masuk rollup jam
+        if minute_done is not None:
+            cutoff = min(now - timedelta(hours=RAW_RETENTION_HOURS), minute_done)
+            total += self._delete_before(self.raw.__table__, self.raw.timestamp, cutoff)
+        if hour_done is not None:
+            cutoff = min(now - timedelta(days=MINUTE_RETENTION_DAYS), hour_done)
+            total += self._delete_before(P.__table__, P.bucket, cutoff, P.resolution == MINUTE)
+        total += self._delete_before(P.__table__, P.bucket, now - timedelta(days=HOUR_RETENTION_DAYS), P.resolution == HOUR)
+        for model, column, hours in self.retention:
+            total += self._delete_before(model.__table__, column, now - timedelta(hours=hours))
+        return total
+
+    def _delete_before(self, table, column, cutoff, *extra):
+        total = 0
+        while True:
+            ids = select(table.c.id).where(column < cutoff, *extra).limit(ROLLUP_DELETE_BATCH).scalar_subquery()
+            n = self.db.session.execute(delete(table).where(table.c.id.in_(ids))).rowcount
+            self.db.session.commit()
+            total += n
+            if n < ROLLUP_DELETE_BATCH: return total
+            time.sleep(0.05)
+
+
+def _weighted_percentile(pairs, pct):
+    pairs = sorted((v, w) for v, w in pairs if v is not None and w > 0)
+    total = sum(w for _, w in pairs)
+    if not total: return None
+    target = pct / 100.0 * total
+    acc = 0
+    for v, w in pairs:
+        acc += w
+        if acc >= target: return v
+    return pairs[-1][0]
+
+
+# ==========================================
+# RANGE QUERY (AGREGASI DI SISI SERVER)
+# ==========================================
+RANGE_MAX_POINTS = int(os.getenv('RANGE_MAX_POINTS', '2000'))
+
+
+def pick_source(start, step, now=None):
+    # Tier paling kasar yang masih <= step (biar baris yang di-scan sedikit) dan datanya belum expired
+    now = now or datetime.now()
+    if step >= HOUR: return HOUR
+    if step >= MINUTE and start >= now - timedelta(days=MINUTE_RETENTION_DAYS): return MINUTE
+    if start >= now - timedelta(hours=RAW_RETENTION_HOURS): return 0
+    return MINUTE if start >= now - timedelta(days=MINUTE_RETENTION_DAYS) else HOUR
+
+
+def _epoch(db, column):
+    # Detik epoch dari kolom DateTime (naive), dihitung di DB
+    if db.engine.dialect.name == 'sqlite':
+        return func.cast(func.strftime('%s', column), Integer)
+    return func.cast(func.extract('epoch', column), Integer)
+
+
+def range_series(db, raw_model, rollup_model, filters, start, end, step, value='latency'):
+    # filters: {kolom: nilai} buat milih series (contoh {'device_id': 3}).
+    # rollup_model None -> selalu agregasi dari raw (series yang gak punya tier rollup)
+    span = max(1, int((end - start).total_seconds()))
+    step = max(int(step or 0), -(-span // RANGE_MAX_POINTS), 1)
+    source = pick_source(start, step) if rollup_model is not None else 0
+    if source: step = -(-step // source) * source   # bucket rollup gak bisa dipecah, bulatkan ke atas
+
+    if source == 0:
+        R = raw_model
+        col = getattr(R, value)
+        bucket = (_epoch(db, R.timestamp) // step).label('bucket')
+        q = select(bucket, func.min(col), func.avg(col), func.max(col), func.count(), func.count(col)) \
+            .where(R.timestamp >= start, R.timestamp < end, *[getattr(R, k) == v for k, v in filters.items()])
+    else:
+        P = rollup_model
+        ok = P.samples - P.lost
+        bucket = (_epoch(db, P.bucket) // step).label('bucket')
+        q = select(bucket, func.min(P.lat_min), func.sum(P.lat_avg * ok) / func.nullif(func.sum(ok), 0),
+                   func.max(P.lat_max), func.sum(P.samples), func.sum(ok)) \
+            .where(P.resolution == source, P.bucket >= start, P.bucket < end, *[getattr(P, k) == v for k, v in filters.items()])
+    rows = db.session.execute(q.group_by(bucket).order_by(bucket)).all()
+    return format_series(rows, span, step, source)
+
+
+def format_series(rows, span, step, source):
+    # rows: (bucket_index, min, avg, max, samples, ok_samples) -> format JSON chart
+    series = {'step': step, 'source': source, 'timestamps': [], 'labels': [], 'values': [], 'min': [], 'max': [], 'loss': []}
+    fmt = '%H:%M:%S' if span <= 6 * HOUR else ('%d/%m %H:%M' if step < 24 * HOUR else '%d/%m')
+    for b, lo, avg, hi, samples, ok_count in rows:
+        # strftime('%s') / epoch() membaca waktu naive sebagai UTC, jadi dibalik pakai utc juga
+        ts = datetime.fromtimestamp(int(b) * step, timezone.utc).replace(tzinfo=None)
+        series['timestamps'].append(ts.isoformat())
+        series['labels'].append(ts.strftime(fmt))
+        series['values'].append(round(avg, 1) if avg is not None else None)
+        series['min'].append(lo)
+        series['max'].append(hi)
+        series['loss'].append(round(100.0 * (samples - ok_count) / samples, 1) if samples else None)
+    return series
@@ -0,0 +1,224 @@
+import math
+import time
+from collections import deque
+from fnmatch import fnmatch
+
+
+# ==========================================
+# STATISTIK STREAMING (UPDATE O(1))
+# ==========================================
+class Ewma:
+    # Rata-rata eksponensial berbasis waktu: sampel yang telat / jarang tetap ditimbang benar
+    def __init__(self, tau):
+        self.tau = tau
+        self.value = None
+        self.ts = None
+
+    def update(self, ts, v):
+        if self.value is None:
+            self.value = v
+        else:
+            alpha = 1 - math.exp(-max(ts - self.ts, 0) / self.tau)
+            self.value += alpha * (v - self.value)
+        self.ts = ts
+
+    def get(self):
+        return self.value
+
+
+class RollingHistogram:
+    # Percentile sliding window pakai histogram bin tetap (default 0-100 per 1%): update & expire O(1),
+    # query O(jumlah bin), memori gak tergantung jumlah sampel di window selain antrian expire-nya
+    def __init__(self, window, lo=0.0, hi=100.0, bins=100):
+        self.window = window
+        self.lo, self.hi, self.bins = lo, hi, bins
+        self.counts = [0] * bins
+        self.samples = deque()   # (ts, bin)
+
+    def _bin(self, v):
+        return min(self.bins - 1, max(0, int((v - self.lo) / (self.hi - self.lo) * self.bins)))
+
+    def update(self, ts, v):
+        b = self._bin(v)
+        self.counts[b] += 1
+        self.samples.append((ts, b))
+        while self.samples and self.samples[0][0] <= ts - self.window:
+            self.counts[self.samples.popleft()[1]] -= 1
+
+    def percentile(self, q):
+        n = len(self.samples)
+        if not n: return None
+        rank, seen = q / 100 * n, 0
+        width = (self.hi - self.lo) / self.bins
+        for b, c in enumerate(self.counts):
+            seen += c
+            if c and seen >= rank: return self.lo + (b + 1) * width   # batas atas bin
+        return self.hi
+
+
+class RollingSlope:
+    # Regresi linear sliding window (laju perubahan per detik) pakai jumlah berjalan.
+    # Jumlahnya dihitung ulang dari antrian sesekali biar error floating point gak numpuk.
+    def __init__(self, window):
+        self.window = window
+        self.samples = deque()
+        self.t0 = None
+        self.sums = [0.0, 0.0, 0.0, 0.0]   # t, v, t*t, t*v
+        self.expired = 0
+
+    def update(self, ts, v):
+        if self.t0 is None: self.t0 = ts
+        t = ts - self.t0
+        self.samples.append((t, v))
+        self._add(t, v, 1)
+        while self.samples and self.samples[0][0] <= t - self.window:
+            self._add(*self.samples.popleft(), -1)
+            self.expired += 1
+        if self.expired >= max(64, len(self.samples)): self._resum()
+
+    def _add(self, t, v, sign):
+        s = self.sums
+        s[0] += sign * t
+        s[1] += sign * v
+        s[2] += sign * t * t
+        s[3] += sign * t * v
+
+    def _resum(self):
+        # Geser titik nol waktu ke sampel tertua, jumlah dihitung ulang dari nol
+        base = self.samples[0][0]
+        self.t0 += base
+        self.samples = deque((t - base, v) for t, v in self.samples)
+        self.sums = [0.0, 0.0, 0.0, 0.0]
+        for t, v in self.samples: self._add(t, v, 1)
+        self.expired = 0
+
+    def span(self):
+        return self.samples[-1][0] - self.samples[0][0] if self.samples else 0.0
+
+    def get(self):
+        n = len(self.samples)
+        # Belum cukup data (window belum seperempat terisi): jangan nebak tren
+        if n < 3 or self.span() < self.window / 4: return None
+        st, sv, stt, stv = self.sums
+        den = n * stt - st * st
+        if den <= 0: return None
+        return (n * stv - st * sv) / den
+
+
+class Series:
+    # Semua statistik yang dibutuhkan rule untuk 1 metric (misal 'cpu' / 'disk:C:'), dibuat sesuai kebutuhan
+    def __init__(self):
+        self.value = None
+        self.trackers = {}
+        self.rules = []   # rule yang cocok dengan metric ini (fnmatch cukup sekali)
+
+    def tracker(self, kind, window):
+        key = (kind, window)
+        tr = self.trackers.get(key)
+        if tr is None:
+            tr = self.trackers[key] = {'ewma': Ewma, 'pct': RollingHistogram, 'slope': RollingSlope}[kind](window)
+        return tr
+
+    def update(self, ts, v):
+        self.value = v
+        for tr in self.trackers.values(): tr.update(ts, v)
+
+
+# ==========================================
+# RULE
+# ==========================================
+# stat:
+#   'value'  : bacaan terakhir
+#   'ewma'   : rata-rata eksponensial, tau = window detik
+#   'p95'    : percentile (p50, p99, ...) selama window detik
+#   'slope'  : laju perubahan per jam selama window detik
+#   'eta'    : jam sampai nilai mencapai `limit` (misal disk 100%) kalau tren window terakhir berlanjut
+# Kondisi harus terpenuhi terus selama for_seconds baru alert. Tiap rule + metric punya cooldown sendiri,
+# dan kirim pesan "normal lagi" kalau kondisinya sudah hilang.
+class Rule:
+    def __init__(self, name, metric, stat, op, threshold, window=60, for_seconds=0, cooldown=300,
+                 message=None, limit=100.0, resolve=True):
+        self.name = name
+        self.metric = metric      # nama metric, boleh wildcard: 'disk:*'
+        self.stat = stat
+        self.op = op              # '>' / '<'
+        self.threshold = threshold
+        self.window = window
+        self.for_seconds = for_seconds
+        self.cooldown = cooldown
+        self.message = message or (name + ' {label}: {value:.1f}')
+        self.limit = limit
+        self.resolve = resolve
+
+    def prepare(self, series):
+        # Daftarin tracker yang dibutuhkan supaya sampel mulai dihitung sejak metric pertama muncul
+        if self.stat == 'ewma': series.tracker('ewma', self.window)
+        elif self.stat.startswith('p'): series.tracker('pct', self.window)
+        elif self.stat in ('slope', 'eta'): series.tracker('slope', self.window)
+
+    def evaluate(self, series):
+        if self.stat == 'value': return series.value
+        if self.stat == 'ewma': return series.tracker('ewma', self.window).get()
+        if self.stat.startswith('p'): return series.tracker('pct', self.window).percentile(float(self.stat[1:]))
+        slope = series.tracker('slope', self.window).get()
+        if slope is None: return None
+        if self.stat == 'slope': return slope * 3600
+        if slope <= 0 or series.value is None: return math.inf   # gak naik = gak akan penuh
+        return max(0.0, self.limit - series.value) / slope / 3600
+
+    def check(self, value):
+        return value > self.threshold if self.op == '>' else value < self.threshold
+
+
+class RuleEngine:
+    def __init__(self, rules, clock=time.time):
+        self.rules = rules
+        self.clock = clock
+        self.series = {}   # metric -> Series
+        self.state = {}    # (rule, metric) -> {'since', 'fired', 'last_alert'}
+        self.stats = {'samples': 0, 'alerts': 0, 'resolved': 0}
+
+    def observe(self, metrics, now=None):
+        # metrics: {'cpu': 93.0, 'disk:C:': 71.2, ...} -> list pesan alert baru
+        now = self.clock() if now is None else now
+        messages = []
+        for metric, v in metrics.items():
+            if v is None: continue
+            series = self.series.get(metric)
+            if series is None:
+                series = self.series[metric] = Series()
+                series.rules = [rule for rule in self.rules if fnmatch(metric, rule.metric)]
+                for rule in series.rules: rule.prepare(series)
+            series.update(now, v)
+            self.stats['samples'] += 1
+            for rule in series.rules:
+                msg = self._evaluate(rule, metric, series, now)
+                if msg: messages.append(msg)
+        return messages
+
+    def _evaluate(self, rule, metric, series, now):
+        st = self.state.get((rule.name, metric))
+        if st is None: st = self.state[(rule.name, metric)] = {'since': None, 'fired': False, 'last_alert': None}
+        value = rule.evaluate(series)
+        if value is None: return None   # data belum cukup: status rule gak diubah
+        label = metric.split(':', 1)[1] if ':' in metric else metric
+        if not rule.check(value):
+            st['since'] = None
+            if st['fired']:
+                st['fired'] = False
+                self.stats['resolved'] += 1
+                if rule.resolve: return f"✅ {rule.name}{' ' + label if label != metric else ''} normal lagi"
+            return None
+        if st['since'] is None: st['since'] = now
+        if now - st['since'] < rule.for_seconds: return None
+        if st['last_alert'] is not None and now - st['last_alert'] < rule.cooldown: return None
+        st['fired'] = True
+        st['last_alert'] = now
+        self.stats['alerts'] += 1
+        return rule.message.format(label=label, value=value, raw=series.value, window=rule.window,
+                                   threshold=rule.threshold, duration=round(now - st['since']))
+
+    def forget(self, metric):
+        # Metric hilang (misal disk dicabut)
+        self.series.pop(metric, None)
+        for key in [k for k in self.state if k[1] == metric]: del self.state[key]
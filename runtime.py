@@ -0,0 +1,184 @@
+# --- MODE SERVER (NETWATCH_ASYNC_MODE=gevent): patch harus sebelum import lainnya ---
+import serving
+serving.patch()
+
+import importlib
+import os
+import threading
+import time
+
+from hoststats import HostStats
+
+# --- KONFIGURASI RUNTIME (python launcher.py --unified) ---
+RUNTIME_SERVICES = os.getenv('RUNTIME_SERVICES', 'netwatch,sysgaze,commander,cleaner')   # service yang di-host
+RUNTIME_SAMPLE_INTERVAL = float(os.getenv('RUNTIME_SAMPLE_INTERVAL', '1'))   # detik, 1 sampel psutil buat semua
+RUNTIME_REPORT_INTERVAL = float(os.getenv('RUNTIME_REPORT_INTERVAL', '2'))   # detik, CPU/RAM Commander -> dashboard
+RUNTIME_RESTART_MAX = float(os.getenv('RUNTIME_RESTART_MAX', '60'))          # detik, batas backoff restart service
+
+# Sama dengan daftar di launcher.py. native=True: library-nya blocking (OpenCV, watchdog, tkinter),
+# di mode gevent dijalankan di thread OS beneran biar gak nahan event loop web.
+SERVICES = [
+    {"name": "NetWatch Security", "module": "netwatch"},
+    {"name": "SysGaze Monitor",   "module": "sysgaze"},
+    {"name": "IT-Ops Commander",  "module": "commander", "native": True},
+    {"name": "The Cleaner",       "module": "cleaner",   "native": True},
+]
+
+
+# ==========================================
+# METRICS BUS (1 SAMPLER PSUTIL BUAT SEMUA SERVICE)
+# ==========================================
+# Dulu tiap proses (SysGaze, Commander) manggil psutil sendiri-sendiri. Di sini cukup 1 HostStats yang
+# disampel tiap RUNTIME_SAMPLE_INTERVAL, hasilnya dibagi ke semua konsumen:
+#   - collect() : snapshot terakhir, bentuknya sama dengan HostStats.collect() (SysGaze pakai ini langsung)
+#   - subscribe(fn, every) : fn(snapshot) dipanggil tiap `every` detik (misal laporan agent Commander)
+class MetricsBus:
+    def __init__(self, source=None, interval=RUNTIME_SAMPLE_INTERVAL):
+        self.source = source or HostStats()
+        self.interval = interval
+        self.latest = None
+        self.subscribers = []   # [fn, every, last]
+        self.lock = threading.Lock()
+        self.stats = {'samples': 0, 'published': 0, 'errors': 0}
+
+    def subscribe(self, fn, every=None):
+        self.subscribers.append([fn, every or self.interval, 0.0])
+
+    def sample(self):
+        snap = self.source.collect()
+        snap['sampled_at'] = time.time()
+        with self.lock: self.latest = snap
+        self.stats['samples'] += 1
+        return snap
+
+    def collect(self):
+        # Copy: konsumen boleh nambah field sendiri (SysGaze nambah 'ts') tanpa ganggu yang lain
+        with self.lock: snap = self.latest
+        return dict(snap if snap is not None else self.sample())
+
+    def publish(self, snap):
+        now = snap['sampled_at']
+        for sub in self.subscribers:
+            fn, every, last = sub
+            if now - last < every: continue
+            sub[2] = now
+            try:
+                fn(dict(snap))
+                self.stats['published'] += 1
+            except Exception as e:
+                self.stats['errors'] += 1
+                print(f"⚠️ MetricsBus: subscriber {getattr(fn, '__name__', fn)} error: {e}")
+
+    def run(self):
+        while True:
+            started = time.time()
+            try:
+                self.publish(self.sample())
+            except Exception as e:
+                print(f"⚠️ MetricsBus: gagal sampel: {e}")
+            time.sleep(max(0.0, self.interval - (time.time() - started)))
+
+    def close(self):
+        self.source.close()
+
+
+# ==========================================
+# SERVICE (1 MODUL = 1 TASK YANG DI-RESTART KALAU CRASH)
+# ==========================================
+# Modul service punya start() (setup + background task, sekali) dan serve() (loop utama, blocking).
+# Kalau serve() crash / keluar, diulang dengan backoff 1, 2, 4 ... RUNTIME_RESTART_MAX detik.
+class Service:
+    def __init__(self, name, module, native=False):
+        self.name = name
+        self.module_name = module
+        self.native = native
+        self.module = None
+        self.restarts = 0
+        self.error = None
+
+    def load(self):
+        try:
+            self.module = importlib.import_module(self.module_name)
+        except KeyboardInterrupt:
+            raise
+        except BaseException as e:
+            # Dependency opsional / config gak ada (cv2 / watchdog / token), termasuk exit() waktu import
+            # -> service ini di-skip, service lain tetap jalan
+            self.error = f"{type(e).__name__}: {e}"
+            print(f"❌ {self.name}: gagal load ({self.error}), di-skip")
+        return self.module is not None
+
+    def run(self):
+        delay = 1.0
+        while True:
+            started = time.time()
+            try:
+                self.module.serve()
+                print(f"⚠️ {self.name}: serve() selesai")
+            except Exception as e:
+                print(f"❌ {self.name}: crash ({e})")
+            if time.time() - started > RUNTIME_RESTART_MAX: delay = 1.0   # sempat jalan lama = bukan crash loop
+            self.restarts += 1
+            print(f"🔁 {self.name}: restart dalam {delay:.0f} dtk")
+            time.sleep(delay)
+            delay = min(delay * 2, RUNTIME_RESTART_MAX)
+
+
+def wire(services, bus):
+    # Sambungkan service ke bus: pengganti psutil per proses dan POST localhost antar service
+    mods = {s.module_name: s.module for s in services}
+    if 'sysgaze' in mods: mods['sysgaze'].host_stats = bus
+    commander = mods.get('commander')
+    if commander is None: return
+    commander.metrics_bus = bus
+    netwatch = mods.get('netwatch')
+    if netwatch is None:
+        commander.start(report=True)   # NetWatch gak di proses ini: tetap lapor lewat HTTP
+        return
+
+    def report_commander(snap):
+        netwatch.ingest_agent(commander.AGENT_NAME, {'cpu': snap['cpu'], 'ram': snap['ram_percent']}, ip='127.0.0.1')
+
+    bus.subscribe(report_commander, every=RUNTIME_REPORT_INTERVAL)
+    commander.start(report=False)
+
+
+def main():
+    print("🚀 INITIALIZING IT-OPS UNIFIED RUNTIME (1 proses)...")
+    print("==========================================")
+    wanted = {name.strip() for name in RUNTIME_SERVICES.split(',') if name.strip()}
+    services = [Service(s['name'], s['module'], s.get('native', False)) for s in SERVICES if s['module'] in wanted]
+    services = [s for s in services if s.load()]
+
+    # SysGaze sudah bikin HostStats waktu di-import: itu yang dipakai jadi sumber bus (gak bikin 2x)
+    sysgaze = next((s.module for s in services if s.module_name == 'sysgaze'), None)
+    bus = MetricsBus(sysgaze.host_stats if sysgaze else None)
+    bus.sample()
+    wire(services, bus)
+    threading.Thread(target=bus.run, daemon=True).start()
+
+    native = None
+    if serving.ASYNC_MODE == 'gevent': native = serving.native_executor(sum(s.native for s in services) or 1, 'service')
+    for s in services:
+        print(f"✅ Starting {s.name} [{serving.ASYNC_MODE}{', native' if s.native else ''}]")
+        if s.module_name != 'commander': s.module.start()   # commander sudah di-start di wire()
+        if s.native and native is not None:
+            native.submit(s.run)
+        else:
+            threading.Thread(target=s.run, daemon=True).start()
+
+    print("==========================================")
+    print(f"💻 STATUS: {len(services)} service jalan di PID {os.getpid()}.")
+    print("ℹ️  Web Dashboard: http://127.0.0.1:5000")
+    print("🛑 Tekan CTRL + C untuk mematikan SEMUA service.")
+    try:
+        while True: time.sleep(1)
+    except KeyboardInterrupt:
+        print("\n\n🛑 Shutting down unified runtime...")
+        bus.close()
+        print("✅ All services stopped. Bye!")
+        os._exit(0)   # thread service (werkzeug, polling Telegram) gak punya tombol stop
+
+
+if __name__ == '__main__':
+    main()
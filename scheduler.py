@@ -0,0 +1,140 @@
+import heapq
+import os
+import random
+import time
+from collections import deque
+
+# --- KONFIGURASI JADWAL PROBE ---
+SCHED_BASE = float(os.getenv('SCHED_BASE', os.getenv('SWEEP_INTERVAL', '3')))   # interval awal / device baru
+SCHED_MIN = float(os.getenv('SCHED_MIN', '1'))              # device yang baru berubah / flapping
+SCHED_MAX = float(os.getenv('SCHED_MAX', '30'))             # batas mundur device yang stabil UP
+SCHED_DOWN_MAX = float(os.getenv('SCHED_DOWN_MAX', '30'))   # batas retry eksponensial device DOWN
+SCHED_STABLE_AFTER = int(os.getenv('SCHED_STABLE_AFTER', '5'))   # N hasil sama berturut-turut -> interval dilonggarkan
+SCHED_BACKOFF = float(os.getenv('SCHED_BACKOFF', '1.5'))          # faktor pelonggaran
+SCHED_FLAP_WINDOW = float(os.getenv('SCHED_FLAP_WINDOW', '300'))  # detik, jendela hitung perubahan status
+SCHED_FLAP_CHANGES = int(os.getenv('SCHED_FLAP_CHANGES', '2'))    # >= N perubahan dalam jendela = flapping
+SCHED_JITTER = float(os.getenv('SCHED_JITTER', '0.1'))            # +-10% biar probe gak numpuk di detik yang sama
+
+
+# ==========================================
+# PROBE SCHEDULER (HEAP PER DEVICE)
+# ==========================================
+# Dulu semua device di-probe tiap 3 detik. Sekarang tiap device punya jadwal sendiri di min-heap:
+#   - UP stabil         : tiap SCHED_STABLE_AFTER hasil sama, interval x SCHED_BACKOFF sampai SCHED_MAX
+#   - baru berubah/flap : SCHED_MIN (cepat konfirmasi / cepat ketahuan balik normal)
+#   - DOWN              : retry eksponensial SCHED_MIN, 2x, 4x, ... sampai SCHED_DOWN_MAX
+#   - ERR (kena deadline sweep): coba lagi di SCHED_BASE
+#   - Device.probe_interval diisi: interval tetap, aturan di atas diabaikan
+class ProbeScheduler:
+    def __init__(self, base=SCHED_BASE, min_interval=SCHED_MIN, max_interval=SCHED_MAX, down_max=SCHED_DOWN_MAX,
+                 stable_after=SCHED_STABLE_AFTER, backoff=SCHED_BACKOFF, flap_window=SCHED_FLAP_WINDOW,
+                 flap_changes=SCHED_FLAP_CHANGES, jitter=SCHED_JITTER, clock=time.time, rng=None):
+        self.base = base
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.down_max = down_max
+        self.stable_after = stable_after
+        self.backoff = backoff
+        self.flap_window = flap_window
+        self.flap_changes = flap_changes
+        self.jitter = jitter
+        self.clock = clock
+        self.rng = rng or random.Random()
+        self.heap = []        # (due, version, device_id); entry basi dilewati (lazy delete)
+        self.devices = {}     # device_id -> state
+        self.stats = {'probes': 0, 'up': 0, 'down': 0, 'flapping': 0}
+
+    # --- daftar device ---
+    def sync(self, devices):
+        # devices: {device_id: override interval (detik) atau None}
+        now = self.clock()
+        for dev_id in list(self.devices):
+            if dev_id not in devices: del self.devices[dev_id]
+        for dev_id, override in devices.items():
+            st = self.devices.get(dev_id)
+            override = override if override and override > 0 else None
+            if st is None:
+                self.devices[dev_id] = st = {'status': None, 'streak': 0, 'interval': self.base, 'down': 0,
+                                             'changes': deque(), 'override': override, 'version': 0}
+                self._push(dev_id, st, now)   # device baru langsung di-probe
+            elif st['override'] != override:
+                st['override'] = override
+                self._push(dev_id, st, now)
+
+    def _push(self, dev_id, st, due):
+        st['version'] += 1
+        st['due'] = due
+        heapq.heappush(self.heap, (due, st['version'], dev_id))
+
+    def wake(self, dev_ids, now=None):
+        # Probe secepatnya (misal parent baru UP lagi -> device di belakangnya langsung dicek ulang)
+        now = self.clock() if now is None else now
+        for dev_id in dev_ids:
+            st = self.devices.get(dev_id)
+            if st is not None and st.get('due', now) > now: self._push(dev_id, st, now)
+
+    # --- ambil yang jatuh tempo ---
+    def pop_due(self, now=None, window=0.0):
+        # Semua device yang jatuh tempo sampai now+window (digabung jadi 1 sweep)
+        limit = (self.clock() if now is None else now) + window
+        due = []
+        while self.heap and self.heap[0][0] <= limit:
+            _, version, dev_id = heapq.heappop(self.heap)
+            st = self.devices.get(dev_id)
+            if st is None or st['version'] != version: continue
+            due.append(dev_id)
+        return due
+
+    def next_due(self):
+        while self.heap:
+            due, version, dev_id = self.heap[0]
+            st = self.devices.get(dev_id)
+            if st is not None and st['version'] == version: return due
+            heapq.heappop(self.heap)
+        return None
+
+    # --- hasil probe -> jadwal berikutnya ---
+    def report(self, dev_id, status, now=None):
+        st = self.devices.get(dev_id)
+        if st is None: return None
+        now = self.clock() if now is None else now
+        self.stats['probes'] += 1
+        interval = self.next_interval(st, status, now)
+        st['interval'] = interval
+        if st['override'] is None and self.jitter:
+            interval *= self.rng.uniform(1 - self.jitter, 1 + self.jitter)
+        self._push(dev_id, st, now + interval)
+        return interval
+
+    def next_interval(self, st, status, now):
+        if status == 'ERR':
+            # Gak ada jawaban pasti (deadline / error internal): status lama dipertahankan
+            return st['override'] or self.base
+
+        first = st['status'] is None
+        changed = not first and status != st['status']
+        changes = st['changes']
+        if changed: changes.append(now)
+        while changes and changes[0] < now - self.flap_window: changes.popleft()
+        st['streak'] = 1 if changed or first else st['streak'] + 1
+        st['status'] = status
+        self.stats['up' if status == 'UP' else 'down'] += 1
+
+        if st['override']: return st['override']
+        if status == 'DOWN':
+            # Retry eksponensial: 1x, 2x, 4x ... (DOWN pertama kali = konfirmasi cepat)
+            st['down'] = 0 if changed or first else st['down'] + 1
+            return min(self.down_max, self.min_interval * (2 ** st['down']))
+        st['down'] = 0
+        if changed or len(changes) >= self.flap_changes:
+            if len(changes) >= self.flap_changes: self.stats['flapping'] += 1
+            return self.min_interval
+        if st['streak'] % self.stable_after == 0:
+            return min(self.max_interval, max(st['interval'], self.base) * self.backoff)
+        # Belum cukup stabil: interval lama (SCHED_MIN habis berubah, SCHED_BASE buat device baru)
+        return st['interval']
+
+    def snapshot(self):
+        # Buat debug / API: interval & jadwal tiap device
+        return {dev_id: {'status': st['status'], 'interval': round(st['interval'], 2), 'due': st.get('due'),
+                         'override': st['override']} for dev_id, st in self.devices.items()}
@@ -0,0 +1,47 @@
+import os
+
+from dotenv import load_dotenv
+
+# .env dibaca di sini juga karena patch() jalan sebelum app sempat load_dotenv()
+load_dotenv()
+
+# --- MODE SERVER ---
+# 'threading' : Werkzeug dev server, 1 OS thread per koneksi (default, buat development)
+# 'gevent'    : event loop greenlet (gevent + gevent-websocket), ribuan websocket dashboard
+#               & POST agent dalam 1 proses. Monitor / writer / rollup jalan sebagai greenlet.
+ASYNC_MODE = os.getenv('NETWATCH_ASYNC_MODE', 'threading').lower()
+
+
+def patch():
+    # WAJIB dipanggil paling atas sebelum import lain: socket/threading/time/ssl/selectors
+    # di-patch jadi cooperative, termasuk yang dipakai requests, ping3 dan asyncio di prober.py
+    global ASYNC_MODE
+    if ASYNC_MODE != 'gevent':
+        ASYNC_MODE = 'threading'
+        return ASYNC_MODE
+    try:
+        from gevent import monkey
+    except ImportError:
+        print("⚠️ gevent belum terinstall (pip install gevent gevent-websocket), balik ke mode threading")
+        ASYNC_MODE = 'threading'
+        return ASYNC_MODE
+    monkey.patch_all()
+    return ASYNC_MODE
+
+
+def run(socketio, app, port, host='0.0.0.0'):
+    if ASYNC_MODE == 'gevent':
+        # pywsgi + WebSocketHandler, tanpa log per request (ribuan request/detik)
+        socketio.run(app, host=host, port=port, debug=False, log_output=False)
+    else:
+        socketio.run(app, host=host, port=port, debug=False, allow_unsafe_werkzeug=True)
+
+
+def native_executor(workers, prefix='native'):
+    # Buat syscall yang bisa nge-hang (statvfs ke NFS mati, dll). Di mode gevent thread hasil monkey patch
+    # itu greenlet: kalau syscall-nya blocking, seluruh proses ikut beku -> pakai thread OS beneran.
+    if ASYNC_MODE == 'gevent':
+        from gevent.threadpool import ThreadPoolExecutor
+        return ThreadPoolExecutor(max_workers=workers)
+    from concurrent.futures import ThreadPoolExecutor
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix=prefix)
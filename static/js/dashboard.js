@@ -0,0 +1,293 @@
+// ==========================================
+// NETWATCH DASHBOARD RENDERER (INCREMENTAL)
+// ==========================================
+// Dulu tiap update: container.innerHTML = '' lalu semua card dibangun ulang pakai innerHTML +=
+// (DOM di-parse ulang N kali). Sekarang:
+//   - tiap card / baris tabel dibuat SEKALI, dikunci pakai nama agent / id device
+//   - update cuma nge-patch teks & style yang nilainya beda
+//   - data dari agent (nama, IP, nama proses) selalu lewat textContent, gak pernah innerHTML
+//   - semua patch dikumpulin dan dijalankan sekali per frame (requestAnimationFrame)
+//   - agent banyak (> VIRTUAL_THRESHOLD) -> virtual scroll: yang dirender cuma baris yang kelihatan
+// Dipakai oleh templates/dashboard_ultimate.html dan benchmarks/dashboard_replay.html
+
+const AGENT_CARD_HEIGHT = 150;     // px, tinggi card + gap (harus sama dengan CSS .agent-card)
+const AGENT_CARD_MIN_WIDTH = 220;  // px, lebar minimum 1 kolom grid
+const AGENT_GAP = 8;
+const VIRTUAL_THRESHOLD = 60;      // di atas ini agent list pakai virtual scroll
+const VIRTUAL_OVERSCAN = 2;        // baris ekstra di atas/bawah layar
+
+function cpuColor(v) { return v < 50 ? '#00ff9d' : (v < 80 ? '#ffaa00' : '#ff0055'); }
+
+// --- STREAM DELTA DARI SERVER (lihat broadcaster.py) ---
+// Server kirim {seq, full:true, items} atau {seq, full:false, changed, removed}.
+// Kalau seq bolong (paket ketinggalan / baru reconnect) -> panggil resync() buat minta snapshot lengkap.
+class DeltaStream {
+    constructor(render, resync) {
+        this.render = render;     // render(changed, removed, full)
+        this.resync = resync;
+        this.seq = null;
+        this.waiting = true;
+    }
+
+    receive(msg) {
+        if (msg.full) {
+            this.waiting = false;
+            this.render(msg.items, [], true);
+        } else {
+            if (this.waiting) return;
+            if (msg.seq !== this.seq + 1) { this.restart(); return; }
+            this.render(msg.changed, msg.removed, false);
+        }
+        this.seq = msg.seq;
+    }
+
+    restart() {
+        this.waiting = true;
+        this.resync();
+    }
+}
+
+// --- rAF BATCH: banyak update dalam 1 frame cukup 1x render ---
+function frameScheduler(fn) {
+    let queued = false;
+    return () => {
+        if (queued) return;
+        queued = true;
+        requestAnimationFrame(() => { queued = false; fn(); });
+    };
+}
+
+// Set properti DOM cuma kalau beda (baca dari cache JS, bukan dari DOM)
+function patch(node, cache, key, value, write) {
+    if (cache[key] === value) return;
+    cache[key] = value;
+    write(node, value);
+}
+
+
+// ==========================================
+// AGENT GRID (KEYED + VIRTUAL SCROLL)
+// ==========================================
+class AgentGrid {
+    constructor(container, opts = {}) {
+        this.container = container;
+        this.threshold = opts.virtualThreshold ?? VIRTUAL_THRESHOLD;
+        this.agents = new Map();     // name -> data terbaru
+        this.cards = new Map();      // name -> {el, refs, cache} yang sedang nempel di DOM
+        this.free = [];              // card nganggur (keluar layar) buat dipakai ulang
+        this.dirty = new Set();
+        this.order = [];
+        this.orderStale = true;
+        this.stats = { frames: 0, patched: 0, created: 0 };
+
+        container.classList.add('agent-grid');
+        this.empty = document.createElement('div');
+        this.empty.className = 'text-center text-muted py-4 agent-empty';
+        this.empty.innerHTML = '<i class="bi bi-search me-2"></i>Waiting for Agents uplink...';
+        container.replaceChildren(this.empty);
+
+        this.schedule = frameScheduler(() => this.render());
+        container.addEventListener('scroll', () => this.schedule(), { passive: true });
+        window.addEventListener('resize', () => this.schedule());
+    }
+
+    apply(changed, removed = []) {
+        for (const [name, data] of Object.entries(changed)) {
+            if (!this.agents.has(name)) this.orderStale = true;
+            this.agents.set(name, data);
+            this.dirty.add(name);
+        }
+        for (const name of removed) {
+            if (this.agents.delete(name)) this.orderStale = true;
+        }
+        this.schedule();
+    }
+
+    reset(items) {
+        // Snapshot lengkap: yang gak ada di snapshot dibuang
+        const gone = [...this.agents.keys()].filter(name => !(name in items));
+        this.apply(items, gone);
+    }
+
+    render() {
+        this.stats.frames++;
+        if (this.orderStale) {
+            this.order = [...this.agents.keys()].sort();
+            this.orderStale = false;
+        }
+        const total = this.order.length;
+        this.empty.style.display = total ? 'none' : '';
+        const virtual = total > this.threshold;
+        this.container.classList.toggle('agent-grid-virtual', virtual);
+
+        // Baris mana yang kelihatan
+        let first = 0, last = total;
+        const cols = Math.max(1, Math.floor((this.container.clientWidth + AGENT_GAP) / (AGENT_CARD_MIN_WIDTH + AGENT_GAP)));
+        if (virtual) {
+            const rows = Math.ceil(total / cols);
+            const top = Math.floor(this.container.scrollTop / AGENT_CARD_HEIGHT) - VIRTUAL_OVERSCAN;
+            const visibleRows = Math.ceil(this.container.clientHeight / AGENT_CARD_HEIGHT) + 2 * VIRTUAL_OVERSCAN;
+            const startRow = Math.max(0, top);
+            const endRow = Math.min(rows, startRow + visibleRows);
+            first = startRow * cols;
+            last = Math.min(total, endRow * cols);
+            this.container.style.paddingTop = `${startRow * AGENT_CARD_HEIGHT}px`;
+            this.container.style.paddingBottom = `${(rows - endRow) * AGENT_CARD_HEIGHT}px`;
+        } else {
+            this.container.style.paddingTop = this.container.style.paddingBottom = '';
+        }
+
+        // Lepas card yang keluar layar / agent-nya hilang
+        const visible = new Set(this.order.slice(first, last));
+        for (const [name, card] of this.cards) {
+            if (visible.has(name)) continue;
+            card.el.remove();
+            this.cards.delete(name);
+            this.free.push(card);
+        }
+
+        // Pasang / patch yang kelihatan sesuai urutan (DOM cuma digeser kalau posisinya beda)
+        let prev = this.empty;
+        for (let i = first; i < last; i++) {
+            const name = this.order[i];
+            let card = this.cards.get(name);
+            if (!card) {
+                card = this.free.pop() || this.createCard();
+                card.cache = {};
+                this.cards.set(name, card);
+                this.dirty.add(name);
+            }
+            if (prev.nextSibling !== card.el) prev.after(card.el);
+            prev = card.el;
+            if (this.dirty.has(name)) {
+                this.patchCard(card, name, this.agents.get(name));
+                this.stats.patched++;
+            }
+        }
+        this.dirty.clear();
+    }
+
+    createCard() {
+        this.stats.created++;
+        const el = document.createElement('div');
+        el.className = 'agent-card';
+        el.innerHTML = `
+            <div class="agent-header">
+                <div class="agent-name text-truncate"><i class="bi bi-incognito me-2"></i><span></span></div>
+                <div class="agent-ip"></div>
+            </div>
+            <div class="d-flex justify-content-between small text-muted mb-1">
+                <span>CPU LOAD</span><span class="cpu-text"></span>
+            </div>
+            <div class="mini-bar mb-2"><div class="mini-fill cpu-fill"></div></div>
+            <div class="d-flex justify-content-between small text-muted mb-1">
+                <span>RAM USAGE</span><span class="text-info ram-text"></span>
+            </div>
+            <div class="mini-bar"><div class="mini-fill bg-info ram-fill"></div></div>
+            <div class="small text-muted mt-2 text-truncate agent-top"></div>
+            <div class="text-end agent-seen" style="font-size: 0.6rem; color: #64748b;"></div>`;
+        const q = (sel) => el.querySelector(sel);
+        return {
+            el, cache: {},
+            refs: {
+                name: q('.agent-name span'), ip: q('.agent-ip'), cpuText: q('.cpu-text'), cpuFill: q('.cpu-fill'),
+                ramText: q('.ram-text'), ramFill: q('.ram-fill'), top: q('.agent-top'), seen: q('.agent-seen'),
+            },
+        };
+    }
+
+    patchCard(card, name, a) {
+        const { refs: r, cache: c } = card;
+        const text = (node, v) => { node.textContent = v; };
+        patch(r.name, c, 'name', name, text);
+        patch(r.ip, c, 'ip', a.ip || '', text);
+        patch(r.cpuText, c, 'cpu', a.cpu, (node, v) => {
+            node.textContent = `${v ?? '--'}%`;
+            node.style.color = cpuColor(v);
+            r.cpuFill.style.width = `${v || 0}%`;
+            r.cpuFill.style.background = cpuColor(v);
+        });
+        patch(r.ramText, c, 'ram', a.ram, (node, v) => {
+            node.textContent = `${v ?? '--'}%`;
+            r.ramFill.style.width = `${v || 0}%`;
+        });
+        const top = (a.procs || []).slice(0, 3).map(p => `${p.name} ${p.cpu}%`).join(' · ');
+        patch(r.top, c, 'top', top, (node, v) => { node.textContent = v; node.title = v; });
+        patch(r.seen, c, 'seen', a.last_seen, (node, v) => { node.textContent = `LAST SEEN: ${v}`; });
+    }
+}
+
+
+// ==========================================
+// MONITOR TABLE (PATCH SEL YANG BERUBAH)
+// ==========================================
+// Baris tabel sudah dirender server (Jinja), di sini cuma sel latency & status yang di-patch.
+// Device yang dihapus (removed / gak ada lagi di snapshot lengkap) barisnya dibuang dari DOM dan dari Map.
+class MonitorTable {
+    constructor(root = document) {
+        this.root = root;
+        this.rows = new Map();     // id -> {stat, lat, cache}
+        this.pending = new Map();
+        this.dropped = new Set();
+        this.stats = { frames: 0, patched: 0, removed: 0 };
+        this.schedule = frameScheduler(() => this.render());
+    }
+
+    apply(changed, removed = []) {
+        for (const d of Object.values(changed)) {
+            this.pending.set(String(d.id), d);
+            this.dropped.delete(String(d.id));
+        }
+        for (const id of removed) {
+            this.pending.delete(String(id));
+            this.dropped.add(String(id));
+        }
+        this.schedule();
+    }
+
+    reset(items) {
+        // Snapshot lengkap: baris yang pernah di-update tapi gak ada di snapshot = device sudah dihapus.
+        // Baris yang belum pernah dapat hasil probe (device baru) dibiarkan.
+        const keep = new Set(Object.values(items).map(d => String(d.id)));
+        this.apply(items, [...this.rows.keys()].filter(id => !keep.has(id)));
+    }
+
+    row(id) {
+        let row = this.rows.get(id);
+        if (!row) {
+            const stat = this.root.querySelector(`#stat-${id}`);
+            if (!stat) return null;
+            row = { stat, lat: this.root.querySelector(`#lat-${id}`), cache: {} };
+            this.rows.set(id, row);
+        }
+        return row;
+    }
+
+    render() {
+        this.stats.frames++;
+        for (const id of this.dropped) {
+            const tr = this.root.querySelector(`#row-${id}`);
+            if (tr) tr.remove();
+            this.rows.delete(id);
+            this.stats.removed++;
+        }
+        this.dropped.clear();
+        for (const [id, d] of this.pending) {
+            const row = this.row(id);
+            if (!row) continue;
+            patch(row.stat, row.cache, 'status', `${d.status}|${d.color}`, (node) => {
+                const badgeClass = d.color === 'success' ? 'status-up' : (d.color === 'danger' ? 'status-down' : 'bg-secondary');
+                const badge = document.createElement('span');
+                badge.className = `status-badge ${badgeClass}`;
+                badge.textContent = d.status;   // jangan innerHTML: nilai dari server/agent bisa berisi HTML
+                node.replaceChildren(badge);
+            });
+            patch(row.lat, row.cache, 'latency', `${d.latency}|${d.color}`, (node) => {
+                node.textContent = d.latency;
+                node.style.color = d.color === 'success' ? '#00ff9d' : (d.color === 'danger' ? '#ff0055' : '#aaa');
+            });
+            this.stats.patched++;
+        }
+        this.pending.clear();
+    }
+}
@@ -0,0 +1,207 @@
+import atexit
+import os
+import threading
+import time
+from collections import deque
+
+from sqlalchemy import event, insert, inspect, text
+from sqlalchemy.exc import OperationalError
+
+# --- KONFIGURASI WRITE-BEHIND ---
+DB_FLUSH_INTERVAL = float(os.getenv('DB_FLUSH_INTERVAL', '3'))      # flush tiap N detik (1 sweep)
+DB_FLUSH_ROWS = int(os.getenv('DB_FLUSH_ROWS', '20000'))            # atau kalau antrian sudah segini
+DB_QUEUE_MAX_ROWS = int(os.getenv('DB_QUEUE_MAX_ROWS', '200000'))   # batas antrian (backpressure)
+DB_PUT_TIMEOUT = float(os.getenv('DB_PUT_TIMEOUT', '5'))            # max nunggu antrian kosong
+
+# --- KONFIGURASI SQLITE ---
+DB_PROFILE = os.getenv('DB_PROFILE', 'production')   # 'production' (WAL + tuning) / 'legacy' (default SQLite)
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_BUSY_TIMEOUT = float(os.getenv('DB_BUSY_TIMEOUT', '15'))         # detik nunggu lock sebelum "database is locked"
+
+SQLITE_PROFILES = {
+    'production': {
+        'journal_mode': 'WAL',            # reader gak ketahan writer (dan sebaliknya)
+        'synchronous': 'NORMAL',          # aman di WAL, fsync cuma pas checkpoint
+        'cache_size': -64000,             # ~64 MB page cache per koneksi
+        'mmap_size': 268435456,           # 256 MB memory-mapped I/O
+        'temp_store': 'MEMORY',
+        'wal_autocheckpoint': 1000,
+        'journal_size_limit': 67108864,   # WAL dipotong balik ke 64 MB setelah checkpoint
+    },
+    'legacy': {},
+}
+
+
+# ==========================================
+# WRITE-BEHIND BUFFER
+# ==========================================
+# Monitor cukup titip baris ke sini, nanti thread flusher yang nulis ke DB:
+# semua hasil 1 sweep (atau beberapa sweep) masuk dalam SATU transaksi pakai bulk insert.
+# Kalau antrian penuh, add() nahan pemanggil (backpressure) sampai flusher kebagian jalan.
+# Transaksi gagal (misal 1 baris rusak) -> diulang per tabel, cuma baris yang rusak yang dibuang.
+class WriteBuffer:
+    def __init__(self, app, db, flush_interval=DB_FLUSH_INTERVAL, flush_rows=DB_FLUSH_ROWS,
+                 max_rows=DB_QUEUE_MAX_ROWS, put_timeout=DB_PUT_TIMEOUT):
+        self.app = app
+        self.db = db
+        self.flush_interval = flush_interval
+        self.flush_rows = flush_rows
+        self.max_rows = max_rows
+        self.put_timeout = put_timeout
+
+        self.pending = deque()   # isi: (model, [rows])
+        self.pending_rows = 0
+        self.cond = threading.Condition()
+        self.flush_lock = threading.Lock()
+        self.stats = {'rows_written': 0, 'flushes': 0, 'dropped': 0, 'errors': 0}
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        if self.running: return self
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='db-writer', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+        return self
+
+    def add(self, model, rows):
+        if isinstance(rows, dict): rows = [rows]
+        if not rows: return True
+        deadline = time.time() + self.put_timeout
+        with self.cond:
+            # Backpressure: tunggu flusher ngosongin antrian dulu
+            while self.pending_rows + len(rows) > self.max_rows and self.pending_rows > 0:
+                left = deadline - time.time()
+                if left <= 0:
+                    self.stats['dropped'] += len(rows)
+                    print(f"⚠️ DB write queue penuh, {len(rows)} baris {model.__name__} dibuang")
+                    return False
+                self.cond.notify_all()
+                self.cond.wait(left)
+            self.pending.append((model, list(rows)))
+            self.pending_rows += len(rows)
+            if self.pending_rows >= self.flush_rows: self.cond.notify_all()
+        return True
+
+    def flush(self):
+        with self.flush_lock:
+            with self.cond:
+                batch = list(self.pending)
+                self.pending.clear()
+                self.pending_rows = 0
+                self.cond.notify_all()
+            if not batch: return 0
+
+            # Gabungkan per tabel biar jadi satu executemany per tabel
+            grouped = {}
+            for model, rows in batch: grouped.setdefault(model, []).extend(rows)
+
+            total = sum(len(rows) for rows in grouped.values())
+            with self.app.app_context():
+                try:
+                    for model, rows in grouped.items():
+                        self.db.session.execute(insert(model), rows)
+                    self.db.session.commit()
+                except Exception as e:
+                    # 1 baris rusak jangan sampai ngebuang baris tabel lain: ulang per tabel, yang gagal dipecah
+                    self.db.session.rollback()
+                    self.stats['errors'] += 1
+                    print(f"⚠️ DB flush gagal ({total} baris), diulang per tabel: {e}")
+                    total = 0
+                    for model, rows in grouped.items():
+                        written, error = self._insert(model, rows)
+                        total += written
+                        if error is not None:
+                            self.stats['dropped'] += len(rows) - written
+                            print(f"❌ {len(rows) - written} dari {len(rows)} baris {model.__name__} dibuang: {error}")
+            self.stats['rows_written'] += total
+            self.stats['flushes'] += 1
+            return total
+
+    def _insert(self, model, rows):
+        # Insert per tabel; gagal -> dibelah dua sampai ketemu baris yang rusak (sisanya tetap masuk).
+        # Error DB-nya sendiri (locked, tabel gak ada) gak bakal beres dengan dibelah, langsung dibuang.
+        try:
+            self.db.session.execute(insert(model), rows)
+            self.db.session.commit()
+            return len(rows), None
+        except Exception as e:
+            self.db.session.rollback()
+            if len(rows) == 1 or isinstance(e, OperationalError): return 0, e
+        mid = len(rows) // 2
+        left, left_error = self._insert(model, rows[:mid])
+        right, right_error = self._insert(model, rows[mid:])
+        return left + right, left_error or right_error
+
+    def close(self):
+        self.running = False
+        with self.cond: self.cond.notify_all()
+        if self.thread and self.thread.is_alive() and self.thread is not threading.current_thread():
+            self.thread.join(timeout=self.put_timeout)
+        self.flush()
+
+    def _run(self):
+        while self.running:
+            with self.cond:
+                if self.pending_rows < self.flush_rows:
+                    self.cond.wait(self.flush_interval)
+            try: self.flush()
+            except Exception as e: print(f"❌ DB writer error: {e}")
+
+
+# ==========================================
+# PROFIL SQLITE (WAL + POOL)
+# ==========================================
+def engine_options(uri, profile=DB_PROFILE):
+    # Dipasang ke app.config['SQLALCHEMY_ENGINE_OPTIONS'] sebelum SQLAlchemy(app)
+    if not uri.startswith('sqlite') or profile == 'legacy': return {}
+    if uri in ('sqlite://', 'sqlite:///:memory:'): return {}
+    return {
+        # Koneksi dipinjam bergantian oleh thread monitor/writer/request lewat pool,
+        # jadi aman dilepas dari check_same_thread
+        'connect_args': {'check_same_thread': False, 'timeout': DB_BUSY_TIMEOUT},
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_POOL_SIZE * 2,
+        'pool_timeout': 30,
+    }
+
+
+def apply_profile(engine, profile=DB_PROFILE):
+    pragmas = SQLITE_PROFILES.get(profile)
+    if engine.dialect.name != 'sqlite' or not pragmas: return
+
+    @event.listens_for(engine, 'connect')
+    def _set_pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        for key, value in pragmas.items():
+            cur.execute(f"PRAGMA {key}={value}")
+        cur.close()
+
+
+# ==========================================
+# SKEMA
+# ==========================================
+def ensure_indexes(db):
+    # db.create_all() gak nambahin index ke tabel yang sudah ada (DB lama), jadi dicek satu-satu
+    for table in db.metadata.tables.values():
+        for idx in table.indexes:
+            idx.create(db.engine, checkfirst=True)
+
+
+def ensure_columns(db):
+    # Sama, create_all() juga gak nambah kolom baru ke tabel lama -> ALTER TABLE ADD COLUMN.
+    # Kolom baru harus nullable / punya default (SQLite gak bisa ADD COLUMN NOT NULL tanpa default).
+    inspector = inspect(db.engine)
+    existing_tables = set(inspector.get_table_names())
+    with db.engine.begin() as con:
+        for table in db.metadata.tables.values():
+            if table.name not in existing_tables: continue
+            have = {c['name'] for c in inspector.get_columns(table.name)}
+            for col in table.columns:
+                if col.name in have: continue
+                ddl = f'ALTER TABLE {table.name} ADD COLUMN {col.name} {col.type.compile(db.engine.dialect)}'
+                if col.default is not None and col.default.is_scalar:
+                    ddl += f" DEFAULT {col.default.arg!r}"
+                con.execute(text(ddl))
+                print(f"🛠️ Skema: kolom {table.name}.{col.name} ditambahkan")
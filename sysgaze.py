@@ -1,12 +1,18 @@
+# --- MODE SERVER (NETWATCH_ASYNC_MODE=gevent): patch harus sebelum import lainnya ---
+import serving
+serving.patch()
+
 import os
-import threading
 import time
-import psutil
-import requests
 from dotenv import load_dotenv
-from flask import Flask, render_template
+from flask import Flask, Response, render_template, request
 from flask_socketio import SocketIO
 
+from history import MetricHistory
+from hoststats import HostStats
+from notifier import Notifier
+from rules import Rule, RuleEngine
+
 # Load Environment Variables (.env)
 load_dotenv()
 
@@ -14,19 +20,39 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'sysgaze-default-secret')
 
 # SETUP SOCKET IO
-socketio = SocketIO(app, cors_allowed_origins='*', async_mode='threading')
+socketio = SocketIO(app, cors_allowed_origins='*', async_mode=serving.ASYNC_MODE)
+SYSGAZE_PORT = int(os.getenv('SYSGAZE_PORT', '5001'))
 
 # --- KONFIGURASI TELEGRAM ---
-TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
-TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
+# Token / chat id / retry diatur di notifier.py (TELEGRAM_TOKEN, TELEGRAM_CHAT_ID, NOTIFY_*)
+notifier = Notifier('sysgaze')
 
 # --- KONFIGURASI ALARM ---
-CPU_THRESHOLD = 85   
-RAM_THRESHOLD = 90   
-DISK_THRESHOLD = 90  
-ALERT_COOLDOWN = 60  
+CPU_THRESHOLD = float(os.getenv('CPU_THRESHOLD', '85'))
+RAM_THRESHOLD = float(os.getenv('RAM_THRESHOLD', '90'))
+DISK_THRESHOLD = float(os.getenv('DISK_THRESHOLD', '90'))
+ALERT_SUSTAIN = float(os.getenv('ALERT_SUSTAIN', '60'))          # detik, kondisi harus bertahan segini baru alert
+ALERT_COOLDOWN = float(os.getenv('ALERT_COOLDOWN', '300'))       # detik, per rule (CPU gak nahan alert disk)
+DISK_FILL_HOURS = float(os.getenv('DISK_FILL_HOURS', '6'))       # alert kalau disk diprediksi penuh < N jam
+DISK_FILL_WINDOW = float(os.getenv('DISK_FILL_WINDOW', '1800'))  # detik data yang dipakai buat tren disk
+
+# Rule streaming (rules.py): spike 1 detik gak bikin alert, tiap rule punya cooldown sendiri
+ALERT_RULES = [
+    Rule('CPU', 'cpu', 'ewma', '>', CPU_THRESHOLD, window=30, for_seconds=ALERT_SUSTAIN, cooldown=ALERT_COOLDOWN,
+         message="🔥 CPU CRITICAL: rata-rata {value:.0f}% selama {duration} dtk (sekarang {raw}%)"),
+    Rule('RAM', 'ram', 'value', '>', RAM_THRESHOLD, for_seconds=ALERT_SUSTAIN, cooldown=ALERT_COOLDOWN,
+         message="💾 RAM FULL: {raw}% selama {duration} dtk"),
+    Rule('DISK', 'disk:*', 'value', '>', DISK_THRESHOLD, cooldown=3600, message="💿 {label} FULL: {raw}%"),
+    Rule('DISK FILL', 'disk:*', 'eta', '<', DISK_FILL_HOURS, window=DISK_FILL_WINDOW, for_seconds=300, cooldown=3600,
+         message="📈 {label} diprediksi penuh dalam {value:.1f} jam (sekarang {raw}%, naik terus)"),
+]
+rule_engine = RuleEngine(ALERT_RULES)
 
-last_alert_time = 0 
+# CPU / RAM / disk / uptime (partisi di-cache, disk_usage per mount pakai timeout).
+# Mode --unified: diganti MetricsBus dari runtime.py (sampel dibagi dengan service lain)
+host_stats = HostStats()
+# History 1 jam terakhir di ring buffer (history.py), buat chart browser yang baru nyambung
+history = MetricHistory()
 
 # ==========================================
 # ROUTING (MENGHUBUNGKAN KE FILE HTML)
@@ -34,82 +60,51 @@ last_alert_time = 0
 @app.route('/')
 def index():
     # Flask otomatis mencari file ini di folder 'templates'
-    return render_template('index.html')
+    return render_template('index.html', history_seconds=history.capacity)
+
+@app.route('/api/history')
+def api_history():
+    # Snapshot biner (lihat MetricHistory.pack), ?since=<timestamp> cuma sampel setelahnya (reconnect)
+    blob = history.pack(since=request.args.get('since', type=float))
+    return Response(blob, mimetype='application/octet-stream', headers={'Cache-Control': 'no-store'})
 
 # ==========================================
 # LOGIKA BACKEND (MONITORING)
 # ==========================================
 def send_telegram_alert(message):
-    if not TELEGRAM_TOKEN or not TELEGRAM_CHAT_ID: return
-    try:
-        url = f"https://api.telegram.org/bot{TELEGRAM_TOKEN}/sendMessage"
-        data = {"chat_id": TELEGRAM_CHAT_ID, "text": message}
-        requests.post(url, data=data)
-    except Exception as e:
-        print(f"❌ Failed to send alert: {e}")
+    # Cuma masuk antrian (notifier.py), loop monitor gak ikut nunggu Telegram
+    notifier.send(message)
 
 def get_system_stats():
-    # 1. CPU
-    cpu = psutil.cpu_percent(interval=None) 
-    
-    # 2. RAM
-    ram = psutil.virtual_memory()
-    ram_percent = ram.percent
-    ram_used = round(ram.used / (1024**3), 2)
-    ram_total = round(ram.total / (1024**3), 2)
-    
-    # 3. DISK
-    disks = []
-    try:
-        partitions = psutil.disk_partitions()
-        for p in partitions:
-            if 'cdrom' in p.opts or p.fstype == '': continue
-            try:
-                usage = psutil.disk_usage(p.mountpoint)
-                disks.append({
-                    'letter': p.device.replace('\\', ''),
-                    'percent': usage.percent,
-                    'free': f"{round(usage.free / (1024**3), 1)} GB Free"
-                })
-            except: continue
-    except: pass
-
-    # 4. Uptime
-    boot_time = psutil.boot_time()
-    uptime_seconds = time.time() - boot_time
-    uptime_hours = round(uptime_seconds / 3600, 1)
-
-    return {
-        'cpu': cpu,
-        'ram_percent': ram_percent,
-        'ram_text': f"{ram_used}/{ram_total} GB",
-        'disks': disks,
-        'uptime': f"{uptime_hours} Hours"
-    }
+    # Disk dibaca di thread terpisah + partisi di-cache (hoststats.py), mount yang hang gak nahan loop ini
+    return host_stats.collect()
 
 def monitor_task():
-    global last_alert_time
     print("🧵 Thread Monitor: STARTING...")
     
-    # Pemanasan CPU stats
-    psutil.cpu_percent(interval=None)
+    notifier.start()
+    disk_metrics = set()   # metric disk di tick sebelumnya, buat deteksi disk yang hilang
     
     while True:
         try:
             stats = get_system_stats()
             
-            # Logika Alarm Telegram
-            current_time = time.time()
-            if (current_time - last_alert_time) > ALERT_COOLDOWN:
-                alert_msg = ""
-                if stats['cpu'] > CPU_THRESHOLD: alert_msg += f"🔥 CPU CRITICAL: {stats['cpu']}%\n"
-                if stats['ram_percent'] > RAM_THRESHOLD: alert_msg += f"💾 RAM FULL: {stats['ram_percent']}%\n"
-                for d in stats['disks']:
-                    if d['percent'] > DISK_THRESHOLD: alert_msg += f"💿 {d['letter']} FULL: {d['percent']}%\n"
-                
-                if alert_msg:
-                    send_telegram_alert(f"🚨 [SYSGAZE ALERT] 🚨\n\n{alert_msg}")
-                    last_alert_time = current_time
+            # Logika Alarm Telegram (rule sliding window, lihat ALERT_RULES)
+            metrics = {'cpu': stats['cpu'], 'ram': stats['ram_percent']}
+            # Key pakai mountpoint (1 device bisa di-mount / bind-mount di beberapa tempat).
+            # Disk yang lagi timeout gak dihitung (nilainya basi, bisa ngerusak tren)
+            disks = {f"disk:{d['mount']}": None if d.get('stale') else d['percent'] for d in stats['disks']}
+            metrics.update(disks)
+            # Disk yang dilepas: buang state alert (rule engine) + ring history-nya biar slot-nya kosong lagi
+            for gone in disk_metrics - disks.keys():
+                rule_engine.forget(gone)
+                history.forget(gone)
+            disk_metrics = set(disks)
+            alert_lines = rule_engine.observe(metrics)
+            stats['ts'] = time.time()
+            history.record(stats['ts'], metrics)
+            if alert_lines:
+                send_telegram_alert("🚨 [SYSGAZE ALERT] 🚨\n\n" + "\n".join(alert_lines))
 
             # Kirim Data ke HTML via SocketIO
             socketio.emit('update_stats', stats)
@@ -117,13 +112,16 @@ def monitor_task():
         except Exception as e:
             print(f"Error Monitor Loop: {e}")
 
-        time.sleep(1)
+        socketio.sleep(1)
+
+def start():
+    # Jalankan Monitor di background (thread / greenlet sesuai mode server)
+    socketio.start_background_task(monitor_task)
+
+def serve():
+    print(f"🔥 SysGaze Server Running on Port {SYSGAZE_PORT} [{serving.ASYNC_MODE}]...")
+    serving.run(socketio, app, SYSGAZE_PORT)
 
 if __name__ == '__main__':
-    # Jalankan Monitor di Background Thread
-    t = threading.Thread(target=monitor_task)
-    t.daemon = True 
-    t.start()
-    
-    print("🔥 SysGaze Server Running on Port 5001...")
-    socketio.run(app, host='0.0.0.0', port=5001, debug=False, allow_unsafe_werkzeug=True)
\ No newline at end of file
+    start()
+    serve()
@@ -0,0 +1,189 @@
+import json
+import math
+import os
+import threading
+import time
+import zlib
+from collections import deque
+from datetime import datetime, timedelta
+
+# --- OPTIONAL: payload msgpack buat /api/agent/bulk ---
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# --- KONFIGURASI TELEMETRY AGENT ---
+AGENT_HISTORY_SIZE = int(os.getenv('AGENT_HISTORY_SIZE', '1200'))     # sampel per metric di RAM (1 jam @ 3 detik)
+AGENT_MAX_METRICS = int(os.getenv('AGENT_MAX_METRICS', '64'))         # metric per agent yang disimpan historinya
+AGENT_TTL = float(os.getenv('AGENT_TTL', '300'))                      # agent diam selama ini -> dibuang dari RAM
+AGENT_MAX_PROCS = int(os.getenv('AGENT_MAX_PROCS', '10'))             # proses teratas per agent yang ditampilkan
+
+
+def clean_ts(ts, now):
+    # Timestamp dari agent: gak ada (None) -> sekarang, harus angka finite yang bisa jadi datetime di platform ini
+    # (string / list / NaN / 1e20 -> None). 0 / epoch juga ditolak, bukan diam-diam dicap "sekarang".
+    # Jam agent kecepetan -> anggap sekarang.
+    if ts is None: return now
+    if isinstance(ts, bool) or not isinstance(ts, (int, float)): return None
+    if ts <= 0: return None
+    try:
+        datetime.fromtimestamp(ts)
+    except (ValueError, OverflowError, OSError):
+        return None
+    return min(float(ts), now)
+
+
+# ==========================================
+# AGENT TELEMETRY (PENGGANTI DICT remote_agents)
+# ==========================================
+# - RAM: ring buffer (deque maxlen) per agent per metric -> memori konstan
+# - DB: tiap sampel diteruskan ke backend time-series (tsdb.py) yang nulis per batch
+# - Agent yang gak lapor lagi selama AGENT_TTL otomatis dibuang (misal habis ganti nama)
+class AgentTelemetry:
+    def __init__(self, store=None, history_size=AGENT_HISTORY_SIZE, max_metrics=AGENT_MAX_METRICS, ttl=AGENT_TTL):
+        self.store = store
+        self.history_size = history_size
+        self.max_metrics = max_metrics
+        self.ttl = ttl
+        self.agents = {}     # name -> {'ip', 'last_seen' (epoch), 'metrics': {metric: value terakhir}}
+        self.history = {}    # name -> {metric: deque[(epoch, value)]}
+        self.lock = threading.Lock()
+        self.thread = None
+
+    def start(self, on_evict=None):
+        self.thread = threading.Thread(target=self._run, args=(on_evict,), name='agent-ttl', daemon=True)
+        self.thread.start()
+        return self
+
+    def _run(self, on_evict):
+        while True:
+            time.sleep(max(1.0, self.ttl / 10))
+            try:
+                gone = self.evict()
+                if gone and on_evict: on_evict(gone)
+            except Exception as e:
+                print(f"❌ Agent TTL error: {e}")
+
+    def ingest(self, name, metrics, ip=None, ts=None):
+        return self.ingest_batch(name, [(ts, metrics)], ip)
+
+    def ingest_batch(self, name, samples, ip=None):
+        # samples: [(epoch, {metric: value})], urut waktu. Semua baris DB-nya dikirim sekali jalan.
+        # Agent ngirim delta (cuma metric yang berubah), metric yang absen tetap pakai nilai terakhir.
+        # Return jumlah sampel yang diterima; sampel dengan ts rusak di-skip sebelum apa pun diubah.
+        rows = []
+        now = time.time()
+        samples = [(clean_ts(ts, now), metrics) for ts, metrics in samples if isinstance(metrics, dict)]
+        samples = [(ts, metrics) for ts, metrics in samples if ts is not None]
+        if not samples: return 0
+        with self.lock:
+            agent = self.agents.setdefault(name, {'ip': ip, 'last_seen': 0, 'metrics': {}})
+            if ip: agent['ip'] = ip
+            series = self.history.setdefault(name, {})
+            for ts, metrics in samples:
+                procs = metrics.get('procs')
+                metrics = {k: v for k, v in metrics.items() if _finite(v)}
+                if ts >= agent['last_seen']:
+                    agent['last_seen'] = ts
+                    agent['metrics'].update(metrics)
+                    if isinstance(procs, list): agent['procs'] = _clean_procs(procs)
+                for metric, value in metrics.items():
+                    buf = series.get(metric)
+                    if buf is None:
+                        if len(series) >= self.max_metrics: continue
+                        buf = series[metric] = deque(maxlen=self.history_size)
+                    if buf and ts < buf[-1][0]: continue   # sampel telat (replay) cukup masuk DB
+                    buf.append((ts, value))
+                when = datetime.fromtimestamp(ts)
+                rows.extend({'agent': name, 'metric': m, 'value': v, 'timestamp': when} for m, v in metrics.items())
+
+        if self.store is not None and rows:
+            self.store.write('agent', rows)
+        return len(samples)
+
+    def evict(self, now=None):
+        cutoff = (now or time.time()) - self.ttl
+        with self.lock:
+            gone = [name for name, a in self.agents.items() if a['last_seen'] < cutoff]
+            for name in gone:
+                del self.agents[name]
+                self.history.pop(name, None)
+        return gone
+
+    def snapshot(self, names=None):
+        # Format lama remote_agents: {name: {cpu, ram, ip, last_seen}} + metric lain apa adanya
+        # names: cuma agent tertentu (dipakai broadcaster buat kirim yang berubah saja)
+        with self.lock:
+            picked = self.agents.items() if names is None else ((n, self.agents[n]) for n in names if n in self.agents)
+            return {name: dict(a['metrics'], ip=a['ip'], procs=a.get('procs', []),
+                               last_seen=datetime.fromtimestamp(a['last_seen']).strftime('%H:%M:%S'))
+                    for name, a in picked}
+
+    def recent(self, name, metric, seconds):
+        # Dari ring buffer RAM; None kalau range-nya lebih tua dari isi buffer (biar caller ambil dari DB)
+        cutoff = time.time() - seconds
+        with self.lock:
+            buf = self.history.get(name, {}).get(metric)
+            if not buf: return None
+            # Buffer belum nyampe awal range (kepotong maxlen / server baru restart) -> DB lebih lengkap
+            if self.store is not None and buf[0][0] > cutoff + 10: return None
+            return [(t, v) for t, v in buf if t >= cutoff]
+
+    def chart(self, name, metric, seconds):
+        rows = self.recent(name, metric, seconds)
+        if rows is not None:
+            return {'source': 'memory', 'labels': [datetime.fromtimestamp(t).strftime('%H:%M:%S') for t, _ in rows],
+                    'values': [v for _, v in rows]}
+        if self.store is None: return {'source': 'memory', 'labels': [], 'values': []}
+        now = datetime.now()
+        start = now - timedelta(seconds=seconds)
+        # Range pendek: data mentah, range panjang: agregasi per bucket di DB
+        if seconds <= 3600: out = self.store.chart('agent', (name, metric), start, now)
+        else: out = self.store.aggregate('agent', (name, metric), start, now, 0)
+        out['source'] = 'db'
+        return out
+
+
+def _clean_procs(procs):
+    # Daftar top proses dari agent cuma disimpan yang terbaru (gak masuk DB), dibatasi biar gak bengkak
+    out = []
+    for p in procs[:AGENT_MAX_PROCS]:
+        if not isinstance(p, dict): continue
+        out.append({'name': str(p.get('name') or '?')[:64],
+                    'cpu': p.get('cpu') if _finite(p.get('cpu')) else 0,
+                    'mem': p.get('mem') if _finite(p.get('mem')) else 0})
+    return out
+
+
+def _finite(v):
+    # NaN / Infinity lolos isinstance float, tapi bikin snapshot gak bisa di-JSON.parse browser
+    return isinstance(v, (int, float)) and not isinstance(v, bool) and math.isfinite(v)
+
+
+# ==========================================
+# DECODE BULK PAYLOAD (/api/agent/bulk)
+# ==========================================
+BULK_MAX_BYTES = int(os.getenv('BULK_MAX_BYTES', str(8 * 1024 * 1024)))   # setelah di-unzip
+
+
+class BulkError(Exception):
+    def __init__(self, message, code=400):
+        super().__init__(message)
+        self.code = code
+
+
+def decode_bulk(req):
+    body = req.get_data(cache=False)
+    if req.headers.get('Content-Encoding', '').lower() == 'gzip':
+        # Dibatasi biar gak kena "zip bomb"
+        d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        body = d.decompress(body, BULK_MAX_BYTES)
+        if d.unconsumed_tail: raise BulkError("payload kegedean", 413)
+    if len(body) > BULK_MAX_BYTES: raise BulkError("payload kegedean", 413)
+
+    ctype = (req.mimetype or '').lower()
+    if ctype in ('application/msgpack', 'application/x-msgpack'):
+        if msgpack is None: raise BulkError("server belum install msgpack", 415)
+        return msgpack.unpackb(body, raw=False)
+    return json.loads(body)
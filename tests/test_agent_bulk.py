@@ -0,0 +1,91 @@
+# Payload /api/agent/bulk dengan ts rusak: harus 400 / di-skip, bukan 500, dan gak ngubah state agent
+import json
+import math
+import os
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+os.environ.setdefault('TELEGRAM_TOKEN', '')
+
+import pytest  # noqa: E402
+
+import netwatch  # noqa: E402
+from telemetry import AgentTelemetry, clean_ts  # noqa: E402
+
+BAD_TS = ['abc', [1], {'a': 1}, True, math.nan, math.inf, -math.inf, 1e20, -1e20, 0, 0.0, -5]
+
+
+@pytest.mark.parametrize('ts', BAD_TS)
+def test_clean_ts_rejects(ts):
+    assert clean_ts(ts, 1_700_000_000.0) is None
+
+
+def test_clean_ts_defaults_and_clamps():
+    now = 1_700_000_000.0
+    assert clean_ts(None, now) == now
+    assert clean_ts(now - 5, now) == now - 5
+    assert clean_ts(now + 3600, now) == now
+
+
+def test_non_finite_values_are_dropped():
+    tel = AgentTelemetry()
+    assert tel.ingest_batch('pc', [(None, {'cpu': math.nan, 'ram': 5, 'disk': math.inf, 'procs': [
+        {'name': 'x', 'cpu': math.nan, 'mem': -math.inf}]})]) == 1
+    assert tel.agents['pc']['metrics'] == {'ram': 5}
+    assert set(tel.history['pc']) == {'ram'}
+    snap = tel.snapshot()
+    assert snap['pc']['procs'] == [{'name': 'x', 'cpu': 0, 'mem': 0}]
+    json.dumps(snap, allow_nan=False)
+
+
+def test_bad_samples_do_not_touch_state():
+    tel = AgentTelemetry()
+    assert tel.ingest_batch('pc', [('abc', {'cpu': 1}), (math.nan, {'cpu': 2})]) == 0
+    assert tel.agents == {} and tel.history == {}
+    assert tel.ingest_batch('pc', [([1], {'cpu': 1}), (None, {'cpu': 3})]) == 1
+    assert tel.agents['pc']['metrics'] == {'cpu': 3}
+    assert [v for _, v in tel.history['pc']['cpu']] == [3]
+
+
+@pytest.fixture
+def client():
+    return netwatch.app.test_client()
+
+
+@pytest.mark.parametrize('ts', ['abc', [1], 1e20, -1e20])
+def test_bulk_all_invalid_is_400(client, ts):
+    res = client.post('/api/agent/bulk', json={'name': 'bad-ts', 'samples': [{'ts': ts, 'cpu': 1}]})
+    assert res.status_code == 400
+    assert res.get_json()['rejected'] == 1
+    assert 'bad-ts' not in netwatch.telemetry.snapshot()
+
+
+def test_bulk_nan_is_400(client):
+    body = '{"name": "nan-ts", "samples": [{"ts": NaN, "cpu": 1}, {"ts": Infinity, "cpu": 2}]}'
+    res = client.post('/api/agent/bulk', data=body, content_type='application/json')
+    assert res.status_code == 400
+
+
+def test_bulk_partial_skips_bad(client):
+    res = client.post('/api/agent/bulk', json={'name': 'mixed-ts', 'samples': [{'ts': 'x', 'cpu': 1}, {'cpu': 2}]})
+    assert res.status_code == 200
+    assert res.get_json() == {'status': 'success', 'accepted': 1, 'rejected': 1}
+    assert netwatch.telemetry.snapshot(['mixed-ts'])['mixed-ts']['cpu'] == 2
+
+
+def test_bulk_nan_value_not_broadcast(client):
+    body = '{"name": "nan-val", "samples": [{"cpu": NaN, "ram": 7}]}'
+    res = client.post('/api/agent/bulk', data=body, content_type='application/json')
+    assert res.status_code == 200
+    snap = netwatch.telemetry.snapshot(['nan-val'])
+    assert 'cpu' not in snap['nan-val'] and snap['nan-val']['ram'] == 7
+    json.dumps(snap, allow_nan=False)
+
+
+def test_bulk_zero_ts_is_rejected(client):
+    res = client.post('/api/agent/bulk', json={'name': 'epoch-ts', 'samples': [{'ts': 0, 'cpu': 1}]})
+    assert res.status_code == 400
+    assert 'epoch-ts' not in netwatch.telemetry.snapshot()
@@ -0,0 +1,149 @@
+# AlertManager: histeresis N-of-M, recovery, flapping + STABLE, digest, dan thread pengirim (digest + rate limit)
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from alerting import AlertManager, digest  # noqa: E402
+
+T0 = 1_700_000_000.0
+
+
+def events(mgr):
+    out = []
+    while not mgr.queue.empty(): out.append(mgr.queue.get_nowait())
+    return out
+
+
+def feed(mgr, statuses, key=1, name='R1', start=T0, step=1.0):
+    return [mgr.observe(key, name, s, now=start + i * step) for i, s in enumerate(statuses)]
+
+
+def test_down_needs_n_of_m_failures():
+    mgr = AlertManager({}, threshold=3, window=5, recover=2)
+    assert feed(mgr, ['DOWN', 'DOWN']) == [None, None]
+    assert events(mgr) == []
+    assert feed(mgr, ['UP', 'DOWN'], start=T0 + 2) == [None, 'DOWN']   # 3 dari 4 terakhir gagal
+    [e] = events(mgr)
+    assert (e['kind'], e['key'], e['name']) == ('DOWN', 1, 'R1')
+
+
+def test_failures_outside_window_do_not_count():
+    mgr = AlertManager({}, threshold=3, window=5, recover=2)
+    out = feed(mgr, ['DOWN', 'DOWN', 'UP', 'UP', 'UP', 'UP', 'DOWN'])
+    assert out == [None] * 7
+    assert mgr.devices[1]['state'] == 'UP'
+
+
+def test_recovery_needs_consecutive_successes():
+    mgr = AlertManager({}, threshold=1, window=5, recover=2)
+    assert feed(mgr, ['DOWN']) == ['DOWN']
+    assert feed(mgr, ['UP', 'DOWN', 'UP'], start=T0 + 1) == [None, None, None]
+    assert mgr.observe(1, 'R1', 'UP', now=T0 + 10) == 'UP'
+    assert [e['kind'] for e in events(mgr)] == ['DOWN', 'UP']
+
+
+def test_err_is_ignored():
+    mgr = AlertManager({}, threshold=1, window=1, recover=1)
+    assert feed(mgr, ['ERR', 'ERR', 'UNREACHABLE']) == [None] * 3
+    assert mgr.devices == {}
+
+
+def test_seed_prevents_false_alert_after_restart():
+    mgr = AlertManager({}, threshold=1, window=1, recover=1)
+    mgr.seed({1: 'DOWN'})
+    assert mgr.observe(1, 'R1', 'DOWN', now=T0) is None
+    assert mgr.observe(1, 'R1', 'UP', now=T0 + 1) == 'UP'
+
+
+def test_flapping_alerts_once_then_stable():
+    mgr = AlertManager({}, threshold=1, window=1, recover=1, flap_window=600, flap_limit=4, flap_quiet=300)
+    out = feed(mgr, ['DOWN', 'UP', 'DOWN', 'UP', 'DOWN', 'UP'], step=10)
+    assert out == ['DOWN', 'UP', 'DOWN', 'UP', 'DOWN', 'UP']   # status tetap dilacak
+    kinds = [e['kind'] for e in events(mgr)]
+    assert kinds == ['DOWN', 'UP', 'DOWN', 'FLAPPING']          # sisanya ditahan
+    assert mgr.stats['suppressed'] == 2
+
+    last = T0 + 50
+    assert mgr.observe(1, 'R1', 'UP', now=last + 100) is None   # belum cukup diam
+    assert events(mgr) == []
+    mgr.observe(1, 'R1', 'UP', now=last + 300)
+    [e] = events(mgr)
+    assert (e['kind'], e['status']) == ('STABLE', 'UP')
+    assert mgr.devices[1]['flapping'] is False
+
+
+def test_flap_window_expires_old_changes():
+    mgr = AlertManager({}, threshold=1, window=1, recover=1, flap_window=60, flap_limit=3)
+    feed(mgr, ['DOWN', 'UP', 'DOWN', 'UP'], step=100)
+    assert 'FLAPPING' not in [e['kind'] for e in events(mgr)]
+
+
+def test_forget_drops_state():
+    mgr = AlertManager({}, threshold=1, window=1, recover=1)
+    feed(mgr, ['DOWN'])
+    mgr.forget(1)
+    assert mgr.devices == {}
+    assert mgr.observe(1, 'R1', 'UP', now=T0 + 5) is None
+
+
+def test_digest_groups_and_keeps_latest_per_device():
+    evs = [{'kind': 'DOWN', 'key': 1, 'name': 'R1', 'note': '3 device di belakangnya'},
+           {'kind': 'DOWN', 'key': 2, 'name': 'R2'},
+           {'kind': 'UP', 'key': 2, 'name': 'R2'},
+           {'kind': 'INFO', 'name': '', 'text': 'info bebas'}]
+    text = digest(evs)
+    assert text.splitlines() == ['📣 NetWatch: 3 kejadian', '🚨 DOWN (1): R1 (3 device di belakangnya)',
+                                 '✅ UP (1): R2', 'info bebas']
+    assert digest(evs[1:2]) == '🚨 R2 DOWN!'
+
+
+def test_digest_truncates_long_name_lists():
+    evs = [{'kind': 'DOWN', 'key': i, 'name': f'D{i}'} for i in range(35)]
+    line = digest(evs).splitlines()[1]
+    assert line.startswith('🚨 DOWN (35): D0, D1') and line.endswith('D29 +5 lainnya')
+
+
+def wait_for(cond, timeout=3.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        if cond(): return True
+        time.sleep(0.01)
+    return False
+
+
+def test_sender_batches_events_into_one_digest():
+    sent = []
+    mgr = AlertManager({'t': sent.append}, threshold=1, window=1, recover=1, digest_window=0.2).start()
+    for key in range(3): mgr.observe(key, f'D{key}', 'DOWN')
+    assert wait_for(lambda: sent)
+    time.sleep(0.1)
+    assert len(sent) == 1 and sent[0].startswith('📣 NetWatch: 3 kejadian')
+
+
+def test_sender_rate_limit_defers_to_next_digest():
+    sent = []
+    mgr = AlertManager({'t': sent.append}, threshold=1, window=1, recover=1, digest_window=0.05,
+                       rate_per_min=60 * 5, burst=1).start()   # 1 pesan langsung, berikutnya tiap 0.2 dtk
+    mgr.observe(1, 'D1', 'DOWN')
+    assert wait_for(lambda: len(sent) == 1)
+    mgr.observe(2, 'D2', 'DOWN')
+    mgr.observe(3, 'D3', 'DOWN')
+    assert wait_for(lambda: len(sent) == 2)
+    assert sent[0] == '🚨 D1 DOWN!' and sent[1].startswith('📣 NetWatch: 2 kejadian')
+
+
+def test_sender_survives_destination_error():
+    calls = []
+
+    def boom(text):
+        calls.append(text)
+        raise RuntimeError('telegram mati')
+
+    mgr = AlertManager({'t': boom}, threshold=1, window=1, recover=1, digest_window=0.01).start()
+    mgr.observe(1, 'D1', 'DOWN')
+    assert wait_for(lambda: mgr.stats['errors'] == 1)
+    mgr.observe(2, 'D2', 'DOWN')
+    assert wait_for(lambda: len(calls) == 2)
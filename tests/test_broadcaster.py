@@ -0,0 +1,141 @@
+# Broadcaster: seq naik cuma kalau ada yang berubah, diff vs nilai terakhir, snapshot/resync, source error gak ngilangin key
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest  # noqa: E402
+from flask import Flask, request  # noqa: E402
+
+from broadcaster import Broadcaster  # noqa: E402
+
+
+class FakeSocketIO:
+    def __init__(self):
+        self.sent = []
+        self.handlers = {}
+
+    def on_event(self, name, handler):
+        self.handlers[name] = handler
+
+    def emit(self, name, msg, to=None, **kw):
+        self.sent.append((name, msg, to, kw))
+
+
+@pytest.fixture
+def sio():
+    return FakeSocketIO()
+
+
+def msgs(sio):
+    out = [m for _, m, _, _ in sio.sent]
+    sio.sent.clear()
+    return out
+
+
+def test_delta_only_changed_values_and_seq(sio):
+    b = Broadcaster(sio).channel('mon')
+    b.update('mon', {1: 'UP', 2: 'DOWN'})
+    b.update('mon', {1: 'UP'})
+    assert b.flush() == 1
+    assert msgs(sio) == [{'seq': 1, 'full': False, 'changed': {'1': 'UP', '2': 'DOWN'}, 'removed': []}]
+
+    b.update('mon', {1: 'UP', 2: 'UP'})
+    assert b.flush() == 1
+    assert msgs(sio) == [{'seq': 2, 'full': False, 'changed': {'2': 'UP'}, 'removed': []}]
+
+    b.update('mon', {1: 'UP'})
+    assert b.flush() == 0 and msgs(sio) == []   # gak berubah: seq gak naik
+    assert b.channels['mon'].seq == 2
+
+
+def test_remove_only_known_keys(sio):
+    b = Broadcaster(sio).channel('mon')
+    b.update('mon', {1: 'UP'})
+    b.flush()
+    msgs(sio)
+    b.remove('mon', [1, 99])
+    b.flush()
+    assert msgs(sio) == [{'seq': 2, 'full': False, 'changed': {}, 'removed': ['1']}]
+    b.remove('mon', [1])
+    assert b.flush() == 0
+
+
+def test_update_after_remove_in_same_tick_wins(sio):
+    b = Broadcaster(sio).channel('mon')
+    b.update('mon', {1: 'UP'})
+    b.flush()
+    msgs(sio)
+    b.remove('mon', [1])
+    b.update('mon', {1: 'DOWN'})
+    b.flush()
+    assert msgs(sio) == [{'seq': 2, 'full': False, 'changed': {'1': 'DOWN'}, 'removed': []}]
+
+
+def test_touch_pulls_from_source_and_missing_is_removed(sio):
+    data = {'a': 1, 'b': 2}
+    b = Broadcaster(sio).channel('agents', source=lambda keys: {k: data[k] for k in (keys or data) if k in data})
+    b.touch('agents', ['a', 'b', 'a'])
+    b.flush()
+    assert msgs(sio)[0]['changed'] == {'a': 1, 'b': 2}
+    del data['b']
+    data['a'] = 5
+    b.touch('agents', ['a', 'b'])
+    b.flush()
+    assert msgs(sio) == [{'seq': 2, 'full': False, 'changed': {'a': 5}, 'removed': ['b']}]
+
+
+def test_source_error_keeps_touched_keys(sio):
+    data, fail = {'a': 1}, [True]
+
+    def source(keys):
+        if fail[0]: raise RuntimeError('shared state kekunci')
+        return {k: data[k] for k in (keys or data)}
+
+    b = Broadcaster(sio).channel('agents', source=source)
+    b.touch('agents', ['a'])
+    with pytest.raises(RuntimeError):
+        b.flush()
+    assert b.channels['agents'].touched == {'a'} and b.channels['agents'].seq == 0
+    fail[0] = False
+    b.flush()
+    assert msgs(sio) == [{'seq': 1, 'full': False, 'changed': {'a': 1}, 'removed': []}]
+
+
+def test_source_error_does_not_resurrect_removed_key(sio):
+    def source(keys): raise RuntimeError('x')
+
+    b = Broadcaster(sio).channel('agents', source=source)
+    b.touch('agents', ['a'])
+    ch = b.channels['agents']
+    real = b._restore
+
+    def restore(*args):
+        b.remove('agents', ['a'])   # dihapus selama source jalan
+        real(*args)
+
+    b._restore = restore
+    with pytest.raises(RuntimeError):
+        b.flush()
+    assert ch.touched == set() and ch.removed == {'a'}
+
+
+def test_snapshot_and_resync(sio):
+    b = Broadcaster(sio, local=True).channel('mon').channel('agents', source=lambda keys: {'x': 1})
+    b.update('mon', {1: 'UP'})
+    b.flush()
+    sio.sent.clear()
+    assert b.snapshot('mon') == {'seq': 1, 'full': True, 'items': {'1': 'UP'}}
+    assert b.snapshot('agents') == {'seq': 0, 'full': True, 'items': {'x': 1}}
+
+    app = Flask(__name__)
+    with app.test_request_context():
+        request.sid = 'browser-1'
+        sio.handlers['resync']('mon')
+    [(name, msg, to, kw)] = sio.sent
+    assert (name, to, kw) == ('mon', 'browser-1', {'ignore_queue': True}) and msg['full'] is True
+
+    sio.sent.clear()
+    b.send_snapshot('agents')
+    assert sio.sent == [('agents', {'seq': 0, 'full': True, 'items': {'x': 1}}, None, {'ignore_queue': True})]
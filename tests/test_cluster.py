@@ -0,0 +1,41 @@
+# Cluster: nomor prober harus ada di ring, pesan internal antar proses diteruskan ke handler
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest  # noqa: E402
+
+from cluster import CLUSTER_EVENT, Cluster, ClusterMixin  # noqa: E402
+
+
+@pytest.mark.parametrize('worker, probers', [(2, 2), (-1, 2), (0, 0)])
+def test_prober_outside_ring_refuses_to_start(worker, probers):
+    with pytest.raises(ValueError):
+        Cluster(role='prober', worker=worker, probers=probers)
+
+
+def test_every_worker_owns_devices():
+    shards = [Cluster(role='prober', worker=w, probers=3) for w in range(3)]
+    owned = [sum(c.owns(dev_id) for dev_id in range(300)) for c in shards]
+    assert sum(owned) == 300 and min(owned) > 0
+    Cluster(role='web', worker=9, probers=1)   # bukan prober: nomor worker gak dipakai
+
+
+def test_cluster_event_dispatched_and_not_relayed():
+    got, relayed = [], []
+
+    class Base:
+        def _handle_emit(self, message): relayed.append(message)
+
+    class Manager(ClusterMixin, Base):
+        pass
+
+    c = Cluster(role='prober')
+    c.on('devices', got.append)
+    mgr = Manager()
+    mgr.on_cluster, mgr.relay = c._dispatch, False
+    mgr._handle_emit({'event': CLUSTER_EVENT, 'data': [{'kind': 'devices', 'removed': [5]}]})
+    mgr._handle_emit({'event': 'update_monitor', 'data': {}})
+    assert got == [{'kind': 'devices', 'removed': [5]}] and relayed == []
@@ -0,0 +1,51 @@
+# MetricHistory: ring tetap sejajar, forget() ngosongin slot series, nama di pack() gak kepotong di tengah karakter
+import math
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from history import MetricHistory, RingBuffer, unpack  # noqa: E402
+
+
+def test_ring_wraps_in_order():
+    ring = RingBuffer(3, 'd', 0.0)
+    for v in range(5): ring.append(v)
+    assert list(ring.ordered()) == [2, 3, 4]
+    assert list(ring.ordered(2)) == [3, 4]
+
+
+def test_late_series_is_aligned_and_since_filters():
+    h = MetricHistory(capacity=4)
+    h.record(1.0, {'cpu': 10})
+    h.record(2.0, {'cpu': 20, 'ram': 50})
+    h.record(3.0, {'cpu': None, 'ram': 60})
+    out = unpack(h.pack())
+    assert out['ts'] == [1.0, 2.0, 3.0]
+    assert out['cpu'] == [10, 20, None] and out['ram'] == [None, 50, 60]
+    assert unpack(h.pack(since=2.0)) == {'ts': [3.0], 'cpu': [None], 'ram': [60]}
+
+
+def test_forget_frees_slot_for_new_series():
+    h = MetricHistory(capacity=8, max_series=2)
+    h.record(1.0, {'cpu': 1, 'disk:/mnt/usb': 40})
+    h.record(2.0, {'cpu': 2, 'disk:/mnt/baru': 10})
+    assert set(h.series) == {'cpu', 'disk:/mnt/usb'}   # penuh: metric baru dibuang
+    h.forget('disk:/mnt/usb')
+    h.forget('gak-ada')
+    h.record(3.0, {'cpu': 3, 'disk:/mnt/baru': 11})
+    out = unpack(h.pack())
+    assert set(out) == {'ts', 'cpu', 'disk:/mnt/baru'}
+    assert out['disk:/mnt/baru'] == [None, None, 11]
+
+
+def test_long_utf8_name_cut_on_char_boundary():
+    name = 'disk:/media/' + 'é' * 200   # 12 + 400 byte
+    h = MetricHistory(capacity=2)
+    h.record(1.0, {name: 5})
+    out = unpack(h.pack())               # decode() strict: byte setengah karakter -> UnicodeDecodeError
+    [packed] = [k for k in out if k != 'ts']
+    assert name.startswith(packed) and len(packed.encode()) <= 255
+    assert out[packed] == [5]
+    assert not math.isnan(out['ts'][0])
@@ -0,0 +1,235 @@
+# Notifier + outbox: klaim (lease) antar proses, retry & backoff, 429 retry_after, 4xx tanpa parse_mode, thread pengirim
+# Session requests diganti stub yang balas respons sesuai skenario, jadi gak ada network.
+import json
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest  # noqa: E402
+
+import notifier  # noqa: E402
+from notifier import Notifier  # noqa: E402
+
+
+class Resp:
+    def __init__(self, status=200, body=None):
+        self.status_code = status
+        self.body = body if body is not None else {'ok': status == 200}
+        self.text = json.dumps(self.body)
+
+    def json(self):
+        return self.body
+
+
+class Session:
+    # responses: list Resp / Exception, dipakai berurutan; habis -> 200
+    def __init__(self, responses=(), on_post=None):
+        self.responses = list(responses)
+        self.on_post = on_post
+        self.calls = []
+
+    def post(self, url, data=None, files=None, timeout=None):
+        self.calls.append((url.rsplit('/', 1)[-1], dict(data or {})))
+        if self.on_post: self.on_post()
+        r = self.responses.pop(0) if self.responses else Resp()
+        if isinstance(r, Exception): raise r
+        return r
+
+
+@pytest.fixture
+def outbox():
+    return os.path.join(tempfile.mkdtemp(), 'outbox.db')
+
+
+def make(outbox, responses=(), service='svc', **kw):
+    opts = dict(token='T', chat_id='42', api='http://telegram.test', outbox=outbox, retries=3, backoff=2,
+                backoff_max=300)
+    opts.update(kw)
+    n = Notifier(service, **opts)
+    n.session = Session(responses)
+    n.start = lambda: n   # send() gak boleh nyalain thread pengirim: _persist / _deliver dijalankan manual
+    n._open()
+    return n
+
+
+def rows(n):
+    return n.con.execute('SELECT id, status, attempts, next_at, payload, error FROM outbox ORDER BY id').fetchall()
+
+
+def step(n):
+    n._persist()
+    return n._deliver()
+
+
+def make_due(n):
+    # Simulasi waktu backoff sudah lewat
+    n.con.execute("UPDATE outbox SET next_at = 0 WHERE status = 'pending'")
+
+
+def test_sent_in_order_and_removed(outbox):
+    n = make(outbox)
+    n.send('a')
+    n.send('b', parse_mode='Markdown')
+    step(n)
+    assert n.session.calls == [('sendMessage', {'chat_id': '42', 'text': 'a'}),
+                               ('sendMessage', {'chat_id': '42', 'text': 'b', 'parse_mode': 'Markdown'})]
+    assert rows(n) == [] and n.stats['sent'] == 2
+
+
+def test_disabled_without_token(outbox):
+    n = Notifier('svc', token=None, chat_id='42', outbox=outbox)
+    n.send('x')
+    assert n.queue.empty() and n.thread is None
+
+
+def test_network_error_retries_with_backoff_and_keeps_order(outbox):
+    n = make(outbox, [ConnectionError('putus'), Resp(502), Resp(), Resp()])
+    n.send('a')
+    n.send('b')
+    before = time.time()
+    wait = step(n)
+    assert len(n.session.calls) == 1            # 'b' nunggu di belakang 'a'
+    [(_, status, attempts, next_at, _, error), second] = rows(n)
+    assert (status, attempts) == ('pending', 1) and 'putus' in error
+    assert 2 <= wait <= 2.4 and before + 2 <= next_at <= time.time() + 2.4
+
+    make_due(n)
+    wait = step(n)                               # 502 -> attempts 2, backoff 2 * 2
+    assert rows(n)[0][2] == 2 and 4 <= wait <= 4.8
+    make_due(n)
+    step(n)
+    assert [c[1]['text'] for c in n.session.calls] == ['a', 'a', 'a', 'b']
+    assert rows(n) == [] and n.stats['retries'] == 2
+
+
+def test_gives_up_after_retries(outbox):
+    n = make(outbox, [Resp(500)] * 3, retries=3)
+    n.send('a')
+    for _ in range(3):
+        step(n)
+        make_due(n)
+    [(_, status, attempts, _, _, error)] = rows(n)
+    assert (status, attempts) == ('dead', 3) and 'HTTP 500' in error
+    assert n.stats['dead'] == 1
+    step(n)
+    assert len(n.session.calls) == 3
+
+
+def test_backoff_is_capped(outbox):
+    n = make(outbox, [Resp(500)] * 6, retries=10, backoff=2, backoff_max=5)
+    n.send('a')
+    waits = []
+    for _ in range(5):
+        waits.append(step(n))
+        make_due(n)
+    assert all(w <= 5 * 1.2 for w in waits) and waits[-1] >= 5
+
+
+def test_429_waits_retry_after_without_counting_attempt(outbox):
+    n = make(outbox, [Resp(429, {'description': 'Too Many Requests', 'parameters': {'retry_after': 7}})] * 5,
+             retries=2)
+    n.send('a')
+    wait = step(n)
+    [(_, status, attempts, _, _, _)] = rows(n)
+    assert 7 <= wait <= 7 * 1.2
+    assert (status, attempts) == ('pending', 0)
+    for _ in range(4):
+        make_due(n)
+        step(n)
+    assert rows(n)[0][1:3] == ('pending', 0)     # 429 terus-terusan gak bikin pesan mati
+
+
+def test_4xx_with_parse_mode_resent_as_plain_text(outbox):
+    n = make(outbox, [Resp(400, {'description': "Bad Request: can't parse entities"})])
+    n.send('dev_1 *DOWN', parse_mode='Markdown')
+    assert step(n) == 0
+    [(_, status, _, _, payload, _)] = rows(n)
+    assert status == 'pending' and 'parse_mode' not in json.loads(payload)
+    step(n)
+    assert n.session.calls[1] == ('sendMessage', {'chat_id': '42', 'text': 'dev_1 *DOWN'})
+    assert rows(n) == []
+
+
+def test_4xx_without_parse_mode_is_dead_and_rest_continue(outbox):
+    n = make(outbox, [Resp(403, {'description': 'Forbidden: bot was blocked'})])
+    n.send('a')
+    n.send('b')
+    step(n)
+    [(_, status, _, _, _, error)] = rows(n)
+    assert status == 'dead' and 'Forbidden' in error
+    assert [c[1]['text'] for c in n.session.calls] == ['a', 'b']
+
+
+def test_missing_photo_is_permanent(outbox):
+    n = make(outbox)
+    n.send_photo(outbox + '.missing.png', caption='cctv')
+    step(n)
+    assert rows(n)[0][1] == 'dead' and n.session.calls == []
+
+
+def test_expired_messages_are_not_sent(outbox):
+    n = make(outbox, max_age=60)
+    n.send('lama')
+    n._persist()
+    n.con.execute('UPDATE outbox SET created = created - 120')
+    step(n)
+    assert n.session.calls == [] and rows(n)[0][5] == 'expired'
+
+
+def test_claimed_message_not_sent_by_other_process(outbox):
+    a = make(outbox)
+    b = make(outbox)
+    a.send('sekali')
+    a._persist()
+    # Selagi A masih nunggu respons Telegram, B (proses lain, outbox sama) ikut jalan
+    a.session.on_post = lambda: b._deliver()
+    a._deliver()
+    assert len(a.session.calls) == 1 and b.session.calls == []
+    assert rows(a) == []
+
+
+def test_lease_expiry_lets_other_process_resend(outbox):
+    a = make(outbox)
+    b = make(outbox)
+    a.send('x')
+    a._persist()
+    # A klaim lalu mati sebelum sempat hapus: selama lease B gak boleh ngirim, setelah lease habis boleh
+    a.con.execute('UPDATE outbox SET next_at = ?', (time.time() + notifier.NOTIFY_LEASE,))
+    b._deliver()
+    assert b.session.calls == []
+    make_due(b)
+    b._deliver()
+    assert len(b.session.calls) == 1 and rows(b) == []
+
+
+def test_services_do_not_share_messages(outbox):
+    a = make(outbox, service='netwatch')
+    b = make(outbox, service='sysgaze')
+    a.send('x')
+    a._persist()
+    b._deliver()
+    assert b.session.calls == [] and a.pending() == 1 and b.pending() == 0
+
+
+def test_outbox_survives_restart(outbox):
+    n = make(outbox, [ConnectionError('putus')])
+    n.send('penting')
+    step(n)
+    n.con.close()
+    again = make(outbox)
+    make_due(again)
+    again._deliver()
+    assert [c[1]['text'] for c in again.session.calls] == ['penting']
+
+
+def test_thread_delivers_and_flushes(outbox):
+    n = Notifier('svc', token='T', chat_id='42', api='http://telegram.test', outbox=outbox)
+    n.session = Session()
+    n.send('halo')
+    assert n.flush(5)
+    assert n.session.calls == [('sendMessage', {'chat_id': '42', 'text': 'halo'})]
+    assert n.pending() == 0
@@ -0,0 +1,120 @@
+# probes.py: validasi probe_config waktu disimpan, banner kosong, key pool koneksi ikut setting TLS
+import asyncio
+import os
+import sys
+import tempfile
+from types import SimpleNamespace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+os.environ.setdefault('TELEGRAM_TOKEN', '')
+
+import pytest  # noqa: E402
+
+import netwatch  # noqa: E402
+from probes import PROBES, ConnectionPool, parse_config  # noqa: E402
+
+
+@pytest.mark.parametrize('probe_type, raw', [
+    ('banner', '('),
+    ('banner', '{"expect": "[a-"}'),
+    ('http', '{"expect_body": 5}'),
+    ('http', '{"path": ["/"]}'),
+    ('http', '{"expect_status": "abc"}'),
+    ('http', '{"expect_status": [200, "x"]}'),
+    ('http', '{"expect_status": true}'),
+    ('http', '{"timeout": 0}'),
+    ('https', '{"verify": "no"}'),
+    ('http', '{"path": '),
+])
+def test_bad_config_rejected(probe_type, raw):
+    with pytest.raises(ValueError):
+        parse_config(probe_type, raw)
+
+
+def test_good_config_accepted():
+    assert parse_config('http', '/health') == {'path': '/health'}
+    assert parse_config('banner', '^SSH-') == {'expect': '^SSH-'}
+    assert parse_config('http', '{"expect_status": "200-299", "expect_body": "ok", "timeout": 1.5}')['timeout'] == 1.5
+    assert parse_config('https', '{"expect_status": [200, 204], "verify": true}')['verify'] is True
+    assert parse_config('dns', None) == {}
+
+
+def run_probe(probe_type, banner, cfg):
+    async def main():
+        async def handle(reader, writer):
+            writer.write(banner)
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        engine = SimpleNamespace(loop=asyncio.get_running_loop(), pool=ConnectionPool())
+        try:
+            return await PROBES[probe_type](engine, '127.0.0.1', port, cfg)
+        finally:
+            server.close()
+    return asyncio.run(main())
+
+
+def test_banner_whitespace_only_is_mismatch():
+    assert run_probe('banner', b'  \r\n \r\n', {})['latency'] == 'Banner mismatch'
+    assert run_probe('banner', b'', {'expect': 'SSH'})['latency'] == 'Banner mismatch'
+
+
+def test_banner_match():
+    res = run_probe('banner', b'\r\nSSH-2.0-OpenSSH\r\n', {'expect': '^\\s*SSH-'})
+    assert res['status'] == 'UP' and res['latency'].startswith('SSH-2.0-OpenSSH')
+
+
+def test_pool_not_shared_across_tls_settings():
+    # Server HTTP keep-alive: hitung koneksi yang dibuka
+    async def main():
+        opened = []
+
+        async def handle(reader, writer):
+            opened.append(1)
+            try:
+                while True:
+                    while (await reader.readuntil(b'\r\n')) != b'\r\n': pass
+                    writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok')
+                    await writer.drain()
+            except (asyncio.IncompleteReadError, ConnectionError):
+                writer.close()
+
+        server = await asyncio.start_server(handle, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        engine = SimpleNamespace(loop=asyncio.get_running_loop(), pool=ConnectionPool())
+        try:
+            for cfg in ({}, {}, {'ca': '/etc/ssl/kantor.pem'}, {'verify': True}, {'ca': '/etc/ssl/kantor.pem'}):
+                assert (await PROBES['http'](engine, '127.0.0.1', port, cfg))['status'] == 'UP'
+        finally:
+            engine.pool.close()
+            server.close()
+        return len(opened), engine.pool.stats
+    opened, stats = asyncio.run(main())
+    assert opened == 3 and stats['reused'] == 2
+
+
+@pytest.fixture
+def client():
+    netwatch.app.config['LOGIN_DISABLED'] = True
+    with netwatch.app.app_context(): netwatch.db.create_all()
+    yield netwatch.app.test_client()
+    netwatch.app.config['LOGIN_DISABLED'] = False
+
+
+def test_add_device_rejects_bad_probe_config(client):
+    form = {'name': 'ssh-box', 'ip': '10.0.0.9', 'port': '22', 'icon': 'hdd', 'probe_type': 'banner', 'probe_config': '(ssh'}
+    res = client.post('/add_device', data=form)
+    assert res.status_code == 302
+    with netwatch.app.app_context():
+        assert netwatch.Device.query.filter_by(name='ssh-box').count() == 0
+    with client.session_transaction() as sess:
+        assert 'expect bukan regex valid' in dict(sess['_flashes'])['message']
+
+    form['probe_config'] = '^SSH-'
+    client.post('/add_device', data=form)
+    with netwatch.app.app_context():
+        assert netwatch.Device.query.filter_by(name='ssh-box').count() == 1
@@ -0,0 +1,83 @@
+# Rollup -> range query bolak-balik harus ketemu bucket yang sama, termasuk di zona bukan kelipatan jam (+05:30)
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+os.environ.setdefault('TELEGRAM_TOKEN', '')
+
+import pytest  # noqa: E402
+
+import netwatch  # noqa: E402
+from rollup import HOUR, MINUTE, RollupWorker, floor_time, range_series  # noqa: E402
+
+DEV = 901
+
+
+@pytest.fixture(params=['UTC', 'Asia/Kolkata', 'America/St_Johns'])
+def tz(request):
+    old = os.environ.get('TZ')
+    os.environ['TZ'] = request.param
+    time.tzset()
+    yield request.param
+    if old is None: os.environ.pop('TZ', None)
+    else: os.environ['TZ'] = old
+    time.tzset()
+
+
+@pytest.fixture
+def db():
+    with netwatch.app.app_context():
+        netwatch.db.create_all()
+        netwatch.db.session.query(netwatch.PingHistory).delete()
+        netwatch.db.session.query(netwatch.PingRollup).delete()
+        netwatch.db.session.commit()
+        yield netwatch.db
+
+
+def test_floor_time_uses_naive_wall_clock(tz):
+    ts = datetime(2024, 3, 5, 10, 47, 31)
+    assert floor_time(ts, MINUTE) == datetime(2024, 3, 5, 10, 47)
+    assert floor_time(ts, HOUR) == datetime(2024, 3, 5, 10, 0)
+    assert floor_time(ts, 24 * HOUR) == datetime(2024, 3, 5)
+
+
+def test_rollup_range_round_trip(tz, db):
+    # 3 jam data per menit, latency = 10 / 20 / 30 per jam -> tiap tier harus balikin jam & nilai yang sama
+    base = floor_time(datetime.now() - timedelta(hours=5), HOUR)
+    rows = [{'device_id': DEV, 'timestamp': base + timedelta(minutes=m, seconds=15), 'latency': 10 * (m // 60 + 1)}
+            for m in range(180)]
+    db.session.execute(netwatch.PingHistory.__table__.insert(), rows)
+    db.session.commit()
+
+    RollupWorker(netwatch.app, db, netwatch.PingHistory, netwatch.PingRollup).run_once(now=base + timedelta(hours=3, minutes=5))
+    buckets = sorted(db.session.scalars(db.select(netwatch.PingRollup.bucket)
+                                        .where(netwatch.PingRollup.resolution == HOUR)))
+    assert buckets == [base, base + timedelta(hours=1), base + timedelta(hours=2)]
+
+    end = base + timedelta(hours=3)
+    hourly = range_series(db, netwatch.PingHistory, netwatch.PingRollup, {'device_id': DEV}, base, end, HOUR)
+    assert hourly['source'] == HOUR
+    assert hourly['timestamps'] == [(base + timedelta(hours=h)).isoformat() for h in range(3)]
+    assert hourly['values'] == [10, 20, 30] and hourly['loss'] == [0, 0, 0]
+
+    minutely = range_series(db, netwatch.PingHistory, netwatch.PingRollup, {'device_id': DEV},
+                            base, end, MINUTE)
+    assert minutely['source'] == MINUTE
+    assert minutely['timestamps'] == [(base + timedelta(minutes=m)).isoformat() for m in range(180)]
+    raw = range_series(db, netwatch.PingHistory, None, {'device_id': DEV}, base, end, HOUR)
+    assert raw['timestamps'] == hourly['timestamps'] and raw['values'] == hourly['values']
+
+
+def test_legacy_half_hour_bucket_is_realigned(db):
+    # Rollup jam yang dulu ke-floor pakai zona lokal (:30) -> watermark lanjut di grid jam penuh
+    base = datetime(2024, 3, 5, 9, 30)
+    db.session.execute(netwatch.PingRollup.__table__.insert(), [
+        {'device_id': DEV, 'resolution': HOUR, 'bucket': base, 'samples': 1, 'lost': 0}])
+    db.session.commit()
+    worker = RollupWorker(netwatch.app, db, netwatch.PingHistory, netwatch.PingRollup)
+    assert worker._next_bucket(HOUR, lambda: None) == datetime(2024, 3, 5, 10, 0)
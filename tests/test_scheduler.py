@@ -0,0 +1,110 @@
+# ProbeScheduler: backoff device stabil, reset ke SCHED_MIN saat berubah, retry eksponensial DOWN, override per device
+import os
+import random
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from scheduler import ProbeScheduler  # noqa: E402
+
+
+def make(**kw):
+    opts = dict(base=3, min_interval=1, max_interval=30, down_max=30, stable_after=5, backoff=1.5,
+                flap_window=300, flap_changes=2, jitter=0, clock=lambda: 1000.0)
+    opts.update(kw)
+    return ProbeScheduler(**opts)
+
+
+def run(sched, dev_id, statuses, start=1000.0):
+    # Lapor hasil berurutan, tiap probe tepat di jadwalnya; return interval yang dipakai
+    now, out = start, []
+    for status in statuses:
+        interval = sched.report(dev_id, status, now)
+        out.append(interval)
+        now += interval
+    return out
+
+
+def test_new_device_is_due_immediately():
+    sched = make()
+    sched.sync({1: None, 2: None})
+    assert sorted(sched.pop_due(1000.0)) == [1, 2]
+    assert sched.pop_due(1000.0) == []
+
+
+def test_stable_up_backs_off_by_factor_until_max():
+    sched = make()
+    sched.sync({1: None})
+    out = run(sched, 1, ['UP'] * 40)
+    assert out[:4] == [3, 3, 3, 3]
+    assert out[4] == 4.5               # 5 hasil sama -> x1.5
+    assert out[5:9] == [4.5] * 4
+    assert out[9] == 6.75
+    assert max(out) == 30 and out[-1] == 30
+
+
+def test_change_resets_to_min_interval():
+    sched = make()
+    sched.sync({1: None})
+    run(sched, 1, ['UP'] * 20)
+    assert sched.devices[1]['interval'] > 3
+    assert sched.report(1, 'DOWN', 2000.0) == 1
+    sched = make(flap_changes=10)
+    sched.sync({1: None})
+    run(sched, 1, ['DOWN'])
+    assert sched.report(1, 'UP', 2000.0) == 1
+
+
+def test_down_retries_exponentially_up_to_cap():
+    sched = make(down_max=10)
+    sched.sync({1: None})
+    assert run(sched, 1, ['DOWN'] * 7) == [1, 2, 4, 8, 10, 10, 10]
+
+
+def test_flapping_stays_on_min_interval():
+    sched = make(flap_changes=2)
+    sched.sync({1: None})
+    out = run(sched, 1, ['UP', 'DOWN', 'UP', 'UP', 'UP'])
+    assert out[2:] == [1, 1, 1]
+    assert sched.stats['flapping'] == 3
+
+
+def test_err_keeps_status_and_uses_base():
+    sched = make()
+    sched.sync({1: None})
+    run(sched, 1, ['DOWN', 'DOWN'])
+    assert sched.report(1, 'ERR', 2000.0) == 3
+    assert sched.devices[1]['status'] == 'DOWN'
+
+
+def test_override_is_fixed_and_not_jittered():
+    sched = make(jitter=0.1, rng=random.Random(1))
+    sched.sync({1: 10, 2: None})
+    assert run(sched, 1, ['UP'] * 12 + ['DOWN'] * 3 + ['ERR']) == [10] * 16
+    jittered = run(sched, 2, ['UP'] * 3)
+    assert all(2.7 <= v <= 3.3 for v in jittered) and jittered != [3, 3, 3]
+
+
+def test_override_change_reschedules_once():
+    sched = make()
+    sched.sync({1: None})
+    sched.pop_due(1000.0)
+    sched.report(1, 'UP', 1000.0)
+    sched.sync({1: 20})                  # jadwal lama jadi basi, device di-probe sekarang
+    assert sched.pop_due(1000.0) == [1]
+    assert sched.pop_due(5000.0) == []   # entry lama (due 1003) dilewati
+    assert sched.devices[1]['override'] == 20
+
+
+def test_removed_device_and_wake():
+    sched = make()
+    sched.sync({1: None, 2: None})
+    sched.pop_due(1000.0)
+    sched.report(1, 'UP', 1000.0)
+    sched.report(2, 'UP', 1000.0)
+    sched.sync({2: None})
+    assert sched.next_due() == 1003.0
+    sched.wake([2], now=1001.0)
+    assert sched.pop_due(1001.0) == [2]
+    assert sched.pop_due(9999.0) == []
@@ -0,0 +1,70 @@
+# WriteBuffer: 1 baris rusak cuma ngebuang baris itu, bukan seluruh batch (termasuk tabel lain)
+import os
+import sys
+import tempfile
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import pytest  # noqa: E402
+from flask import Flask  # noqa: E402
+from flask_sqlalchemy import SQLAlchemy  # noqa: E402
+
+from storage import WriteBuffer  # noqa: E402
+
+app = Flask(__name__)
+app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'storage.db')
+db = SQLAlchemy(app)
+
+
+class Ping(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    device_id = db.Column(db.Integer, nullable=False)
+    timestamp = db.Column(db.DateTime)
+
+
+class Event(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    message = db.Column(db.String(50), nullable=False)
+
+
+@pytest.fixture
+def buf():
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+    return WriteBuffer(app, db)
+
+
+def count(model):
+    with app.app_context(): return db.session.query(model).count()
+
+
+def test_clean_batch_written_in_one_flush(buf):
+    buf.add(Ping, [{'device_id': i, 'timestamp': datetime.now()} for i in range(50)])
+    buf.add(Event, {'message': 'ok'})
+    assert buf.flush() == 51
+    assert (count(Ping), count(Event)) == (50, 1)
+    assert buf.stats['errors'] == 0 and buf.stats['dropped'] == 0
+
+
+def test_bad_row_only_drops_itself(buf, capsys):
+    rows = [{'device_id': i, 'timestamp': datetime.now()} for i in range(100)]
+    rows[37]['device_id'] = None     # NOT NULL
+    rows[80]['device_id'] = None
+    buf.add(Ping, rows)
+    buf.add(Event, [{'message': 'router DOWN'}, {'message': 'router UP'}])
+    assert buf.flush() == 100
+    assert (count(Ping), count(Event)) == (98, 2)
+    assert buf.stats['dropped'] == 2 and buf.stats['rows_written'] == 100
+    assert '2 dari 100 baris Ping dibuang' in capsys.readouterr().out
+
+
+def test_whole_table_failure_keeps_other_tables(buf):
+    with app.app_context():
+        Event.__table__.drop(db.engine)   # OperationalError: gak dibelah-belah, langsung dibuang
+    buf.add(Ping, {'device_id': 1})
+    buf.add(Event, [{'message': 'x'}] * 10)
+    assert buf.flush() == 1
+    assert count(Ping) == 1 and buf.stats['dropped'] == 10
@@ -0,0 +1,52 @@
+# Topology: parent gak valid / siklus diabaikan, root cause = ancestor DOWN paling atas
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from topology import Topology  # noqa: E402
+
+
+def test_unknown_and_self_parent_ignored():
+    topo = Topology({1: None, 2: 1, 3: 3, 4: 99})
+    assert topo.parents == {2: 1}
+    assert topo.children == {1: [2]}
+
+
+def test_cycle_is_broken_once():
+    topo = Topology({1: 2, 2: 3, 3: 1, 4: 1})
+    assert len(topo.parents) == 3          # tepat 1 sisi siklus yang dibuang
+    for dev_id in (1, 2, 3, 4):
+        chain = topo.ancestors(dev_id)     # harus berhenti, gak muter
+        assert dev_id not in chain and len(chain) < 4
+
+
+def test_self_contained_cycles_and_tail():
+    # 5 -> 6 -> 5 siklus sendiri, 7 nempel di bawah siklus 1-2
+    topo = Topology({1: 2, 2: 1, 5: 6, 6: 5, 7: 2, 8: None})
+    assert len(topo.parents) == 3
+    assert all(len(topo.ancestors(d)) <= 2 for d in (1, 2, 5, 6, 7))
+    assert topo.parents[7] == 2
+
+
+def test_descendants_and_ancestors():
+    topo = Topology({1: None, 2: 1, 3: 1, 4: 2, 5: 4})
+    assert topo.ancestors(5) == [4, 2, 1]
+    assert topo.descendants(1) == [2, 3, 4, 5]
+    assert topo.descendants(5) == []
+
+
+def test_root_cause_is_topmost_down_ancestor():
+    topo = Topology({1: None, 2: 1, 3: 2, 4: 3})
+    down = {2, 3}
+    assert topo.root_cause(4, down.__contains__) == 2
+    assert topo.root_cause(2, down.__contains__) is None
+    assert topo.root_cause(1, lambda d: True) is None
+    assert topo.root_cause(4, {3}.__contains__) == 3
+
+
+def test_update_replaces_previous_tree():
+    topo = Topology({1: None, 2: 1})
+    topo.update({1: 2, 2: None})
+    assert topo.parents == {1: 2} and topo.children == {2: [1]}
@@ -0,0 +1,56 @@
+from collections import deque
+
+
+# ==========================================
+# TOPOLOGI DEVICE (PARENT / CHILD)
+# ==========================================
+# Device.parent_id = perangkat yang harus hidup supaya device ini bisa dijangkau (router / switch / AP).
+# Kalau parent DOWN, device di belakangnya gak di-probe (percuma, pasti timeout) dan ditandai UNREACHABLE,
+# cukup 1 alert root cause buat parent-nya. Parent yang gak dikenal / bikin siklus diabaikan.
+class Topology:
+    def __init__(self, parents=None):
+        self.parents = {}    # device_id -> parent_id
+        self.children = {}   # parent_id -> [device_id]
+        if parents: self.update(parents)
+
+    def update(self, parents):
+        # parents: {device_id: parent_id atau None}, semua device (termasuk milik shard lain)
+        self.parents = {dev_id: parent for dev_id, parent in parents.items()
+                        if parent and parent != dev_id and parent in parents}
+        for dev_id in list(self.parents):
+            if self._in_cycle(dev_id):
+                print(f"⚠️ Topologi: device {dev_id} ada di siklus parent, parent-nya diabaikan")
+                del self.parents[dev_id]
+        self.children = {}
+        for dev_id, parent in self.parents.items(): self.children.setdefault(parent, []).append(dev_id)
+
+    def _in_cycle(self, dev_id):
+        seen, node = {dev_id}, self.parents.get(dev_id)
+        while node is not None:
+            if node in seen: return node == dev_id   # siklus di atasnya diputus saat giliran node itu
+            seen.add(node)
+            node = self.parents.get(node)
+        return False
+
+    def ancestors(self, dev_id):
+        # Parent terdekat dulu, terakhir root
+        chain, node = [], self.parents.get(dev_id)
+        while node is not None:
+            chain.append(node)
+            node = self.parents.get(node)
+        return chain
+
+    def descendants(self, dev_id):
+        out, todo = [], deque(self.children.get(dev_id, ()))
+        while todo:
+            node = todo.popleft()
+            out.append(node)
+            todo.extend(self.children.get(node, ()))
+        return out
+
+    def root_cause(self, dev_id, is_down):
+        # Ancestor DOWN paling atas (router inti, bukan switch di belakangnya yang ikut UNREACHABLE)
+        cause = None
+        for node in self.ancestors(dev_id):
+            if is_down(node): cause = node
+        return cause
@@ -0,0 +1,355 @@
+import atexit
+import glob
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select
+
+from rollup import RollupWorker, pick_resolution, range_series, format_series, MINUTE, RANGE_MAX_POINTS
+
+# --- OPTIONAL: BACKEND KOLOMNAR (pip install duckdb pyarrow) ---
+try:
+    import duckdb
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+except ImportError:
+    duckdb = None
+
+# --- KONFIGURASI TIME-SERIES STORAGE ---
+TSDB_BACKEND = os.getenv('TSDB_BACKEND', 'sqlite')      # 'sqlite' (default) / 'parquet'
+TSDB_PATH = os.getenv('TSDB_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'storage', 'tsdb'))
+TSDB_SEGMENT_ROWS = int(os.getenv('TSDB_SEGMENT_ROWS', '50000'))        # segment ditulis kalau buffer segini
+TSDB_SEGMENT_SECONDS = float(os.getenv('TSDB_SEGMENT_SECONDS', '60'))   # atau sudah selama ini
+TSDB_RETENTION_DAYS = float(os.getenv('TSDB_RETENTION_DAYS', '90'))
+AGENT_RETENTION_HOURS = float(os.getenv('AGENT_RETENTION_HOURS', '48'))  # raw telemetry agent di SQLite
+
+# Definisi series: kolom kunci (buat milih 1 garis chart) + kolom nilai.
+# 'schema' dipakai backend parquet; kolom baru cukup ditambah di sini (segment lama tetap kebaca).
+SERIES = {
+    'ping': {
+        'keys': ('device_id',), 'value': 'latency',
+        'schema': [('timestamp', 'timestamp'), ('device_id', 'int64'), ('latency', 'float64'),
+                   ('dns_ms', 'float64'), ('connect_ms', 'float64'), ('tls_ms', 'float64'), ('ttfb_ms', 'float64')],
+    },
+    'agent': {
+        'keys': ('agent', 'metric'), 'value': 'value',
+        'schema': [('timestamp', 'timestamp'), ('agent', 'string'), ('metric', 'string'), ('value', 'float64')],
+    },
+}
+
+
+def key_filters(series, key):
+    keys = SERIES[series]['keys']
+    if not isinstance(key, (tuple, list)): key = (key,)
+    return dict(zip(keys, key))
+
+
+def chart_labels(rows, fmt='%H:%M:%S'):
+    return {'labels': [ts.strftime(fmt) for ts, _ in rows], 'values': [v for _, v in rows]}
+
+
+# ==========================================
+# BACKEND 1: SQLITE (DEFAULT)
+# ==========================================
+# Baris ORM biasa (PingHistory / AgentSample), tulis lewat WriteBuffer,
+# ping punya tier rollup menit/jam (rollup.py).
+class SQLiteBackend:
+    name = 'sqlite'
+
+    def __init__(self, app, db, writer, models, rollup_model=None):
+        self.app = app
+        self.db = db
+        self.writer = writer
+        self.models = models   # {'ping': PingHistory, 'agent': AgentSample}
+        self.rollup_model = rollup_model
+        retention = []
+        if 'agent' in models: retention.append((models['agent'], models['agent'].timestamp, AGENT_RETENTION_HOURS))
+        self.rollup_worker = RollupWorker(app, db, models['ping'], rollup_model, retention=retention) if rollup_model else None
+
+    def start(self, maintenance=True):
+        # maintenance: rollup + retensi cukup jalan di 1 proses (lihat cluster.py)
+        if self.rollup_worker and maintenance: self.rollup_worker.start()
+        return self
+
+    def write(self, series, rows):
+        return self.writer.add(self.models[series], rows)
+
+    def recent(self, series, key, limit=20):
+        M = self.models[series]
+        col = getattr(M, SERIES[series]['value'])
+        q = select(M.timestamp, col).where(*[getattr(M, k) == v for k, v in key_filters(series, key).items()]) \
+            .order_by(M.timestamp.desc()).limit(limit)
+        rows = self.db.session.execute(q).all()
+        rows.reverse()
+        return rows
+
+    def aggregate(self, series, key, start, end, step):
+        rollup = self.rollup_model if series == 'ping' else None
+        return range_series(self.db, self.models[series], rollup, key_filters(series, key),
+                            start, end, step, value=SERIES[series]['value'])
+
+    def chart(self, series, key, start, end):
+        # Pilih tier otomatis sesuai panjang range (raw / 1 menit / 1 jam)
+        resolution = pick_resolution(start, end) if series == 'ping' else 0
+        if resolution == 0:
+            M = self.models[series]
+            col = getattr(M, SERIES[series]['value'])
+            rows = self.db.session.execute(
+                select(M.timestamp, col)
+                .where(M.timestamp >= start, M.timestamp < end, *[getattr(M, k) == v for k, v in key_filters(series, key).items()])
+                .order_by(M.timestamp)).all()
+            return dict(chart_labels(rows), resolution=0)
+
+        P = self.rollup_model
+        data = P.query.filter(P.device_id == key, P.resolution == resolution, P.bucket >= start, P.bucket < end) \
+            .order_by(P.bucket).all()
+        fmt = '%H:%M' if resolution == MINUTE else '%d/%m %H:%M'
+        return {
+            'resolution': resolution,
+            'labels': [d.bucket.strftime(fmt) for d in data],
+            'values': [d.lat_avg for d in data],
+            'min': [d.lat_min for d in data],
+            'max': [d.lat_max for d in data],
+            'p95': [d.lat_p95 for d in data],
+            'loss': [round(100.0 * d.lost / d.samples, 1) if d.samples else None for d in data]
+        }
+
+    def delete(self, series, key):
+        filters = key_filters(series, key)
+        M = self.models[series]
+        self.db.session.execute(delete(M).where(*[getattr(M, k) == v for k, v in filters.items()]))
+        if series == 'ping' and self.rollup_model is not None:
+            P = self.rollup_model
+            self.db.session.execute(delete(P).where(*[getattr(P, k) == v for k, v in filters.items()]))
+        self.db.session.commit()
+
+
+# ==========================================
+# BACKEND 2: PARQUET + DUCKDB (KOLOMNAR)
+# ==========================================
+# Data ditumpuk di RAM lalu ditulis sebagai segment parquet append-only (zstd):
+#   <TSDB_PATH>/<series>/<YYYY-MM-DD>/seg-<us>-<pid>.parquet
+# Hari yang sudah lewat dipadatkan jadi 1 file terurut per hari (kompresi lebih mantap),
+# query/agregasi dikerjakan DuckDB langsung di atas file parquet + buffer RAM.
+class ParquetBackend:
+    name = 'parquet'
+
+    def __init__(self, root=TSDB_PATH, segment_rows=TSDB_SEGMENT_ROWS, segment_seconds=TSDB_SEGMENT_SECONDS,
+                 retention_days=TSDB_RETENTION_DAYS):
+        if duckdb is None:
+            raise RuntimeError("Backend parquet butuh 'duckdb' dan 'pyarrow' (pip install duckdb pyarrow)")
+        self.root = root
+        self.segment_rows = segment_rows
+        self.segment_seconds = segment_seconds
+        self.retention_days = retention_days
+        self.schemas = {name: pa.schema([(col, _arrow_type(t)) for col, t in spec['schema']])
+                        for name, spec in SERIES.items()}
+        self.buffers = {name: [] for name in SERIES}
+        self.last_flush = time.time()
+        self.lock = threading.RLock()   # jaga buffer + swap file saat compaction
+        self.con = duckdb.connect()
+        self.thread = None
+        os.makedirs(root, exist_ok=True)
+
+    def start(self, maintenance=True):
+        self.maintenance = maintenance
+        self.thread = threading.Thread(target=self._run, name='tsdb-parquet', daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+        return self
+
+    def _run(self):
+        last_maintenance = 0
+        while True:
+            time.sleep(1)
+            try:
+                if time.time() - self.last_flush >= self.segment_seconds: self.flush()
+                if self.maintenance and time.time() - last_maintenance >= 3600:
+                    self.compact()
+                    self.expire()
+                    last_maintenance = time.time()
+            except Exception as e:
+                print(f"❌ TSDB parquet error: {e}")
+
+    # --- TULIS ---
+    def write(self, series, rows):
+        if isinstance(rows, dict): rows = [rows]
+        with self.lock:
+            self.buffers[series].extend(rows)
+            full = len(self.buffers[series]) >= self.segment_rows
+        if full: self.flush(series)
+        return True
+
+    def flush(self, only=None):
+        with self.lock:
+            for series in ([only] if only else list(self.buffers)):
+                rows = self.buffers[series]
+                if not rows: continue
+                self.buffers[series] = []
+                table = pa.Table.from_pylist(rows, schema=self.schemas[series])
+                # Pecah per hari biar partisi tanggal tetap rapi
+                for day, part in _split_by_day(table):
+                    folder = os.path.join(self.root, series, day)
+                    os.makedirs(folder, exist_ok=True)
+                    _write_atomic(part, os.path.join(folder, f"seg-{time.time_ns() // 1000}-{os.getpid()}.parquet"))
+            self.last_flush = time.time()
+
+    def close(self):
+        self.flush()
+
+    # --- MAINTENANCE ---
+    def compact(self, today=None):
+        today = (today or datetime.now()).strftime('%Y-%m-%d')
+        for series, spec in SERIES.items():
+            for folder in sorted(glob.glob(os.path.join(self.root, series, '*'))):
+                # Hari ini masih ditulisi, yang lain cukup dipadatkan sekali
+                files = sorted(glob.glob(os.path.join(folder, '*.parquet')))
+                if os.path.basename(folder) >= today or len(files) < 2: continue
+                order = list(spec['keys']) + ['timestamp']
+                # Baca di luar lock (bisa lama), tapi sebelum ganti file cek lagi di dalam lock: kalau delete()
+                # sempat nulis ulang / hapus salah satu file, hasil baca ini basi -> skip, coba lagi run berikutnya
+                stamp = _stamp(files)
+                table = pq.read_table(files, schema=self.schemas[series]).sort_by([(c, 'ascending') for c in order])
+                with self.lock:
+                    if _stamp(files) != stamp: continue
+                    _write_atomic(table, os.path.join(folder, f"part-{time.time_ns() // 1000}.parquet"))
+                    for f in files: os.remove(f)
+
+    def expire(self, now=None):
+        cutoff = ((now or datetime.now()) - timedelta(days=self.retention_days)).strftime('%Y-%m-%d')
+        for folder in glob.glob(os.path.join(self.root, '*', '*')):
+            if os.path.basename(folder) < cutoff:
+                with self.lock: shutil.rmtree(folder, ignore_errors=True)
+
+    def disk_usage(self):
+        return sum(os.path.getsize(f) for f in glob.glob(os.path.join(self.root, '**', '*.parquet'), recursive=True))
+
+    # --- BACA ---
+    def _source(self, cur, series, start, end):
+        # File parquet yang tanggalnya kena range + isi buffer RAM (data yang belum di-flush)
+        days = set()
+        d = start.date()
+        while d <= end.date():
+            days.add(d.strftime('%Y-%m-%d'))
+            d += timedelta(days=1)
+        files = [f for f in glob.glob(os.path.join(self.root, series, '*', '*.parquet'))
+                 if os.path.basename(os.path.dirname(f)) in days]
+        # Cuma kolom yang dipakai query: segment lama yang belum punya kolom baru tetap kebaca
+        spec = SERIES[series]
+        cols = ', '.join(['timestamp', *spec['keys'], spec['value']])
+        parts = []
+        if files:
+            paths = ', '.join("'" + f.replace("'", "''") + "'" for f in files)
+            parts.append(f"SELECT {cols} FROM read_parquet([{paths}], union_by_name=true)")
+        buffered = self.buffers[series]
+        if buffered:
+            cur.register('buffered', pa.Table.from_pylist(list(buffered), schema=self.schemas[series]))
+            parts.append(f"SELECT {cols} FROM buffered")
+        return ' UNION ALL '.join(parts)
+
+    def _query(self, series, key, start, end, select_sql, tail=''):
+        filters = key_filters(series, key)
+        with self.lock:
+            cur = self.con.cursor()
+            try:
+                source = self._source(cur, series, start, end)
+                if not source: return []
+                where = ' AND '.join([f"{k} = ?" for k in filters] + ['timestamp >= ?', 'timestamp < ?'])
+                sql = f"SELECT {select_sql} FROM ({source}) WHERE {where} {tail}"
+                return cur.execute(sql, list(filters.values()) + [start, end]).fetchall()
+            finally:
+                cur.close()
+
+    def recent(self, series, key, limit=20):
+        value = SERIES[series]['value']
+        now = datetime.now()
+        rows = self._query(series, key, now - timedelta(days=1), now + timedelta(seconds=1),
+                           f"timestamp, {value}", f"ORDER BY timestamp DESC LIMIT {int(limit)}")
+        rows.reverse()
+        return [(ts, _num(v)) for ts, v in rows]
+
+    def aggregate(self, series, key, start, end, step, p95=False):
+        value = SERIES[series]['value']
+        span = max(1, int((end - start).total_seconds()))
+        step = max(int(step or 0), -(-span // RANGE_MAX_POINTS), 1)
+        extra = f", quantile_cont({value}, 0.95)" if p95 else ''
+        rows = self._query(series, key, start, end,
+                           f"CAST(epoch(timestamp) AS BIGINT) // {step} AS b, min({value}), avg({value}), max({value}), "
+                           f"count(*), count({value}){extra}", "GROUP BY b ORDER BY b")
+        out = format_series([r[:6] for r in rows], span, step, 0)
+        if p95: out['p95'] = [r[6] for r in rows]
+        return out
+
+    def chart(self, series, key, start, end):
+        resolution = pick_resolution(start, end) if series == 'ping' else 0
+        if resolution == 0:
+            value = SERIES[series]['value']
+            rows = self._query(series, key, start, end, f"timestamp, {value}", "ORDER BY timestamp")
+            return dict(chart_labels([(ts, _num(v)) for ts, v in rows]), resolution=0)
+        out = self.aggregate(series, key, start, end, resolution, p95=True)
+        out['labels'] = [datetime.fromisoformat(t).strftime('%H:%M' if resolution == MINUTE else '%d/%m %H:%M')
+                         for t in out['timestamps']]
+        out['resolution'] = resolution
+        return out
+
+    def delete(self, series, key):
+        # Segment itu append-only: tulis ulang file yang mengandung key ini tanpa baris tsb
+        filters = key_filters(series, key)
+        with self.lock:
+            self.buffers[series] = [r for r in self.buffers[series]
+                                    if any(r.get(k) != v for k, v in filters.items())]
+            for f in glob.glob(os.path.join(self.root, series, '*', '*.parquet')):
+                table = pq.read_table(f)
+                mask = None
+                for k, v in filters.items():
+                    if k not in table.column_names: continue
+                    m = pc.not_equal(table[k], pa.scalar(v, table.schema.field(k).type))
+                    mask = m if mask is None else pc.or_(mask, m)
+                if mask is None: continue
+                kept = table.filter(mask)
+                if kept.num_rows == table.num_rows: continue
+                if kept.num_rows: _write_atomic(kept, f)
+                else: os.remove(f)
+
+
+def _stamp(files):
+    out = {}
+    for f in files:
+        try:
+            st = os.stat(f)
+            out[f] = (st.st_ino, st.st_mtime_ns, st.st_size)   # file ditulis ulang (os.replace) = inode baru
+        except OSError:
+            out[f] = None
+    return out
+
+
+def _num(v):
+    return int(v) if isinstance(v, float) and v.is_integer() else v
+
+
+def _arrow_type(name):
+    return {'timestamp': pa.timestamp('us'), 'int64': pa.int64(), 'float64': pa.float64(),
+            'string': pa.string()}[name]
+
+
+def _split_by_day(table):
+    days = pc.strftime(table['timestamp'], format='%Y-%m-%d')
+    for day in pc.unique(days).to_pylist():
+        yield day, table.filter(pc.equal(days, day))
+
+
+def _write_atomic(table, path):
+    # Tulis ke .tmp dulu lalu rename, biar DuckDB gak pernah baca file setengah jadi
+    tmp = path + '.tmp'
+    pq.write_table(table, tmp, compression='zstd')
+    os.replace(tmp, path)
+
+
+def create_backend(app, db, writer, models, rollup_model, kind=TSDB_BACKEND):
+    if kind == 'parquet':
+        return ParquetBackend()
+    return SQLiteBackend(app, db, writer, models, rollup_model)